@@ -3,13 +3,15 @@ from fastapi import APIRouter
 from app.core.config import settings
 from app.core.time_utils import now_shanghai
 
-from .routes import auth, jobs, printers, logs
+from .routes import auth, jobs, printers, logs, system, templates
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
 api_router.include_router(printers.router, prefix="/printers", tags=["printers"])
 api_router.include_router(logs.router, prefix="/logs", tags=["logs"])
+api_router.include_router(system.router, prefix="/system", tags=["system"])
+api_router.include_router(templates.router, prefix="/templates", tags=["templates"])
 
 
 @api_router.get("/", tags=["system"], summary="服务状态")
@@ -1,16 +1,19 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 from fastapi import Depends, HTTPException, Security, status
 from fastapi.security import APIKeyHeader, OAuth2PasswordBearer
 from jose import JWTError, jwt
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.core.database import session_scope
+from app.core.database import get_async_session_factory, session_scope
 from app.models import User
 from app.schemas import TokenPayload
+from app.services.auth_cache import auth_cache
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.api_prefix}/auth/token", auto_error=False)
@@ -22,7 +25,16 @@ def get_db() -> Session:
         yield session
 
 
-def _get_user_by_token(db: Session, token: str) -> User:
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """只读接口使用的异步会话，查询不占用线程池"""
+    async with get_async_session_factory()() as session:
+        yield session
+
+
+def _token_subject(token: str) -> str:
+    subject = auth_cache.get_token(token)
+    if subject is not None:
+        return subject
     try:
         payload = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
         token_data = TokenPayload(**payload)
@@ -31,17 +43,38 @@ def _get_user_by_token(db: Session, token: str) -> User:
 
     if token_data.sub is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="无效的认证凭证")
+    # 签名已验证的 Token 缓存到过期为止
+    auth_cache.put_token(token, token_data.sub, payload.get("exp"))
+    return token_data.sub
+
 
-    user = db.query(User).filter(User.username == token_data.sub).first()
+def _ensure_token_user(user: Optional[User]) -> User:
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="用户不存在")
+    if not user.is_active:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="账号已停用")
+    return user
+
+
+def _get_user_by_token(db: Session, token: str) -> Optional[User]:
+    subject = _token_subject(token)
+    user = auth_cache.get_user("username", subject)
+    if user is None:
+        generation = auth_cache.generation
+        user = db.query(User).filter(User.username == subject).first()
+        if user:
+            user = auth_cache.put_user("username", subject, user, generation)
     return user
 
 
 def _get_user_by_api_key(db: Session, api_key: str) -> User:
-    user = db.query(User).filter(User.api_key == api_key, User.is_active.is_(True)).first()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="API Key 无效")
+    user = auth_cache.get_user("api_key", api_key)
+    if user is None:
+        generation = auth_cache.generation
+        user = db.query(User).filter(User.api_key == api_key, User.is_active.is_(True)).first()
+        if not user:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="API Key 无效")
+        user = auth_cache.put_user("api_key", api_key, user, generation)
     return user
 
 
@@ -51,10 +84,7 @@ def get_current_user(
 ) -> User:
     if not token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="缺少认证信息")
-    user = _get_user_by_token(db, token)
-    if not user.is_active:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="账号已停用")
-    return user
+    return _ensure_token_user(_get_user_by_token(db, token))
 
 
 def get_current_active_user_or_api_client(
@@ -69,6 +99,49 @@ def get_current_active_user_or_api_client(
     return get_current_user(token=token, db=db)
 
 
+async def authenticate_async(db: AsyncSession, token: Optional[str], api_key: Optional[str] = None) -> User:
+    """以 Bearer Token 或 API Key 认证，供事件流等需要自行读取凭证的异步接口使用"""
+    if api_key:
+        user = auth_cache.get_user("api_key", api_key)
+        if user is None:
+            generation = auth_cache.generation
+            user = (
+                await db.execute(select(User).where(User.api_key == api_key, User.is_active.is_(True)))
+            ).scalar_one_or_none()
+            if not user:
+                raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="API Key 无效")
+            user = auth_cache.put_user("api_key", api_key, user, generation)
+        return user
+    if not token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="缺少认证信息")
+    subject = _token_subject(token)
+    user = auth_cache.get_user("username", subject)
+    if user is None:
+        generation = auth_cache.generation
+        user = (await db.execute(select(User).where(User.username == subject))).scalar_one_or_none()
+        if user:
+            user = auth_cache.put_user("username", subject, user, generation)
+    return _ensure_token_user(user)
+
+
+async def get_current_active_user_or_api_client_async(
+    token: Optional[str] = Depends(oauth2_scheme),
+    api_key: Optional[str] = Security(api_key_header),
+) -> User:
+    """:func:`get_current_active_user_or_api_client` 的异步版本，认证使用的会话在返回前关闭，
+    需要长时间等待的接口不占用数据库连接"""
+    async with get_async_session_factory()() as db:
+        return await authenticate_async(db, token, api_key)
+
+
+async def get_current_user_async(
+    token: Optional[str] = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+) -> User:
+    """:func:`get_current_user` 的异步版本，供异步只读接口使用"""
+    return await authenticate_async(db, token)
+
+
 def get_current_admin(
     current_user: User = Depends(get_current_user),
 ) -> User:
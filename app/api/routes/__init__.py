@@ -1,3 +1,3 @@
-from . import auth, jobs, printers, logs  # noqa: F401
+from . import auth, jobs, printers, logs, system, templates  # noqa: F401
 
-__all__ = ["auth", "jobs", "printers", "logs"]
+__all__ = ["auth", "jobs", "printers", "logs", "system", "templates"]
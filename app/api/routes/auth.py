@@ -4,13 +4,14 @@ from datetime import timedelta
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.api import deps
 from app.core.config import settings
 from app.core.security import create_access_token
 from app.models import User
-from app.schemas import Token, UserCreate, UserRead
+from app.schemas import Token, UserCreate, UserRead, UserUpdate
 from app.services import user_service
 
 
@@ -18,11 +19,11 @@ router = APIRouter()
 
 
 @router.post("/token", response_model=Token)
-def login_access_token(
-    db: Session = Depends(deps.get_db),
+async def login_access_token(
+    db: AsyncSession = Depends(deps.get_async_db),
     form_data: OAuth2PasswordRequestForm = Depends(),
 ) -> Token:
-    user = user_service.authenticate_user(db, form_data.username, form_data.password)
+    user = await user_service.authenticate_user_async(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="用户名或密码错误")
     if not user.is_active:
@@ -45,6 +46,20 @@ def create_user(
     return UserRead.from_orm(user)
 
 
+@router.patch("/users/{user_id}", response_model=UserRead)
+def update_user(
+    user_id: int,
+    user_in: UserUpdate,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_admin),
+) -> UserRead:
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="用户不存在")
+    user = user_service.update_user(db, user, user_in)
+    return UserRead.from_orm(user)
+
+
 @router.get("/me", response_model=UserRead)
 def read_current_user(current_user: User = Depends(deps.get_current_user)) -> UserRead:
     return UserRead.from_orm(current_user)
@@ -1,48 +1,252 @@
 from __future__ import annotations
 
 import base64
-from typing import List
+import json
+from typing import AsyncIterator, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, Security, WebSocket, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from fastapi.websockets import WebSocketDisconnect
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.api import deps
+from app.core.concurrency import run_cpu_bound
+from app.core.config import settings
+from app.core.database import get_async_session_factory, session_scope
 from app.models import PrintJob, User
-from app.schemas import PrintJobCreate, PrintJobRead, PrintJobStatus, PrintJobUpdate
+from app.schemas import (
+    BulkJobReprioritize,
+    BulkJobResult,
+    DeadLetterRequeue,
+    JobFilter,
+    PrintJobCreate,
+    PrintJobRead,
+    PrintJobReprint,
+    PrintJobStatus,
+    PrintJobUpdate,
+)
 from app.services import job_service
+from app.services.job_events import JobEvent, JobSubscription, job_event_bus
 
 
 router = APIRouter()
 
 
+_WAIT_QUERY = Query(default=0, ge=0, description="最多等待任务结束的秒数，上限为 queue.wait_max_seconds")
+
+
 @router.post("/", response_model=PrintJobRead, status_code=status.HTTP_201_CREATED)
-def create_job(
+async def create_job(
     job_in: PrintJobCreate,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_user_or_api_client),
+    wait: float = _WAIT_QUERY,
+    idempotency_key: Optional[str] = Header(default=None, max_length=200),
+    current_user: User = Depends(deps.get_current_active_user_or_api_client_async),
 ) -> PrintJobRead:
-    job = job_service.create_print_job(db, job_in, owner_id=current_user.id if current_user else None)
-    return PrintJobRead.from_orm(job)
+    def create() -> PrintJobRead:
+        with session_scope() as db:
+            job = job_service.create_print_job(
+                db,
+                job_in,
+                owner_id=current_user.id if current_user else None,
+                idempotency_key=idempotency_key,
+            )
+            return PrintJobRead.from_orm(job)
+
+    # 创建任务在线程池中使用自己的短会话，返回前归还连接；等待任务结束时既不占用线程也不占用连接
+    job = await run_in_threadpool(create)
+    if wait > 0:
+        async with get_async_session_factory()() as async_db:
+            job.status, job.error_message = await job_service.wait_for_print_job_async(
+                async_db, job.id, min(wait, settings.job_wait_max_seconds)
+            )
+    return job
 
 
 @router.get("/", response_model=List[PrintJobRead])
-def list_jobs(
+async def list_jobs(
     skip: int = 0,
     limit: int = 20,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user),
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_user_async),
 ) -> List[PrintJobRead]:
-    jobs = job_service.list_print_jobs(db, skip=skip, limit=limit)
+    jobs = await job_service.list_print_jobs_async(db, skip=skip, limit=limit)
     return [PrintJobRead.from_orm(job) for job in jobs]
 
 
-@router.get("/{job_id}", response_model=PrintJobRead)
-def get_job(
-    job_id: int,
+async def _open_event_subscription(
+    token: Optional[str],
+    api_key: Optional[str],
+    job_id: Optional[int],
+    owner_id: Optional[int],
+    printer_id: Optional[int],
+) -> tuple[JobSubscription, List[JobEvent]]:
+    """
+    认证并订阅任务事件，返回订阅和需要先发送的初始事件
+
+    普通用户只能订阅自己的任务。按任务订阅时先订阅再读取当前状态作为第一条事件，
+    读取期间发生的变化不会遗漏。数据库会话只在建立订阅时使用，不随事件流保持。
+    """
+    async with get_async_session_factory()() as db:
+        current_user = await deps.authenticate_async(db, token, api_key)
+        if not current_user.is_admin:
+            if owner_id not in (None, current_user.id):
+                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="没有权限订阅其他用户的任务")
+            owner_id = current_user.id
+        subscription = job_event_bus.subscribe(job_id=job_id, owner_id=owner_id, printer_id=printer_id)
+        if job_id is None:
+            return subscription, []
+        try:
+            row = await job_service.get_print_job_status_async(db, job_id)
+            if owner_id is not None and row.owner_id != owner_id:
+                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="没有权限订阅此任务")
+        except HTTPException:
+            job_event_bus.unsubscribe(subscription)
+            raise
+    snapshot = JobEvent(
+        0,
+        "status",
+        job_id,
+        row.owner_id,
+        row.printer_id,
+        {"status": row.status, "error_message": row.error_message},
+    )
+    return subscription, [snapshot]
+
+
+def _format_sse(event_type: str, data: dict, event_id: Optional[int] = None) -> str:
+    head = f"id: {event_id}\n" if event_id else ""
+    return f"{head}event: {event_type}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _sse_events(subscription: JobSubscription, initial: List[JobEvent]) -> AsyncIterator[str]:
+    try:
+        for event in initial:
+            yield _format_sse(event.type, event.to_dict(), event.id)
+        while True:
+            events, dropped = await subscription.get(timeout=settings.job_events_heartbeat_seconds)
+            if not events and not dropped:
+                yield ": keep-alive\n\n"
+                continue
+            if dropped:
+                yield _format_sse("dropped", {"count": dropped})
+            for event in events:
+                yield _format_sse(event.type, event.to_dict(), event.id)
+    finally:
+        # 客户端断开时生成器被取消，在此释放订阅
+        job_event_bus.unsubscribe(subscription)
+
+
+@router.get("/events", summary="订阅任务事件（SSE）")
+async def stream_job_events(
+    job_id: Optional[int] = None,
+    owner_id: Optional[int] = None,
+    printer_id: Optional[int] = None,
+    token: Optional[str] = Query(default=None, description="EventSource 无法设置请求头时通过查询参数传递 Token"),
+    bearer_token: Optional[str] = Depends(deps.oauth2_scheme),
+    api_key: Optional[str] = Security(deps.api_key_header),
+) -> StreamingResponse:
+    subscription, initial = await _open_event_subscription(bearer_token or token, api_key, job_id, owner_id, printer_id)
+    return StreamingResponse(
+        _sse_events(subscription, initial),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/events/ws")
+async def job_events_websocket(
+    websocket: WebSocket,
+    job_id: Optional[int] = None,
+    owner_id: Optional[int] = None,
+    printer_id: Optional[int] = None,
+    token: Optional[str] = None,
+) -> None:
+    authorization = websocket.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+    api_key = websocket.headers.get("x-api-key") or websocket.query_params.get("api_key")
+    try:
+        subscription, initial = await _open_event_subscription(token, api_key, job_id, owner_id, printer_id)
+    except HTTPException as exc:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=str(exc.detail))
+        return
+    try:
+        await websocket.accept()
+        for event in initial:
+            await websocket.send_json(event.to_dict())
+        while True:
+            events, dropped = await subscription.get(timeout=settings.job_events_heartbeat_seconds)
+            if not events and not dropped:
+                await websocket.send_json({"type": "ping"})
+                continue
+            if dropped:
+                await websocket.send_json({"type": "dropped", "count": dropped})
+            for event in events:
+                await websocket.send_json(event.to_dict())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        job_event_bus.unsubscribe(subscription)
+
+
+@router.post("/dead-letter/requeue", response_model=BulkJobResult)
+def requeue_dead_letter_jobs(
+    request: DeadLetterRequeue,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_admin),
+) -> BulkJobResult:
+    affected = job_service.requeue_dead_letter_jobs(db, request)
+    return BulkJobResult(affected=affected)
+
+
+def _restrict_to_owner(job_filter: JobFilter, current_user: User) -> None:
+    """普通用户只能批量操作自己的任务"""
+    if current_user.is_admin:
+        return
+    if job_filter.owner_id not in (None, current_user.id):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="没有权限操作其他用户的任务")
+    job_filter.owner_id = current_user.id
+
+
+@router.post("/bulk/cancel", response_model=BulkJobResult)
+def bulk_cancel_jobs(
+    job_filter: JobFilter,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> BulkJobResult:
+    _restrict_to_owner(job_filter, current_user)
+    return BulkJobResult(affected=job_service.bulk_cancel_jobs(db, job_filter))
+
+
+@router.post("/bulk/reprioritize", response_model=BulkJobResult)
+def bulk_reprioritize_jobs(
+    request: BulkJobReprioritize,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> BulkJobResult:
+    _restrict_to_owner(request, current_user)
+    return BulkJobResult(affected=job_service.bulk_reprioritize_jobs(db, request))
+
+
+@router.post("/bulk/requeue", response_model=BulkJobResult)
+def bulk_requeue_jobs(
+    job_filter: JobFilter,
     db: Session = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user),
+) -> BulkJobResult:
+    _restrict_to_owner(job_filter, current_user)
+    return BulkJobResult(affected=job_service.bulk_requeue_jobs(db, job_filter))
+
+
+@router.get("/{job_id}", response_model=PrintJobRead)
+async def get_job(
+    job_id: int,
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_user_async),
 ) -> PrintJobRead:
-    job = job_service.get_print_job(db, job_id)
+    job = await job_service.get_print_job_async(db, job_id)
     return PrintJobRead.from_orm(job)
 
 
@@ -73,25 +277,46 @@ def cancel_job(
     return PrintJobRead.from_orm(job)
 
 
-@router.get("/{job_id}/status", response_model=PrintJobStatus)
-def get_job_status(
+@router.post("/{job_id}/reprint", response_model=PrintJobRead, status_code=status.HTTP_201_CREATED)
+def reprint_job(
     job_id: int,
+    reprint_in: PrintJobReprint,
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user),
-) -> PrintJobStatus:
+    current_user: User = Depends(deps.get_current_active_user_or_api_client),
+) -> PrintJobRead:
     job = job_service.get_print_job(db, job_id)
-    return PrintJobStatus(status=job.status, error_message=job.error_message)
+    if current_user.id != job.owner_id and not current_user.is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="没有权限重印此任务")
+    job = job_service.reprint_print_job(db, job, reprint_in, owner_id=current_user.id)
+    return PrintJobRead.from_orm(job)
+
+
+@router.get("/{job_id}/status", response_model=PrintJobStatus)
+async def get_job_status(
+    job_id: int,
+    wait: float = _WAIT_QUERY,
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_user_async),
+) -> PrintJobStatus:
+    if wait > 0:
+        job_status, error_message = await job_service.wait_for_print_job_async(
+            db, job_id, min(wait, settings.job_wait_max_seconds)
+        )
+        return PrintJobStatus(status=job_status, error_message=error_message)
+    row = await job_service.get_print_job_status_async(db, job_id)
+    return PrintJobStatus(status=row.status, error_message=row.error_message)
 
 
 @router.get("/{job_id}/preview")
-def get_job_preview(
+async def get_job_preview(
     job_id: int,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user),
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_user_async),
 ) -> Response:
-    job = job_service.get_print_job(db, job_id)
+    job = await job_service.get_print_job_async(db, job_id, with_content=True)
     if current_user.id != job.owner_id and not current_user.is_admin:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="没有权限预览此任务")
-    preview_bytes = job_service.generate_preview(job)
+    # 渲染预览是 CPU 密集的工作，放到独立的线程池中执行
+    preview_bytes = await run_cpu_bound(job_service.generate_preview, job)
     encoded = base64.b64encode(preview_bytes).decode("ascii")
     return Response(content=encoded, media_type="text/plain")
@@ -1,24 +1,57 @@
 from __future__ import annotations
 
-from typing import List, Optional
+from datetime import datetime
+from typing import Iterator, List, Optional
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
 from app.models import User
 from app.schemas import JobLogRead
-from app.services.log_service import list_job_logs
+from app.services.log_service import iter_job_logs, list_job_logs_async
 
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[JobLogRead])
-def get_logs(
+async def get_logs(
+    response: Response,
     job_id: Optional[int] = None,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user),
+    level: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    after_id: Optional[int] = None,
+    limit: int = Query(default=100, ge=1, le=1000),
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_user_async),
 ) -> List[JobLogRead]:
-    logs = list_job_logs(db, job_id=job_id)
+    logs = await list_job_logs_async(
+        db,
+        job_id=job_id,
+        level=level,
+        created_from=created_from,
+        created_to=created_to,
+        after_id=after_id,
+        limit=limit,
+    )
+    if len(logs) == limit:
+        response.headers["X-Next-Cursor"] = str(logs[-1].id)
     return [JobLogRead.from_orm(log) for log in logs]
+
+
+@router.get("/export")
+def export_logs(
+    job_id: Optional[int] = None,
+    level: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    current_user: User = Depends(deps.get_current_user),
+) -> StreamingResponse:
+    def lines() -> Iterator[str]:
+        for log in iter_job_logs(job_id=job_id, level=level, created_from=created_from, created_to=created_to):
+            yield JobLogRead.from_orm(log).json() + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
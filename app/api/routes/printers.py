@@ -2,24 +2,26 @@ from __future__ import annotations
 
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.api import deps
-from app.models import Printer, User
-from app.schemas import PrinterRead, PrinterUpdate
+from app.models import Printer, PrinterGroup, User
+from app.schemas import PrinterGroupCreate, PrinterGroupRead, PrinterHealthRead, PrinterRead, PrinterUpdate
 from app.services import printer_service
+from app.services.printer_health import printer_health
 
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[PrinterRead])
-def list_printers(
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user),
+async def list_printers(
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_user_async),
 ) -> List[PrinterRead]:
-    printers = db.query(Printer).all()
+    printers = await printer_service.list_printers_async(db)
     return [PrinterRead.from_orm(p) for p in printers]
 
 
@@ -32,6 +34,53 @@ def sync_printers(
     return [PrinterRead.from_orm(p) for p in printers]
 
 
+@router.get("/groups", response_model=List[PrinterGroupRead])
+async def list_printer_groups(
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_user_async),
+) -> List[PrinterGroupRead]:
+    groups = await printer_service.list_printer_groups_async(db)
+    return [PrinterGroupRead.from_orm(group) for group in groups]
+
+
+@router.post("/groups", response_model=PrinterGroupRead, status_code=status.HTTP_201_CREATED)
+def create_printer_group(
+    group_in: PrinterGroupCreate,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_admin),
+) -> PrinterGroupRead:
+    group = printer_service.create_printer_group(db, group_in)
+    return PrinterGroupRead.from_orm(group)
+
+
+@router.delete("/groups/{group_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_printer_group(
+    group_id: int,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_admin),
+) -> Response:
+    group = db.query(PrinterGroup).filter(PrinterGroup.id == group_id).first()
+    if not group:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="打印机分组不存在")
+    printer_service.delete_printer_group(db, group)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.get("/health", response_model=List[PrinterHealthRead])
+def get_printer_health(
+    current_user: User = Depends(deps.get_current_user),
+) -> List[PrinterHealthRead]:
+    return [PrinterHealthRead(**item) for item in printer_health.snapshot()]
+
+
+@router.post("/health/probe", response_model=List[PrinterHealthRead])
+def probe_printer_health(
+    current_user: User = Depends(deps.get_current_admin),
+) -> List[PrinterHealthRead]:
+    printer_health.run_once()
+    return [PrinterHealthRead(**item) for item in printer_health.snapshot()]
+
+
 @router.put("/{printer_id}", response_model=PrinterRead)
 def update_printer(
     printer_id: int,
@@ -43,6 +92,9 @@ def update_printer(
     if not printer:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="打印机不存在")
     data = update_in.dict(exclude_unset=True)
+    if data.get("group_id") is not None:
+        if not db.query(PrinterGroup).filter(PrinterGroup.id == data["group_id"]).first():
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="打印机分组不存在")
     for field, value in data.items():
         setattr(printer, field, value)
     db.add(printer)
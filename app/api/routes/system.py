@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends
+
+from app.api import deps
+from app.core.database import writer_queue
+from app.models import User
+from app.services.conversion_cache import conversion_cache
+from app.services.auth_cache import auth_cache
+from app.services.cache_invalidation import cache_invalidation_feed
+from app.services.dispatcher import printer_dispatcher
+from app.services.job_events import job_event_bus
+from app.services.job_state_cache import job_state_cache
+from app.services.log_service import job_log_sink
+from app.services.payload_archive import payload_archiver
+from app.tasks.manager import job_queue
+from app.tasks.office_pool import office_pools
+from app.tasks.watchdog import print_watchdog
+
+
+router = APIRouter()
+
+
+@router.get("/metrics", summary="运行指标")
+def get_metrics(
+    current_user: User = Depends(deps.get_current_admin),
+) -> Dict[str, Any]:
+    return {
+        "queue": job_queue.stats(),
+        "office_pools": office_pools.stats(),
+        "conversion_cache": conversion_cache.stats(),
+        "dispatch": printer_dispatcher.stats(),
+        "job_logs": job_log_sink.stats(),
+        "database_writes": writer_queue.stats(),
+        "payload_archive": payload_archiver.stats(),
+        "job_events": job_event_bus.stats(),
+        "job_state_cache": job_state_cache.stats(),
+        "cache_invalidation": cache_invalidation_feed.stats(),
+        "auth_cache": auth_cache.stats(),
+    }
+
+
+@router.get("/heartbeat", summary="打印执行心跳")
+def get_heartbeat(
+    current_user: User = Depends(deps.get_current_user),
+) -> Dict[str, Any]:
+    return print_watchdog.heartbeat()
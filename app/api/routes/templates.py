@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import base64
+import io
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Response, status
+from sqlalchemy.orm import Session
+
+from app.api import deps
+from app.models import LabelTemplate, User
+from app.schemas import LabelTemplateCreate, LabelTemplateRead, LabelTemplateUpdate
+from app.services import template_service
+
+
+router = APIRouter()
+
+
+def _ensure_can_modify(template: LabelTemplate, current_user: User) -> None:
+    if current_user.id != template.owner_id and not current_user.is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="没有权限修改此模板")
+
+
+@router.get("/", response_model=List[LabelTemplateRead])
+def list_templates(
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> List[LabelTemplateRead]:
+    return [LabelTemplateRead.from_orm(template) for template in template_service.list_templates(db)]
+
+
+@router.post("/", response_model=LabelTemplateRead, status_code=status.HTTP_201_CREATED)
+def create_template(
+    template_in: LabelTemplateCreate,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> LabelTemplateRead:
+    template = template_service.create_template(db, template_in, owner_id=current_user.id)
+    return LabelTemplateRead.from_orm(template)
+
+
+@router.get("/{template_id}", response_model=LabelTemplateRead)
+def get_template(
+    template_id: int,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> LabelTemplateRead:
+    return LabelTemplateRead.from_orm(template_service.get_template(db, template_id))
+
+
+@router.put("/{template_id}", response_model=LabelTemplateRead)
+def update_template(
+    template_id: int,
+    template_in: LabelTemplateUpdate,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> LabelTemplateRead:
+    template = template_service.get_template(db, template_id)
+    _ensure_can_modify(template, current_user)
+    template = template_service.update_template(db, template, template_in)
+    return LabelTemplateRead.from_orm(template)
+
+
+@router.delete("/{template_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_template(
+    template_id: int,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> Response:
+    template = template_service.get_template(db, template_id)
+    _ensure_can_modify(template, current_user)
+    template_service.delete_template(db, template)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.post("/{template_id}/preview")
+def preview_template(
+    template_id: int,
+    record: Dict[str, Any] = Body(default_factory=dict),
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> Response:
+    template = template_service.get_template(db, template_id)
+    try:
+        image = template_service.get_renderer(template).render(record)
+    except (RuntimeError, ValueError) as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    encoded = base64.b64encode(buffer.getvalue()).decode("ascii")
+    return Response(content=encoded, media_type="text/plain")
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from .config import settings
+
+
+T = TypeVar("T")
+
+# 预览渲染、密码校验等 CPU 密集的工作使用独立的线程池，
+# 不占用 Starlette 运行同步接口的线程池，也不阻塞事件循环
+cpu_executor = ThreadPoolExecutor(max_workers=max(1, settings.server_cpu_workers), thread_name_prefix="api-cpu")
+
+
+async def run_cpu_bound(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """在 CPU 线程池中执行 ``func`` 并等待结果"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(cpu_executor, functools.partial(func, *args, **kwargs))
@@ -35,15 +35,34 @@ class Settings(BaseSettings):
     server_port: int = Field(default=8568, description="Server port")
     server_reload: bool = Field(default=False, description="Enable auto-reload for development")
     server_workers: int = Field(default=1, description="Number of worker processes")
+    server_cpu_workers: int = Field(default=4, description="Threads for CPU-heavy request work such as previews and password checks")
+    cache_invalidation_interval_ms: int = Field(default=500, description="How often each worker process reads cache invalidations of the others when workers > 1")
     
     # Database settings
     database_url: str = Field(default="")
     database_echo: bool = Field(default=False)
+    database_sqlite_tuning: bool = Field(default=True, description="Enable WAL, pragmas and a sized connection pool for SQLite files")
+    database_busy_timeout_ms: int = Field(default=5000, description="How long SQLite waits for a lock before failing")
+    database_mmap_size_mb: int = Field(default=64, description="SQLite memory-mapped I/O size in MB")
+    database_cache_size_mb: int = Field(default=16, description="SQLite page cache size per connection in MB")
+    database_pool_size: int = Field(default=8, description="Connections kept in the pool")
+    database_max_overflow: int = Field(default=8, description="Extra connections allowed beyond the pool size")
+    database_serialize_writes: bool = Field(default=False, description="Queue SQLite write transactions in arrival order")
+    payload_compression: bool = Field(default=True, description="Store compressible print payloads zlib-compressed")
+    payload_compression_level: int = Field(default=6, description="zlib level used for print payloads, 1 (fast) to 9 (small)")
+    payload_compression_min_bytes: int = Field(default=1024, description="Payloads smaller than this are stored uncompressed")
+    payload_retention_days: int = Field(default=0, description="Move print payloads of finished jobs out of the database after this many days, 0 keeps them")
+    payload_archive_interval_seconds: int = Field(default=3600, description="Interval between payload archival runs")
+    payload_archive_batch_size: int = Field(default=50, description="Jobs whose payload is archived per transaction")
+    payload_archive_directory: str = Field(default="", description="Write archived payloads here gzip-compressed, empty to just delete them")
+    payload_vacuum_pages: int = Field(default=2000, description="Free pages returned to the file system by incremental VACUUM after archival, 0 disables")
     
     # Security settings
     access_token_expire_minutes: int = Field(default=60 * 24 * 7)
     jwt_algorithm: str = Field(default="HS256")
     jwt_secret_key: str = Field(default="change_me")
+    auth_cache_ttl_seconds: float = Field(default=30, description="How long verified users and API keys are served from memory, 0 disables")
+    auth_cache_size: int = Field(default=10000, description="Maximum cached tokens and users")
     
     # File and preview settings
     allowed_preview_formats: List[str] = Field(default_factory=lambda: ["pdf", "png", "jpg", "jpeg"])
@@ -52,6 +71,58 @@ class Settings(BaseSettings):
     # Logging settings
     log_directory: str = Field(default="")
     log_level: str = Field(default="INFO", description="Logging level: DEBUG, INFO, WARNING, ERROR")
+    job_log_batch_size: int = Field(default=200, description="Buffered job log rows that trigger a flush")
+    job_log_flush_interval_ms: int = Field(default=200, description="Maximum time a job log row waits in the buffer")
+    job_log_synchronous: bool = Field(default=False, description="Write every job log row immediately, for tests")
+    job_log_retention_days: int = Field(default=0, description="Delete job logs older than this many days, 0 keeps them forever")
+    job_log_retention_interval_seconds: int = Field(default=3600, description="Interval between job log retention runs")
+    job_log_retention_batch_size: int = Field(default=1000, description="Job log rows deleted per retention transaction")
+    job_log_archive_directory: str = Field(default="", description="Append expired job logs here as NDJSON before deleting, empty to just delete")
+
+    # Print execution settings
+    print_timeout_seconds: int = Field(default=300, description="Default deadline for a single print attempt")
+    print_backend_timeouts: Dict[str, int] = Field(
+        default_factory=lambda: {"raw": 60, "image_gdi": 120, "file": 120, "word": 300, "excel": 300, "template": 1800},
+        description="Per-backend print deadlines in seconds",
+    )
+    print_file_type_timeouts: Dict[str, int] = Field(default_factory=dict, description="Per-file-type print deadlines in seconds")
+    imposition_margin_mm: float = Field(default=2.0, description="Page margin used when imposing several images on one page")
+    imposition_spacing_mm: float = Field(default=2.0, description="Gap between imposed images")
+    label_font_path: str = Field(default="", description="TrueType font for label templates, needed for CJK text")
+    retry_policies: Dict[str, Dict[str, float]] = Field(
+        default_factory=dict,
+        description="Retry policy overrides per error class: timeout, printer_unavailable, content, default",
+    )
+    
+    # Job queue settings
+    queue_worker_count: int = Field(default=1, description="Number of threads executing print jobs")
+    queue_aging_seconds: float = Field(default=60, description="Seconds of waiting that raise a job by one priority level")
+    queue_owner_weights: Dict[str, float] = Field(default_factory=dict, description="Fair-share weights keyed by owner user id")
+    queue_max_inflight_per_owner: int = Field(default=0, description="Maximum concurrently executing jobs per owner, 0 for unlimited")
+    idempotency_ttl_seconds: int = Field(default=86400, description="How long an Idempotency-Key keeps returning the original job")
+    idempotency_wait_seconds: float = Field(default=30, description="How long a duplicate request waits for the in-flight original")
+    job_events_queue_size: int = Field(default=256, description="Undelivered events kept per SSE/WebSocket subscriber before old ones are dropped")
+    job_events_heartbeat_seconds: float = Field(default=15, description="Keep-alive interval of idle job event streams")
+    job_wait_max_seconds: float = Field(default=60, description="Upper bound for the ?wait= long-poll on job status and create")
+    job_state_cache_size: int = Field(default=10000, description="Jobs whose status is kept in memory for status lookups, 0 disables")
+    
+    # Printer health settings
+    printer_health_interval_seconds: int = Field(default=30, description="Interval between printer health probes, 0 disables")
+    printer_breaker_failure_threshold: int = Field(default=3, description="Consecutive failures that open a printer circuit breaker")
+    printer_breaker_reset_seconds: int = Field(default=60, description="Seconds before an open circuit breaker allows a trial job")
+    dispatch_default_pages_per_second: float = Field(default=1.0, description="Assumed speed of printers that have not been measured yet")
+    dispatch_speed_smoothing: float = Field(default=0.3, description="Weight of the newest sample in the rolling printer speed")
+    
+    # Office automation settings
+    office_converter_provider: str = Field(default="com", description="Office converter provider: com, fake")
+    office_pool_size: int = Field(default=1, description="Warm Word/Excel instances per application")
+    office_max_jobs_per_instance: int = Field(default=50, description="Recycle an Office instance after this many jobs")
+    office_job_timeout_seconds: int = Field(default=120, description="Abandon an Office instance that hangs longer than this")
+    office_pool_prewarm: bool = Field(default=False, description="Start Office instances at service startup")
+    office_cache_enabled: bool = Field(default=True, description="Cache Word/Excel documents converted to PDF and print the PDF instead of using Office")
+    office_cache_directory: str = Field(default="")
+    office_cache_max_mb: int = Field(default=512, description="Maximum size of the conversion cache in MB")
+    office_cache_max_entries: int = Field(default=2000, description="Maximum number of cached conversions")
 
     class Config:
         env_file = ".env"
@@ -79,15 +150,34 @@ def _load_yaml_config() -> Dict[str, Any]:
             flat_config['server_port'] = config['server'].get('port')
             flat_config['server_reload'] = config['server'].get('reload')
             flat_config['server_workers'] = config['server'].get('workers')
+            flat_config['server_cpu_workers'] = config['server'].get('cpu_workers')
+            flat_config['cache_invalidation_interval_ms'] = config['server'].get('cache_invalidation_interval_ms')
         
         if 'database' in config:
             flat_config['database_url'] = config['database'].get('url')
             flat_config['database_echo'] = config['database'].get('echo')
+            flat_config['database_sqlite_tuning'] = config['database'].get('sqlite_tuning')
+            flat_config['database_busy_timeout_ms'] = config['database'].get('busy_timeout_ms')
+            flat_config['database_mmap_size_mb'] = config['database'].get('mmap_size_mb')
+            flat_config['database_cache_size_mb'] = config['database'].get('cache_size_mb')
+            flat_config['database_pool_size'] = config['database'].get('pool_size')
+            flat_config['database_max_overflow'] = config['database'].get('max_overflow')
+            flat_config['database_serialize_writes'] = config['database'].get('serialize_writes')
+            flat_config['payload_compression'] = config['database'].get('payload_compression')
+            flat_config['payload_compression_level'] = config['database'].get('payload_compression_level')
+            flat_config['payload_compression_min_bytes'] = config['database'].get('payload_compression_min_bytes')
+            flat_config['payload_retention_days'] = config['database'].get('payload_retention_days')
+            flat_config['payload_archive_interval_seconds'] = config['database'].get('payload_archive_interval_seconds')
+            flat_config['payload_archive_batch_size'] = config['database'].get('payload_archive_batch_size')
+            flat_config['payload_archive_directory'] = config['database'].get('payload_archive_directory')
+            flat_config['payload_vacuum_pages'] = config['database'].get('payload_vacuum_pages')
         
         if 'security' in config:
             flat_config['access_token_expire_minutes'] = config['security'].get('access_token_expire_minutes')
             flat_config['jwt_algorithm'] = config['security'].get('jwt_algorithm')
             flat_config['jwt_secret_key'] = config['security'].get('jwt_secret_key')
+            flat_config['auth_cache_ttl_seconds'] = config['security'].get('auth_cache_ttl_seconds')
+            flat_config['auth_cache_size'] = config['security'].get('auth_cache_size')
         
         if 'files' in config:
             flat_config['allowed_preview_formats'] = config['files'].get('allowed_preview_formats')
@@ -96,6 +186,52 @@ def _load_yaml_config() -> Dict[str, Any]:
         if 'logging' in config:
             flat_config['log_directory'] = config['logging'].get('directory')
             flat_config['log_level'] = config['logging'].get('level')
+            flat_config['job_log_batch_size'] = config['logging'].get('job_log_batch_size')
+            flat_config['job_log_flush_interval_ms'] = config['logging'].get('job_log_flush_interval_ms')
+            flat_config['job_log_synchronous'] = config['logging'].get('job_log_synchronous')
+            flat_config['job_log_retention_days'] = config['logging'].get('job_log_retention_days')
+            flat_config['job_log_retention_interval_seconds'] = config['logging'].get('job_log_retention_interval_seconds')
+            flat_config['job_log_retention_batch_size'] = config['logging'].get('job_log_retention_batch_size')
+            flat_config['job_log_archive_directory'] = config['logging'].get('job_log_archive_directory')
+        
+        if 'printing' in config:
+            flat_config['print_timeout_seconds'] = config['printing'].get('timeout_seconds')
+            flat_config['print_backend_timeouts'] = config['printing'].get('backend_timeouts')
+            flat_config['print_file_type_timeouts'] = config['printing'].get('file_type_timeouts')
+            flat_config['imposition_margin_mm'] = config['printing'].get('imposition_margin_mm')
+            flat_config['imposition_spacing_mm'] = config['printing'].get('imposition_spacing_mm')
+            flat_config['label_font_path'] = config['printing'].get('label_font_path')
+            flat_config['retry_policies'] = config['printing'].get('retry_policies')
+        
+        if 'queue' in config:
+            flat_config['queue_worker_count'] = config['queue'].get('worker_count')
+            flat_config['queue_aging_seconds'] = config['queue'].get('aging_seconds')
+            flat_config['queue_owner_weights'] = config['queue'].get('owner_weights')
+            flat_config['queue_max_inflight_per_owner'] = config['queue'].get('max_inflight_per_owner')
+            flat_config['idempotency_ttl_seconds'] = config['queue'].get('idempotency_ttl_seconds')
+            flat_config['idempotency_wait_seconds'] = config['queue'].get('idempotency_wait_seconds')
+            flat_config['job_events_queue_size'] = config['queue'].get('events_queue_size')
+            flat_config['job_events_heartbeat_seconds'] = config['queue'].get('events_heartbeat_seconds')
+            flat_config['job_wait_max_seconds'] = config['queue'].get('wait_max_seconds')
+            flat_config['job_state_cache_size'] = config['queue'].get('state_cache_size')
+        
+        if 'printers' in config:
+            flat_config['printer_health_interval_seconds'] = config['printers'].get('health_interval_seconds')
+            flat_config['printer_breaker_failure_threshold'] = config['printers'].get('breaker_failure_threshold')
+            flat_config['printer_breaker_reset_seconds'] = config['printers'].get('breaker_reset_seconds')
+            flat_config['dispatch_default_pages_per_second'] = config['printers'].get('dispatch_default_pages_per_second')
+            flat_config['dispatch_speed_smoothing'] = config['printers'].get('dispatch_speed_smoothing')
+        
+        if 'office' in config:
+            flat_config['office_converter_provider'] = config['office'].get('converter_provider')
+            flat_config['office_pool_size'] = config['office'].get('pool_size')
+            flat_config['office_max_jobs_per_instance'] = config['office'].get('max_jobs_per_instance')
+            flat_config['office_job_timeout_seconds'] = config['office'].get('job_timeout_seconds')
+            flat_config['office_pool_prewarm'] = config['office'].get('prewarm')
+            flat_config['office_cache_enabled'] = config['office'].get('cache_enabled')
+            flat_config['office_cache_directory'] = config['office'].get('cache_directory') or None
+            flat_config['office_cache_max_mb'] = config['office'].get('cache_max_mb')
+            flat_config['office_cache_max_entries'] = config['office'].get('cache_max_entries')
         
         # Remove None values
         return {k: v for k, v in flat_config.items() if v is not None}
@@ -141,6 +277,9 @@ def load_settings() -> Settings:
     log_dir = user_data_dir / "logs"
     log_dir.mkdir(parents=True, exist_ok=True)
     
+    # Set Office conversion cache directory in user directory
+    office_cache_dir = user_data_dir / "office_cache"
+    
     # Load YAML config
     yaml_config = _load_yaml_config()
     
@@ -150,7 +289,8 @@ def load_settings() -> Settings:
     # Merge configurations (YAML < legacy env < explicit settings)
     config_overrides = {
         'database_url': os.environ.get('DATABASE_URL', yaml_config.get('database_url', f'sqlite:///{db_path}')),
-        'log_directory': os.environ.get('LOG_DIRECTORY', yaml_config.get('log_directory', str(log_dir)))
+        'log_directory': os.environ.get('LOG_DIRECTORY', yaml_config.get('log_directory', str(log_dir))),
+        'office_cache_directory': os.environ.get('OFFICE_CACHE_DIRECTORY', yaml_config.get('office_cache_directory', str(office_cache_dir))),
     }
     
     # Apply YAML config
@@ -1,20 +1,181 @@
 from __future__ import annotations
 
+import threading
+import time
+from collections import deque
 from contextlib import contextmanager
-from typing import Generator
+from typing import Any, Dict, Generator, Optional
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker, Session
+from sqlalchemy.pool import QueuePool
 
 from .config import settings
 
 
-connect_args = {"check_same_thread": False} if settings.database_url.startswith("sqlite") else {}
-engine = create_engine(settings.database_url, future=True, echo=settings.database_echo, connect_args=connect_args)
+def is_sqlite_file(url: str) -> bool:
+    return url.startswith("sqlite") and ":memory:" not in url and url.rstrip("/") not in ("sqlite:", "sqlite+pysqlite:")
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        # 只对尚未建表的新数据库生效，已有数据库需执行 scripts/enable_incremental_vacuum.py 转换
+        cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.database_busy_timeout_ms)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.database_mmap_size_mb) * 1024 * 1024}")
+        # 负数表示以 KB 为单位
+        cursor.execute(f"PRAGMA cache_size={-int(settings.database_cache_size_mb) * 1024}")
+    finally:
+        cursor.close()
+
+
+def create_database_engine(url: str, echo: bool = False, tuned: Optional[bool] = None) -> Engine:
+    """
+    创建数据库引擎
+
+    SQLite 文件数据库在 ``tuned`` 模式（默认取 ``database_sqlite_tuning``）下启用 WAL、
+    ``synchronous=NORMAL``、``busy_timeout``、``mmap_size``、``cache_size``，并使用固定大小的连接池：
+    WAL 模式下读取不再被写入阻塞。
+    """
+    if not url.startswith("sqlite"):
+        return create_engine(url, future=True, echo=echo)
+    if tuned is None:
+        tuned = settings.database_sqlite_tuning
+    if not (tuned and is_sqlite_file(url)):
+        return create_engine(url, future=True, echo=echo, connect_args={"check_same_thread": False})
+    engine = create_engine(
+        url,
+        future=True,
+        echo=echo,
+        connect_args={"check_same_thread": False, "timeout": settings.database_busy_timeout_ms / 1000},
+        poolclass=QueuePool,
+        pool_size=max(1, settings.database_pool_size),
+        max_overflow=max(0, settings.database_max_overflow),
+    )
+    event.listen(engine, "connect", _apply_sqlite_pragmas)
+    return engine
+
+
+class WriterQueue:
+    """按到达顺序排队的进程内数据库写锁，同一线程可重入
+
+    SQLite 同一时刻只允许一个写事务，多个连接同时写入时只能靠 busy_timeout 轮询重试，
+    既不公平，高并发时还会超时报 ``database is locked``。启用后会话在第一次写入前排队获取写锁，
+    事务结束（提交或回滚）时释放，写事务按到达顺序依次执行。
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._waiting: deque = deque()
+        self._owner: Optional[int] = None
+        self._depth = 0
+        self._acquired = 0
+        self._wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+
+    def acquire(self) -> None:
+        current = threading.get_ident()
+        with self._lock:
+            if self._owner == current:
+                self._depth += 1
+                return
+            if self._owner is None:
+                self._owner = current
+                self._depth = 1
+                self._acquired += 1
+                return
+            handoff = threading.Event()
+            self._waiting.append((handoff, current))
+        started = time.monotonic()
+        # 释放方直接把写锁交给队首，只唤醒这一个线程
+        handoff.wait()
+        waited = time.monotonic() - started
+        with self._lock:
+            self._acquired += 1
+            self._wait_seconds += waited
+            self._max_wait_seconds = max(self._max_wait_seconds, waited)
+
+    def release(self) -> None:
+        with self._lock:
+            self._depth -= 1
+            if self._depth > 0:
+                return
+            if self._waiting:
+                handoff, self._owner = self._waiting.popleft()
+                self._depth = 1
+                handoff.set()
+            else:
+                self._owner = None
+                self._depth = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "waiting": len(self._waiting),
+                "acquired": self._acquired,
+                "avg_wait_ms": round(self._wait_seconds / self._acquired * 1000, 3) if self._acquired else 0.0,
+                "max_wait_ms": round(self._max_wait_seconds * 1000, 3),
+            }
+
+
+writer_queue = WriterQueue()
+
+
+def _acquire_writer(session: Session) -> None:
+    if not session.info.get("writer_lock"):
+        writer_queue.acquire()
+        session.info["writer_lock"] = True
+
+
+def _release_writer(session: Session, transaction) -> None:
+    if transaction.parent is None and session.info.pop("writer_lock", False):
+        writer_queue.release()
+
+
+def serialize_writes(session_factory: sessionmaker) -> None:
+    """让 ``session_factory`` 创建的会话在写入前通过 :data:`writer_queue` 排队"""
+    event.listen(session_factory, "before_flush", lambda session, context, instances: _acquire_writer(session))
+    event.listen(
+        session_factory,
+        "do_orm_execute",
+        lambda state: _acquire_writer(state.session) if state.is_insert or state.is_update or state.is_delete else None,
+    )
+    event.listen(session_factory, "after_transaction_end", _release_writer)
+
+
+engine = create_database_engine(settings.database_url, echo=settings.database_echo)
 SessionLocal = sessionmaker(bind=engine, class_=Session, autoflush=False, autocommit=False, future=True)
+if settings.database_serialize_writes and is_sqlite_file(settings.database_url):
+    serialize_writes(SessionLocal)
 Base = declarative_base()
 
 
+def run_migrations(bind: Optional[Engine] = None, revision: str = "head") -> None:
+    """
+    将数据库结构升级到指定版本（默认最新）
+
+    表结构由 ``migrations/`` 下的 Alembic 迁移维护。此前由 ``create_all`` 创建的数据库
+    会被基线迁移识别并补齐缺失的列和索引，无需手工处理。
+    """
+    from pathlib import Path
+
+    from alembic import command
+    from alembic.config import Config
+
+    root = Path(__file__).resolve().parents[2]
+    config = Config(str(root / "alembic.ini"))
+    config.set_main_option("script_location", str(root / "migrations"))
+    config.attributes["configure_logger"] = False
+    with (bind or engine).begin() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, revision)
+
+
 @contextmanager
 def session_scope() -> Generator[Session, None, None]:
     session = SessionLocal()
@@ -31,3 +192,50 @@ def session_scope() -> Generator[Session, None, None]:
 def get_session() -> Generator[Session, None, None]:
     with session_scope() as session:
         yield session
+
+
+def to_async_url(url: str) -> str:
+    """将同步驱动的数据库地址换成对应的异步驱动"""
+    scheme, separator, rest = url.partition("://")
+    drivers = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg", "mysql": "mysql+aiomysql"}
+    backend = scheme.split("+")[0]
+    if backend not in drivers:
+        return url
+    return f"{drivers[backend]}{separator}{rest}"
+
+
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker] = None
+_async_lock = threading.Lock()
+
+
+def get_async_session_factory() -> async_sessionmaker:
+    """
+    返回异步会话工厂，首次调用时创建异步引擎
+
+    异步引擎只用于高并发的只读接口，与同步引擎指向同一个数据库并使用相同的 SQLite 调优参数。
+    连接绑定在创建它的事件循环上，应用关闭时需调用 :func:`dispose_async_engine`。
+    """
+    global _async_engine, _async_session_factory
+    with _async_lock:
+        if _async_session_factory is None:
+            url = to_async_url(settings.database_url)
+            options: Dict[str, Any] = {"echo": settings.database_echo}
+            if url.startswith("sqlite"):
+                options["connect_args"] = {"timeout": settings.database_busy_timeout_ms / 1000}
+            if is_sqlite_file(settings.database_url):
+                options["pool_size"] = max(1, settings.database_pool_size)
+                options["max_overflow"] = max(0, settings.database_max_overflow)
+            _async_engine = create_async_engine(url, **options)
+            if settings.database_sqlite_tuning and is_sqlite_file(settings.database_url):
+                event.listen(_async_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+            _async_session_factory = async_sessionmaker(_async_engine, expire_on_commit=False, autoflush=False)
+        return _async_session_factory
+
+
+async def dispose_async_engine() -> None:
+    global _async_engine, _async_session_factory
+    with _async_lock:
+        async_engine, _async_engine, _async_session_factory = _async_engine, None, None
+    if async_engine is not None:
+        await async_engine.dispose()
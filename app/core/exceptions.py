@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+
+class PrintTimeoutError(RuntimeError):
+    """打印执行超过了允许的截止时间"""
+
+
+class PrinterUnavailableError(RuntimeError):
+    """打印机无法连接或不可用"""
+
+
+class PrintContentError(RuntimeError):
+    """打印内容无法处理，重试也不会成功"""
@@ -7,14 +7,19 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.api import api_router
 from app.core.config import settings
-from app.core.database import Base, engine, session_scope
+from app.core.database import dispose_async_engine, run_migrations, session_scope
 from app.services import job_service, user_service
+from app.services.cache_invalidation import cache_invalidation_feed
+from app.services.log_service import job_log_retention, job_log_sink
+from app.services.payload_archive import payload_archiver
+from app.services.printer_health import printer_health
 from app.tasks.manager import job_queue
+from app.tasks.office_pool import office_pools
 from app.web import web_router
 
 
 def create_application() -> FastAPI:
-    Base.metadata.create_all(bind=engine)
+    run_migrations()
 
     app = FastAPI(title=settings.app_name)
     app.add_middleware(
@@ -39,7 +44,29 @@ def create_application() -> FastAPI:
                 printer_service.sync_printers(db)
             except Exception:
                 pass
+            if not job_queue.is_running:
+                job_service.restore_pending_jobs(db)
         job_queue.configure(job_service.process_print_job)
+        printer_health.start(settings.printer_health_interval_seconds)
+        job_log_retention.start(settings.job_log_retention_interval_seconds)
+        payload_archiver.start(settings.payload_archive_interval_seconds)
+        cache_invalidation_feed.start()
+        if settings.office_pool_prewarm:
+            office_pools.start()
+
+    @app.on_event("shutdown")
+    def on_shutdown() -> None:
+        printer_health.stop()
+        job_log_retention.stop()
+        payload_archiver.stop()
+        cache_invalidation_feed.stop()
+        office_pools.shutdown()
+        job_log_sink.stop()
+
+    @app.on_event("shutdown")
+    async def dispose_async_database() -> None:
+        # 异步连接绑定在当前事件循环上，关闭时释放
+        await dispose_async_engine()
 
     return app
 
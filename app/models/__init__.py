@@ -1,11 +1,19 @@
 from .user import User
 from .printer import Printer
+from .printer_group import PrinterGroup
+from .label_template import LabelTemplate
 from .print_job import PrintJob
 from .job_log import JobLog
+from .idempotency_key import IdempotencyKey
+from .cache_invalidation import CacheInvalidation
 
 __all__ = [
     "User",
     "Printer",
+    "PrinterGroup",
+    "LabelTemplate",
     "PrintJob",
     "JobLog",
+    "IdempotencyKey",
+    "CacheInvalidation",
 ]
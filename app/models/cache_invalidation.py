@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from sqlalchemy import Column, DateTime, Integer, String
+
+from app.core.database import Base
+from app.core.time_utils import now_shanghai
+
+
+class CacheInvalidation(Base):
+    """多进程部署时各进程内存缓存的失效通知，按自增 ID 顺序读取"""
+
+    __tablename__ = "cache_invalidations"
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(20), nullable=False)  # job / user
+    key = Column(String(200), nullable=False)
+    origin = Column(String(32), nullable=False)  # 发出通知的进程，自己的通知不再处理
+    created_at = Column(DateTime(timezone=True), default=now_shanghai, nullable=False, index=True)
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, UniqueConstraint
+
+from app.core.database import Base
+from app.core.time_utils import now_shanghai
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (UniqueConstraint("owner_id", "key", name="uq_idempotency_owner_key"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    key = Column(String(200), nullable=False)
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    job_id = Column(Integer, ForeignKey("print_jobs.id", ondelete="CASCADE"), nullable=True)  # 为空表示首个请求仍在处理
+    fingerprint = Column(String(64), nullable=True)  # 请求内容摘要，同一个键提交不同内容时拒绝
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), default=now_shanghai, nullable=False)
@@ -13,4 +13,4 @@ class JobLog(Base):
     job_id = Column(Integer, ForeignKey("print_jobs.id", ondelete="CASCADE"), nullable=False, index=True)
     level = Column(String(20), default="info")
     message = Column(Text, nullable=False)
-    created_at = Column(DateTime(timezone=True), default=now_shanghai, nullable=False)
+    created_at = Column(DateTime(timezone=True), default=now_shanghai, nullable=False, index=True)
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+
+from app.core.database import Base
+from app.core.time_utils import now_shanghai
+
+
+class LabelTemplate(Base):
+    __tablename__ = "label_templates"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(200), unique=True, nullable=False)
+    description = Column(String(200), nullable=True)
+    width_mm = Column(Integer, nullable=False)
+    height_mm = Column(Integer, nullable=False)
+    dpi = Column(Integer, default=203, nullable=False)
+    output = Column(String(20), default="raster", nullable=False)  # raster=位图打印, zpl=输出 ZPL 指令
+    elements = Column(Text, nullable=False)  # JSON 格式的元素列表
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime(timezone=True), default=now_shanghai, nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=now_shanghai, onupdate=now_shanghai, nullable=False)
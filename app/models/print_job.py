@@ -1,19 +1,39 @@
 from __future__ import annotations
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, LargeBinary, String, Text
+from typing import Iterator
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, LargeBinary, String, Text, text
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
 from app.core.time_utils import now_shanghai
+from app.utils.payload_codec import decode_payload, iter_decoded
 
 
 class PrintJob(Base):
     __tablename__ = "print_jobs"
+    __table_args__ = (
+        # 索引与 migrations/versions 中的迁移保持一致
+        Index("ix_print_jobs_status_priority_created", "status", "priority", "created_at"),
+        # 覆盖调度器按打印机统计排队页数的查询，无需回表
+        Index("ix_print_jobs_printer_status", "printer_id", "status", "copies"),
+        # 合并打印按优先级挑选同一打印机的排队任务
+        Index(
+            "ix_print_jobs_queued_by_printer",
+            "printer_id",
+            "priority",
+            "id",
+            sqlite_where=text("status = 'queued'"),
+            postgresql_where=text("status = 'queued'"),
+        ),
+        # 归档扫描：未归档的原始任务按更新时间顺序读取，两个 IS NULL 等值前缀让规划器稳定选中该索引
+        Index("ix_print_jobs_payload_pending", "payload_archived_at", "source_job_id", "updated_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(200), nullable=False)
-    status = Column(String(50), default="queued", index=True)
-    priority = Column(Integer, default=5, index=True)
+    status = Column(String(50), default="queued")
+    priority = Column(Integer, default=5)
     copies = Column(Integer, default=1)
     media_size = Column(String(50), nullable=True)
     color_mode = Column(String(30), nullable=True)
@@ -21,17 +41,52 @@ class PrintJob(Base):
     fit_mode = Column(String(20), default="fill", nullable=True)  # fill, contain, cover, stretch
     auto_rotate = Column(Integer, default=1, nullable=True)  # 1=True, 0=False (SQLite 兼容)
     enhance_quality = Column(Integer, default=1, nullable=True)  # 1=True, 0=False (质量增强)
+    imposition = Column(String(20), nullable=True)  # grid, shelf（多图拼版，为空则每页一张）
+    batch_id = Column(String(64), nullable=True, index=True)  # 客户端指定的批次号，用于批量操作
     file_type = Column(String(20), nullable=False)
     content = Column(LargeBinary, nullable=False)
-    owner_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    content_codec = Column(String(20), nullable=True)  # 内容的压缩方式，为空表示未压缩
+    content_hash = Column(String(64), nullable=True)  # 未压缩内容的 SHA-256
+    source_job_id = Column(Integer, ForeignKey("print_jobs.id"), nullable=True, index=True)  # 重印任务引用的原任务
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
     printer_id = Column(Integer, ForeignKey("printers.id"), nullable=True)
+    template_id = Column(Integer, ForeignKey("label_templates.id", ondelete="SET NULL"), nullable=True)
     error_message = Column(Text, nullable=True)
-    created_at = Column(DateTime(timezone=True), default=now_shanghai, nullable=False)
+    attempts = Column(Integer, default=0, server_default="0", nullable=True)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=True)
+    payload_archived_at = Column(DateTime(timezone=True), nullable=True)  # 打印内容已移出数据库的时间
+    payload_archive_path = Column(String(500), nullable=True)  # 归档文件路径，为空表示内容已直接删除
+    created_at = Column(DateTime(timezone=True), default=now_shanghai, nullable=False, index=True)
     updated_at = Column(DateTime(timezone=True), default=now_shanghai, onupdate=now_shanghai, nullable=False)
 
     owner = relationship("User", backref="jobs")
     printer = relationship("Printer", backref="jobs")
+    template = relationship("LabelTemplate")
+    source_job = relationship("PrintJob", remote_side=[id])
 
     @property
     def printer_name(self) -> str | None:
         return self.printer.name if self.printer else None
+
+    @property
+    def payload_source(self) -> PrintJob:
+        """存储打印内容的任务：重印任务不复制数据，内容保存在原任务中"""
+        return self.source_job if self.source_job_id is not None else self
+
+    @property
+    def print_content(self) -> bytes:
+        """实际打印的内容（已解压），同一实例只解压一次"""
+        source = self.payload_source
+        cached = self.__dict__.get("_print_content_cache")
+        if cached is None or cached[0] is not source.content:
+            cached = (source.content, decode_payload(source.content, source.content_codec))
+            self.__dict__["_print_content_cache"] = cached
+        return cached[1]
+
+    def iter_print_content(self) -> Iterator[bytes]:
+        """分块返回实际打印的内容，用于写入临时文件"""
+        cached = self.__dict__.get("_print_content_cache")
+        source = self.payload_source
+        if cached is not None and cached[0] is source.content:
+            return iter_decoded(cached[1], None)
+        return iter_decoded(source.content, source.content_codec)
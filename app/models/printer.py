@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from sqlalchemy import Boolean, Column, DateTime, Integer, String
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, String, text
+from sqlalchemy.orm import relationship
 
 from app.core.database import Base
 from app.core.time_utils import now_shanghai
@@ -8,10 +9,24 @@ from app.core.time_utils import now_shanghai
 
 class Printer(Base):
     __tablename__ = "printers"
+    __table_args__ = (
+        # 只索引默认打印机这一行，查询须写成 is_default = 1（IS 1 不会命中部分索引）
+        Index(
+            "ix_printers_default",
+            "is_default",
+            sqlite_where=text("is_default = 1"),
+            postgresql_where=text("is_default"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(200), unique=True, nullable=False)
     is_default = Column(Boolean, default=False)
     status = Column(String(50), default="unknown")
     location = Column(String(200), nullable=True)
+    group_id = Column(Integer, ForeignKey("printer_groups.id", ondelete="SET NULL"), nullable=True, index=True)
+    coalesce_window_ms = Column(Integer, default=0, server_default="0", nullable=True)  # 0=不合并
+    coalesce_max_jobs = Column(Integer, default=0, server_default="0", nullable=True)  # 0=不限数量
     created_at = Column(DateTime(timezone=True), default=now_shanghai, nullable=False)
+
+    group = relationship("PrinterGroup", backref="printers")
@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from sqlalchemy import Column, DateTime, Integer, String
+
+from app.core.database import Base
+from app.core.time_utils import now_shanghai
+
+
+class PrinterGroup(Base):
+    __tablename__ = "printer_groups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(200), unique=True, nullable=False)
+    description = Column(String(200), nullable=True)
+    created_at = Column(DateTime(timezone=True), default=now_shanghai, nullable=False)
@@ -1,8 +1,9 @@
 from .user import UserCreate, UserRead, UserUpdate
 from .auth import Token, TokenPayload, LoginRequest, ApiKeyCreate
-from .printer import PrinterCreate, PrinterRead, PrinterUpdate
-from .print_job import PrintJobCreate, PrintJobRead, PrintJobUpdate, PrintJobStatus
+from .printer import PrinterCreate, PrinterRead, PrinterUpdate, PrinterGroupCreate, PrinterGroupRead, PrinterHealthRead
+from .print_job import PrintJobCreate, PrintJobRead, PrintJobReprint, PrintJobUpdate, PrintJobStatus, DeadLetterRequeue, JobFilter, BulkJobReprioritize, BulkJobResult
 from .log import JobLogRead
+from .label_template import LabelTemplateCreate, LabelTemplateRead, LabelTemplateUpdate
 
 __all__ = [
     "UserCreate",
@@ -15,9 +16,20 @@ __all__ = [
     "PrinterCreate",
     "PrinterRead",
     "PrinterUpdate",
+    "PrinterGroupCreate",
+    "PrinterGroupRead",
+    "PrinterHealthRead",
     "PrintJobCreate",
     "PrintJobRead",
+    "PrintJobReprint",
     "PrintJobUpdate",
     "PrintJobStatus",
+    "DeadLetterRequeue",
+    "JobFilter",
+    "BulkJobReprioritize",
+    "BulkJobResult",
     "JobLogRead",
+    "LabelTemplateCreate",
+    "LabelTemplateRead",
+    "LabelTemplateUpdate",
 ]
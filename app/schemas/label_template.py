@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+
+from app.utils.label_renderer import ELEMENT_TYPES, is_variable
+
+
+LABEL_OUTPUTS = ("raster", "zpl")
+
+
+class LabelElement(BaseModel):
+    type: str
+    x: int = Field(default=0, ge=0)
+    y: int = Field(default=0, ge=0)
+    text: Optional[str] = None  # 文本、条码、二维码内容，"{字段名}" 为记录中的变量
+    field: Optional[str] = None  # 图片元素的记录字段名（Base64 图片）
+    image_base64: Optional[str] = None  # 静态图片
+    width: Optional[int] = Field(default=None, ge=0)
+    height: Optional[int] = Field(default=None, ge=0)
+    size: Optional[int] = Field(default=None, ge=1)  # 字号、条码模块宽度或二维码单元大小
+    thickness: Optional[int] = Field(default=None, ge=1)
+
+    @field_validator("type")
+    @classmethod
+    def validate_type(cls, value: str) -> str:
+        if value not in ELEMENT_TYPES:
+            raise ValueError("模板元素类型不受支持")
+        return value
+
+
+class LabelTemplateBase(BaseModel):
+    name: str = Field(..., max_length=200)
+    description: Optional[str] = Field(default=None, max_length=200)
+    width_mm: int = Field(..., ge=1, le=1000)
+    height_mm: int = Field(..., ge=1, le=1000)
+    dpi: int = Field(default=203, ge=72, le=1200)
+    output: str = Field(default="raster")  # raster=位图打印, zpl=输出 ZPL 指令
+    elements: List[LabelElement] = Field(default_factory=list)
+
+    @field_validator("output")
+    @classmethod
+    def validate_output(cls, value: str) -> str:
+        if value not in LABEL_OUTPUTS:
+            raise ValueError("模板输出方式不受支持")
+        return value
+
+    @model_validator(mode="after")
+    def validate_zpl_elements(self):
+        if self.output == "zpl":
+            for element in self.elements:
+                if element.type == "image" and is_variable(element.dict()):
+                    raise ValueError("ZPL 输出不支持可变图片字段")
+        return self
+
+
+class LabelTemplateCreate(LabelTemplateBase):
+    pass
+
+
+class LabelTemplateUpdate(BaseModel):
+    description: Optional[str] = Field(default=None, max_length=200)
+    width_mm: Optional[int] = Field(default=None, ge=1, le=1000)
+    height_mm: Optional[int] = Field(default=None, ge=1, le=1000)
+    dpi: Optional[int] = Field(default=None, ge=72, le=1200)
+    output: Optional[str] = None
+    elements: Optional[List[LabelElement]] = None
+
+    @field_validator("output")
+    @classmethod
+    def validate_output(cls, value: Optional[str]) -> Optional[str]:
+        if value is not None and value not in LABEL_OUTPUTS:
+            raise ValueError("模板输出方式不受支持")
+        return value
+
+
+class LabelTemplateRead(LabelTemplateBase):
+    id: int
+    owner_id: Optional[int]
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @field_validator("elements", mode="before")
+    @classmethod
+    def parse_elements(cls, value):
+        if isinstance(value, str):
+            return json.loads(value)
+        return value
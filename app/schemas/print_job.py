@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel, Field, ConfigDict, field_validator
 
+from app.utils.print_utils import IMPOSITION_LAYOUTS
+
 
 ALLOWED_FILE_TYPES = {
     "pdf",
@@ -18,6 +20,9 @@ ALLOWED_FILE_TYPES = {
     "docx",
     "xls",
     "xlsx",
+    "csv",
+    "json",
+    "jsonl",
 }
 
 
@@ -33,11 +38,15 @@ class PrintJobBase(BaseModel):
     fit_mode: Optional[str] = Field(default="fill", max_length=20)  # fill=填满, contain=完整显示
     auto_rotate: Optional[bool] = Field(default=True)  # 自动旋转以最佳适配纸张
     enhance_quality: Optional[bool] = Field(default=True)  # 增强打印质量（锐化、对比度优化）
+    imposition: Optional[str] = Field(default=None, max_length=20)  # 多图拼版：grid=网格, shelf=装箱
+    template_id: Optional[int] = None  # 标签模板，内容为 csv/json/jsonl 记录数据
+    batch_id: Optional[str] = Field(default=None, max_length=64)  # 批次号，可按批次批量取消、调整优先级
 
 
 class PrintJobCreate(PrintJobBase):
     file_type: str = Field(..., max_length=20)
     content_base64: str
+    printer_group: Optional[str] = Field(default=None, max_length=200)
 
     @field_validator("file_type")
     @classmethod
@@ -47,6 +56,16 @@ class PrintJobCreate(PrintJobBase):
             raise ValueError("文件类型不受支持")
         return normalized
 
+    @field_validator("imposition")
+    @classmethod
+    def validate_imposition(cls, value: Optional[str]) -> Optional[str]:
+        if value is None:
+            return None
+        normalized = value.lower()
+        if normalized not in IMPOSITION_LAYOUTS:
+            raise ValueError("拼版方式不受支持")
+        return normalized
+
 
 class PrintJobUpdate(BaseModel):
     priority: Optional[int] = Field(default=None, ge=1, le=10)
@@ -54,13 +73,24 @@ class PrintJobUpdate(BaseModel):
     status: Optional[str] = None
 
 
+class PrintJobReprint(BaseModel):
+    copies: Optional[int] = Field(default=None, ge=1)
+    printer_name: Optional[str] = None
+    media_size: Optional[str] = None
+    priority: Optional[int] = Field(default=None, ge=1, le=10)
+
+
 class PrintJobRead(PrintJobBase):
     id: int
     status: str
     file_type: str
+    source_job_id: Optional[int] = None
     created_at: datetime
     updated_at: datetime
     error_message: Optional[str]
+    attempts: Optional[int] = 0
+    next_attempt_at: Optional[datetime] = None
+    payload_archived_at: Optional[datetime] = None
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -68,3 +98,29 @@ class PrintJobRead(PrintJobBase):
 class PrintJobStatus(BaseModel):
     status: str
     error_message: Optional[str]
+
+
+class DeadLetterRequeue(BaseModel):
+    job_ids: Optional[List[int]] = None
+
+
+class JobFilter(BaseModel):
+    """批量操作的筛选条件，多个条件同时满足"""
+
+    job_ids: Optional[List[int]] = None
+    owner_id: Optional[int] = None
+    printer_name: Optional[str] = None
+    statuses: Optional[List[str]] = None
+    batch_id: Optional[str] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    # 不设置任何条件时必须显式指定 all=true 才会作用于全部任务
+    all: bool = False
+
+
+class BulkJobReprioritize(JobFilter):
+    priority: int = Field(..., ge=1, le=10)
+
+
+class BulkJobResult(BaseModel):
+    affected: int
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel, Field, ConfigDict
 
@@ -11,6 +11,9 @@ class PrinterBase(BaseModel):
     is_default: bool = False
     status: Optional[str] = None
     location: Optional[str] = Field(default=None, max_length=200)
+    group_id: Optional[int] = None
+    coalesce_window_ms: Optional[int] = Field(default=0, ge=0)
+    coalesce_max_jobs: Optional[int] = Field(default=0, ge=0)
 
 
 class PrinterCreate(PrinterBase):
@@ -21,6 +24,9 @@ class PrinterUpdate(BaseModel):
     is_default: Optional[bool] = None
     status: Optional[str] = None
     location: Optional[str] = Field(default=None, max_length=200)
+    group_id: Optional[int] = None
+    coalesce_window_ms: Optional[int] = Field(default=None, ge=0)
+    coalesce_max_jobs: Optional[int] = Field(default=None, ge=0)
 
 
 class PrinterRead(PrinterBase):
@@ -28,3 +34,28 @@ class PrinterRead(PrinterBase):
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class PrinterGroupBase(BaseModel):
+    name: str = Field(..., max_length=200)
+    description: Optional[str] = Field(default=None, max_length=200)
+
+
+class PrinterGroupCreate(PrinterGroupBase):
+    printer_ids: List[int] = Field(default_factory=list)
+
+
+class PrinterGroupRead(PrinterGroupBase):
+    id: int
+    created_at: datetime
+    printers: List[PrinterRead] = Field(default_factory=list)
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PrinterHealthRead(BaseModel):
+    printer_id: int
+    state: str
+    consecutive_failures: int
+    last_error: Optional[str]
+    last_checked_at: Optional[datetime]
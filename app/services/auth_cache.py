@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.config import settings
+from app.models import User
+from app.services.cache_invalidation import cache_invalidation_feed
+
+
+def _snapshot(user: User) -> User:
+    """复制用户的全部列，得到不依赖任何会话、属性不会过期的用户对象"""
+    copy = User(**{column.key: getattr(user, column.key) for column in User.__table__.columns})
+    make_transient_to_detached(copy)
+    return copy
+
+
+class AuthCache:
+    """认证结果缓存
+
+    缓存已验证签名的 JWT（到 ``exp`` 为止）以及按用户名、API Key 查到的用户，
+    已认证的请求在缓存命中时不再解码 Token，也不查询数据库。用户缓存最多保留 ``ttl`` 秒；
+    用户被修改、停用或重新生成 API Key 时由 :func:`invalidate_user` 立即删除，
+    多进程部署时通过 :data:`cache_invalidation_feed` 通知其他进程。
+    缓存的用户是与会话分离的副本。``ttl`` 为 0 时不缓存。
+    """
+
+    def __init__(self, ttl: float = 30, max_entries: int = 10000) -> None:
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self._lock = threading.Lock()
+        self._tokens: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._users: "OrderedDict[Tuple[str, str], Tuple[User, float]]" = OrderedDict()
+        self._generation = 0
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    @property
+    def generation(self) -> int:
+        """查询数据库前记下，回填时传给 :meth:`put_user`"""
+        return self._generation
+
+    def get_token(self, token: str) -> Optional[str]:
+        """返回已验证 Token 的用户名，未缓存或已过期时返回 ``None``"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._tokens.get(token)
+            if entry is None or entry[1] <= time.time():
+                self._tokens.pop(token, None)
+                return None
+            self._tokens.move_to_end(token)
+            return entry[0]
+
+    def put_token(self, token: str, subject: str, expires_at: Optional[float]) -> None:
+        if not self.enabled or expires_at is None:
+            return
+        with self._lock:
+            self._tokens[token] = (subject, expires_at)
+            self._tokens.move_to_end(token)
+            while len(self._tokens) > self.max_entries:
+                self._tokens.popitem(last=False)
+
+    def get_user(self, kind: str, value: str) -> Optional[User]:
+        """按 ``username`` 或 ``api_key`` 查找缓存的用户"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._users.get((kind, value))
+            if entry is None or entry[1] <= time.monotonic():
+                self._users.pop((kind, value), None)
+                self._misses += 1
+                return None
+            self._users.move_to_end((kind, value))
+            self._hits += 1
+            return entry[0]
+
+    def put_user(self, kind: str, value: str, user: User, generation: int) -> User:
+        """缓存查询到的用户并返回其副本；查询期间发生过失效时只返回副本不缓存"""
+        copy = _snapshot(user)
+        if not self.enabled:
+            return copy
+        with self._lock:
+            if generation == self._generation:
+                self._users[(kind, value)] = (copy, time.monotonic() + self.ttl)
+                self._users.move_to_end((kind, value))
+                while len(self._users) > self.max_entries:
+                    self._users.popitem(last=False)
+        return copy
+
+    def invalidate(self, user_ids: Iterable) -> None:
+        ids = {int(user_id) for user_id in user_ids}
+        with self._lock:
+            self._generation += 1
+            for key in [key for key, (user, _) in self._users.items() if user.id in ids]:
+                del self._users[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._tokens.clear()
+            self._users.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"tokens": len(self._tokens), "users": len(self._users), "hits": self._hits, "misses": self._misses}
+
+
+auth_cache = AuthCache(ttl=settings.auth_cache_ttl_seconds, max_entries=settings.auth_cache_size)
+cache_invalidation_feed.register("user", auth_cache.invalidate)
+
+
+def invalidate_user(user_id: int) -> None:
+    """用户信息或 API Key 变更提交后调用"""
+    auth_cache.invalidate([user_id])
+    cache_invalidation_feed.publish("user", [user_id])
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import threading
+import uuid
+from datetime import timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+
+from loguru import logger
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.time_utils import now_shanghai
+from app.models import CacheInvalidation
+
+
+class CacheInvalidationFeed:
+    """多进程内存缓存的失效通知
+
+    只有一个工作进程时不做任何事。配置多个工作进程时，修改了缓存数据的进程把失效的键
+    写入 ``cache_invalidations`` 表，各进程的后台线程每 ``interval`` 秒读取其他进程的新通知，
+    交给按类别注册的处理函数删除本地缓存项；其他进程的缓存最多滞后一个间隔。
+    超过 ``retention`` 的通知由各进程顺带删除。
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        interval: float = 0.5,
+        retention: float = 600,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ) -> None:
+        self.enabled = enabled
+        self._session_factory = session_factory
+        self.interval = interval
+        self.retention = retention
+        self.origin = uuid.uuid4().hex
+        self._handlers: Dict[str, Callable[[List[str]], None]] = {}
+        self._last_id: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._published = 0
+        self._received = 0
+
+    def register(self, kind: str, handler: Callable[[List[str]], None]) -> None:
+        self._handlers[kind] = handler
+
+    def publish(self, kind: str, keys: Iterable) -> None:
+        """通知其他进程删除 ``kind`` 类缓存中的 ``keys``，需在修改提交后调用"""
+        if not self.enabled:
+            return
+        rows = [{"kind": kind, "key": str(key), "origin": self.origin, "created_at": now_shanghai()} for key in keys]
+        if not rows:
+            return
+        try:
+            with self._session_factory() as db:
+                db.execute(insert(CacheInvalidation), rows)
+                db.commit()
+        except Exception:
+            logger.exception("写入缓存失效通知失败")
+            return
+        self._published += len(rows)
+
+    def poll_once(self) -> int:
+        """处理其他进程的新通知，返回处理的条数"""
+        with self._session_factory() as db:
+            if self._last_id is None:
+                # 启动前的通知与本进程的缓存无关
+                self._last_id = db.execute(select(func.max(CacheInvalidation.id))).scalar() or 0
+                return 0
+            rows = db.execute(
+                select(CacheInvalidation.id, CacheInvalidation.kind, CacheInvalidation.key, CacheInvalidation.origin)
+                .where(CacheInvalidation.id > self._last_id)
+                .order_by(CacheInvalidation.id)
+            ).all()
+        if not rows:
+            return 0
+        keys: Dict[str, List[str]] = {}
+        for _, kind, key, origin in rows:
+            if origin != self.origin:
+                keys.setdefault(kind, []).append(key)
+        for kind, items in keys.items():
+            handler = self._handlers.get(kind)
+            if handler is not None:
+                handler(items)
+        self._last_id = rows[-1].id
+        received = sum(len(items) for items in keys.values())
+        self._received += received
+        return received
+
+    def purge(self) -> int:
+        cutoff = now_shanghai() - timedelta(seconds=self.retention)
+        with self._session_factory() as db:
+            deleted = db.execute(delete(CacheInvalidation).where(CacheInvalidation.created_at < cutoff)).rowcount
+            db.commit()
+            return deleted
+
+    def stats(self) -> Dict[str, int]:
+        return {"enabled": int(self.enabled), "published": self._published, "received": self._received}
+
+    def start(self) -> None:
+        if not self.enabled or self.interval <= 0:
+            return
+        if self._thread and self._thread.is_alive():
+            if not self._stop.is_set():
+                return
+            self._thread.join()
+        self._stop.clear()
+        if self._last_id is None:
+            # 在开始处理请求前记下当前位置
+            self.poll_once()
+        self._thread = threading.Thread(target=self._run, name="cache-invalidation", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        polls = 0
+        purge_every = max(1, int(60 / self.interval))
+        while True:
+            try:
+                self.poll_once()
+                polls += 1
+                if polls % purge_every == 0:
+                    self.purge()
+            except Exception:
+                logger.exception("读取缓存失效通知失败")
+            if self._stop.wait(self.interval):
+                break
+
+
+cache_invalidation_feed = CacheInvalidationFeed(
+    enabled=settings.server_workers > 1,
+    interval=settings.cache_invalidation_interval_ms / 1000,
+)
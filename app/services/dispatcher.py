@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Printer, PrintJob
+
+
+PENDING_JOB_STATUSES = ("queued", "processing", "retrying")
+
+
+class PrinterDispatcher:
+    """在打印机分组内按预计完成时间选择打印机
+
+    预计完成时间 = (排队中的页数 + 本任务页数) / 该打印机的滚动打印速度。
+    页数按份数估算；打印速度是每次打印完成后测得的每秒页数的指数加权移动平均，
+    尚未测量过的打印机使用 ``dispatch_default_pages_per_second``。
+    """
+
+    def __init__(self) -> None:
+        self._pages_per_second: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def record_completion(self, printer_id: int, pages: int, seconds: float) -> None:
+        if pages <= 0 or seconds <= 0:
+            return
+        measured = pages / seconds
+        alpha = settings.dispatch_speed_smoothing
+        with self._lock:
+            previous = self._pages_per_second.get(printer_id)
+            self._pages_per_second[printer_id] = measured if previous is None else alpha * measured + (1 - alpha) * previous
+
+    def pages_per_second(self, printer_id: int) -> float:
+        with self._lock:
+            speed = self._pages_per_second.get(printer_id)
+        return speed if speed else settings.dispatch_default_pages_per_second
+
+    def queued_pages(self, db: Session, printer_ids: Iterable[int]) -> Dict[int, int]:
+        printer_ids = list(printer_ids)
+        if not printer_ids:
+            return {}
+        rows = (
+            db.query(PrintJob.printer_id, func.coalesce(func.sum(PrintJob.copies), 0))
+            .filter(PrintJob.printer_id.in_(printer_ids), PrintJob.status.in_(PENDING_JOB_STATUSES))
+            .group_by(PrintJob.printer_id)
+            .all()
+        )
+        return {printer_id: int(pages) for printer_id, pages in rows}
+
+    def estimate_completion(self, printer_id: int, queued_pages: int, job_pages: int) -> float:
+        return (queued_pages + job_pages) / self.pages_per_second(printer_id)
+
+    def choose(
+        self,
+        db: Session,
+        candidates: List[Printer],
+        job_pages: int,
+        is_available: Optional[Callable[[int], bool]] = None,
+    ) -> Optional[Printer]:
+        if is_available is not None:
+            candidates = [printer for printer in candidates if is_available(printer.id)]
+        if not candidates:
+            return None
+        depths = self.queued_pages(db, (printer.id for printer in candidates))
+        return min(
+            candidates,
+            key=lambda printer: (self.estimate_completion(printer.id, depths.get(printer.id, 0), job_pages), printer.id),
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            speeds = dict(self._pages_per_second)
+        return {
+            "default_pages_per_second": settings.dispatch_default_pages_per_second,
+            "pages_per_second": {str(printer_id): round(speed, 4) for printer_id, speed in sorted(speeds.items())},
+        }
+
+
+printer_dispatcher = PrinterDispatcher()
@@ -0,0 +1,139 @@
+"""
+任务提交幂等性
+
+客户端通过 ``Idempotency-Key`` 请求头携带的键按用户记录在 idempotency_keys 表中：
+首个请求插入一行占位（job_id 为空），任务创建时在同一事务中写入 job_id，
+之后的重复请求直接返回原任务。并发的重复请求由唯一约束决定谁先占用，
+后到的请求等待该键自己的事件（其他进程中的请求则轮询数据库），不持有全局锁。
+
+占位只有短暂的租期，进程在创建任务前退出时该键很快可以重新使用；写入 job_id 时才延长到
+``idempotency_ttl_seconds``。每个键同时记录请求内容的摘要，同一个键提交不同的内容返回 422。
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from datetime import timedelta
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.time_utils import now_shanghai
+from app.models import IdempotencyKey
+
+
+POLL_SECONDS = 0.05
+# 占位租期为等待时间的两倍（至少几秒），重复请求等待期间不会接管仍在处理的首个请求
+PLACEHOLDER_LEASE_MIN_SECONDS = 5
+PURGE_INTERVAL_SECONDS = 60
+
+_inflight: Dict[Tuple[int, str], threading.Event] = {}
+_inflight_lock = threading.Lock()
+_last_purge = 0.0
+
+
+def _scoped(db: Session, owner_id: int, key: str):
+    return db.query(IdempotencyKey).filter(IdempotencyKey.owner_id == owner_id, IdempotencyKey.key == key)
+
+
+def fingerprint(content_hash: str, title: str, printer_name: Optional[str]) -> str:
+    """请求内容摘要：打印内容哈希、标题与打印机"""
+    return hashlib.sha256("\0".join([content_hash, title, printer_name or ""]).encode("utf-8")).hexdigest()
+
+
+def _placeholder_lease() -> float:
+    return max(settings.idempotency_wait_seconds * 2, PLACEHOLDER_LEASE_MIN_SECONDS)
+
+
+def purge_expired(db: Session) -> int:
+    """删除过期的幂等键"""
+    removed = db.query(IdempotencyKey).filter(IdempotencyKey.expires_at <= now_shanghai()).delete(synchronize_session=False)
+    db.commit()
+    return removed
+
+
+def _maybe_purge(db: Session) -> None:
+    global _last_purge
+    if time.monotonic() - _last_purge < PURGE_INTERVAL_SECONDS:
+        return
+    _last_purge = time.monotonic()
+    purge_expired(db)
+
+
+def claim(db: Session, owner_id: int, key: str, request_fingerprint: Optional[str] = None) -> Optional[int]:
+    """
+    占用幂等键
+
+    成功占用时返回 ``None``，调用方随后创建任务并调用 :func:`attach`，失败时调用 :func:`release`；
+    键已对应任务时返回原任务 ID。首个请求仍在处理时最多等待 ``idempotency_wait_seconds`` 秒，
+    超时返回 409；键已用于内容不同的请求时返回 422。
+    """
+    _maybe_purge(db)
+    scope = (owner_id, key)
+    deadline = time.monotonic() + settings.idempotency_wait_seconds
+    while True:
+        expires_at = now_shanghai() + timedelta(seconds=_placeholder_lease())
+        db.add(IdempotencyKey(key=key, owner_id=owner_id, fingerprint=request_fingerprint, expires_at=expires_at))
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+        else:
+            with _inflight_lock:
+                _inflight[scope] = threading.Event()
+            return None
+
+        # 已过期的键视为不存在，删除后重新占用
+        expired = _scoped(db, owner_id, key).filter(IdempotencyKey.expires_at <= now_shanghai()).delete(synchronize_session=False)
+        db.commit()
+        if expired:
+            continue
+        row = _scoped(db, owner_id, key).with_entities(IdempotencyKey.job_id, IdempotencyKey.fingerprint).first()
+        # 结束读事务，等待期间不持有数据库锁和快照
+        db.rollback()
+        if row is None:
+            # 首个请求失败后已释放该键
+            continue
+        if request_fingerprint and row.fingerprint and row.fingerprint != request_fingerprint:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="幂等键已用于内容不同的请求，请更换幂等键"
+            )
+        if row.job_id is not None:
+            return row.job_id
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="相同幂等键的请求正在处理，请稍后重试")
+        with _inflight_lock:
+            event = _inflight.get(scope)
+        if event is not None:
+            event.wait(remaining)
+        else:
+            time.sleep(min(POLL_SECONDS, remaining))
+
+
+def attach(db: Session, owner_id: int, key: str, job_id: int) -> None:
+    """记录幂等键对应的任务并延长到完整的保留期，不提交事务，与任务在同一事务中写入"""
+    expires_at = now_shanghai() + timedelta(seconds=settings.idempotency_ttl_seconds)
+    _scoped(db, owner_id, key).update(
+        {IdempotencyKey.job_id: job_id, IdempotencyKey.expires_at: expires_at}, synchronize_session=False
+    )
+
+
+def finish(owner_id: int, key: str) -> None:
+    """唤醒等待该键的重复请求"""
+    with _inflight_lock:
+        event = _inflight.pop((owner_id, key), None)
+    if event is not None:
+        event.set()
+
+
+def release(db: Session, owner_id: int, key: str) -> None:
+    """任务创建失败时释放幂等键，等待中的重复请求会重新占用"""
+    _scoped(db, owner_id, key).filter(IdempotencyKey.job_id.is_(None)).delete(synchronize_session=False)
+    db.commit()
+    finish(owner_id, key)
@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, List, Optional, Set
+
+from app.core.config import settings
+from app.core.time_utils import now_shanghai
+
+# 等待任务结束的请求在任务进入这些状态时被唤醒
+FINISHED_JOB_STATUSES = {"completed", "failed", "dead_letter", "cancelled"}
+
+
+@dataclass
+class JobEvent:
+    """任务事件：``status`` 为状态变化，``log`` 为新写入的任务日志"""
+
+    id: int
+    type: str
+    job_id: int
+    owner_id: Optional[int]
+    printer_id: Optional[int]
+    data: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "type": self.type, "job_id": self.job_id, **self.data}
+
+
+class JobSubscription:
+    """单个订阅者的事件缓冲
+
+    发布方不会因为消费慢的订阅者阻塞：同一任务尚未取走的状态事件合并为最新的一条，
+    缓冲超过 ``max_pending`` 条时丢弃最早的日志事件（没有日志事件时丢弃最早的状态事件），
+    丢弃的数量随下一个事件交给订阅者，客户端可据此重新查询任务状态。
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        job_id: Optional[int] = None,
+        owner_id: Optional[int] = None,
+        printer_id: Optional[int] = None,
+        max_pending: int = 256,
+    ) -> None:
+        self.job_id = job_id
+        self.owner_id = owner_id
+        self.printer_id = printer_id
+        self.max_pending = max(1, max_pending)
+        self._loop = loop
+        self._ready = asyncio.Event()
+        self._lock = threading.Lock()
+        self._pending: "OrderedDict[Hashable, JobEvent]" = OrderedDict()
+        self._dropped = 0
+        self.closed = False
+
+    def matches(self, event: JobEvent) -> bool:
+        if self.job_id is not None and event.job_id != self.job_id:
+            return False
+        if self.owner_id is not None and event.owner_id != self.owner_id:
+            return False
+        if self.printer_id is not None and event.printer_id != self.printer_id:
+            return False
+        return True
+
+    def push(self, event: JobEvent) -> str:
+        """放入事件（可在任意线程调用），返回 ``queued``、``coalesced`` 或 ``dropped``"""
+        key: Hashable = ("status", event.job_id) if event.type == "status" else event.id
+        with self._lock:
+            if self.closed:
+                return "dropped"
+            was_empty = not self._pending
+            result = "queued"
+            if key in self._pending:
+                del self._pending[key]
+                result = "coalesced"
+            self._pending[key] = event
+            if len(self._pending) > self.max_pending:
+                victim = next((k for k, item in self._pending.items() if item.type == "log"), None)
+                if victim is None:
+                    victim = next(iter(self._pending))
+                del self._pending[victim]
+                self._dropped += 1
+                result = "dropped"
+        if was_empty:
+            # 只在缓冲由空变为非空时唤醒事件循环，连续发布不重复调度
+            self._loop.call_soon_threadsafe(self._ready.set)
+        return result
+
+    async def get(self, timeout: Optional[float] = None) -> tuple[List[JobEvent], int]:
+        """等待并取走全部缓冲事件，返回 ``(事件列表, 自上次取走以来丢弃的数量)``；超时返回空列表"""
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - loop.time())
+            try:
+                await asyncio.wait_for(self._ready.wait(), remaining)
+            except asyncio.TimeoutError:
+                return [], 0
+            with self._lock:
+                self._ready.clear()
+                events = list(self._pending.values())
+                self._pending.clear()
+                dropped, self._dropped = self._dropped, 0
+            if events or dropped:
+                return events, dropped
+
+    def close(self) -> None:
+        with self._lock:
+            self.closed = True
+            self._pending.clear()
+
+
+def _resolve(future: asyncio.Future, value: tuple) -> None:
+    if not future.done():
+        future.set_result(value)
+
+
+class JobWaiterRegistry:
+    """等待任务结束的请求登记表
+
+    每个等待中的请求只占用一个 Future，任务进入结束状态时按任务 ID 找到并唤醒，
+    等待期间既不轮询数据库也不占用线程。
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._waiters: Dict[int, Set[asyncio.Future]] = {}
+
+    def register(self, job_id: int) -> asyncio.Future:
+        """在事件循环中登记等待，任务结束时 Future 的结果为 ``(status, error_message)``"""
+        future = asyncio.get_running_loop().create_future()
+        with self._lock:
+            self._waiters.setdefault(job_id, set()).add(future)
+        return future
+
+    def discard(self, job_id: int, future: asyncio.Future) -> None:
+        with self._lock:
+            futures = self._waiters.get(job_id)
+            if futures is not None:
+                futures.discard(future)
+                if not futures:
+                    del self._waiters[job_id]
+
+    def notify(self, job_id: int, status: str, error_message: Optional[str]) -> None:
+        """唤醒等待该任务的全部请求（可在任意线程调用）"""
+        with self._lock:
+            futures = self._waiters.pop(job_id, None)
+        for future in futures or ():
+            try:
+                future.get_loop().call_soon_threadsafe(_resolve, future, (status, error_message))
+            except RuntimeError:
+                # 等待者的事件循环已关闭
+                continue
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"jobs": len(self._waiters), "waiting": sum(len(futures) for futures in self._waiters.values())}
+
+
+class JobEventBus:
+    """进程内的任务事件总线
+
+    打印执行、取消、重新排队等状态变化和任务日志写入时发布事件，SSE 与 WebSocket
+    订阅者按任务、所有者或打印机过滤接收。日志事件只带任务 ID，所有者与打印机从
+    最近发布过状态的任务索引中补全。发布在调用线程中完成，没有订阅者时几乎没有开销。
+
+    任务进入结束状态时同时唤醒 :attr:`waiters` 中等待该任务的请求。
+    """
+
+    def __init__(self, max_pending: int = 256, index_size: int = 10000) -> None:
+        self.max_pending = max_pending
+        self.index_size = index_size
+        self.waiters = JobWaiterRegistry()
+        self._lock = threading.Lock()
+        self._subscribers: Set[JobSubscription] = set()
+        self._jobs: "OrderedDict[int, tuple[Optional[int], Optional[int]]]" = OrderedDict()
+        self._ids = itertools.count(1)
+        self._published = 0
+        self._coalesced = 0
+        self._dropped = 0
+
+    def subscribe(
+        self,
+        job_id: Optional[int] = None,
+        owner_id: Optional[int] = None,
+        printer_id: Optional[int] = None,
+    ) -> JobSubscription:
+        """在事件循环中创建订阅，用完后调用 :meth:`unsubscribe`"""
+        subscription = JobSubscription(
+            asyncio.get_running_loop(), job_id, owner_id, printer_id, max_pending=self.max_pending
+        )
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: JobSubscription) -> None:
+        subscription.close()
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish_status(
+        self,
+        job_id: int,
+        status: str,
+        error_message: Optional[str] = None,
+        owner_id: Optional[int] = None,
+        printer_id: Optional[int] = None,
+    ) -> None:
+        if status in FINISHED_JOB_STATUSES:
+            self.waiters.notify(job_id, status, error_message)
+        with self._lock:
+            self._jobs[job_id] = (owner_id, printer_id)
+            self._jobs.move_to_end(job_id)
+            if len(self._jobs) > self.index_size:
+                self._jobs.popitem(last=False)
+            if not self._subscribers:
+                return
+        data = {"status": status, "error_message": error_message, "timestamp": now_shanghai().isoformat()}
+        self._dispatch(JobEvent(next(self._ids), "status", job_id, owner_id, printer_id, data))
+
+    def publish_log(self, job_id: int, level: str, message: str) -> None:
+        with self._lock:
+            if not self._subscribers:
+                return
+            owner_id, printer_id = self._jobs.get(job_id, (None, None))
+        data = {"level": level, "message": message, "timestamp": now_shanghai().isoformat()}
+        self._dispatch(JobEvent(next(self._ids), "log", job_id, owner_id, printer_id, data))
+
+    def _dispatch(self, event: JobEvent) -> None:
+        with self._lock:
+            subscribers = [item for item in self._subscribers if item.matches(event)]
+            self._published += 1
+        for subscription in subscribers:
+            try:
+                result = subscription.push(event)
+            except RuntimeError:
+                # 订阅者的事件循环已关闭
+                self.unsubscribe(subscription)
+                continue
+            if result == "coalesced":
+                self._coalesced += 1
+            elif result == "dropped":
+                self._dropped += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            subscribers = len(self._subscribers)
+        return {
+            "subscribers": subscribers,
+            "published": self._published,
+            "coalesced": self._coalesced,
+            "dropped": self._dropped,
+            "waiting": self.waiters.stats()["waiting"],
+        }
+
+
+job_event_bus = JobEventBus(max_pending=settings.job_events_queue_size)
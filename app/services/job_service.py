@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import asyncio
 import base64
 import io
 import os
 import tempfile
-from typing import List, Optional
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Iterable, Iterator, List, Optional
 
 from fastapi import HTTPException, status
 from loguru import logger
@@ -14,21 +18,40 @@ try:  # pragma: no cover
     from PIL import ImageWin
 except ImportError:  # pragma: no cover
     ImageWin = None
-from sqlalchemy.orm import Session
+from sqlalchemy import exists, func, insert, select, true, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased, defer, selectinload
 
 from app.core.config import settings
 from app.core.database import session_scope
-from app.models import PrintJob, Printer
-from app.schemas import PrintJobCreate, PrintJobUpdate
+from app.core.exceptions import PrintContentError, PrinterUnavailableError
+from app.core.time_utils import now_shanghai
+from app.models import JobLog, LabelTemplate, PrintJob, Printer, PrinterGroup
+from app.schemas import BulkJobReprioritize, DeadLetterRequeue, JobFilter, PrintJobCreate, PrintJobReprint, PrintJobUpdate
 from app.schemas.print_job import ALLOWED_FILE_TYPES
+from app.services.dispatcher import printer_dispatcher
+from app.services.conversion_cache import content_key, conversion_cache
+from app.services import idempotency_service, printer_service, template_service
+from app.services.cache_invalidation import cache_invalidation_feed
+from app.services.job_events import FINISHED_JOB_STATUSES, job_event_bus
+from app.services.job_state_cache import JobState, job_state_cache
 from app.services.log_service import create_job_log
+from app.services.printer_health import printer_health
 from app.tasks.manager import job_queue
+from app.tasks.office_pool import office_pools
+from app.tasks.retry import classify_error, get_retry_policy
+from app.tasks.watchdog import print_watchdog
+from app.utils.label_renderer import RECORD_FORMATS, iter_records
+from app.utils.payload_codec import encode_payload
 from app.utils.print_utils import (
     parse_media_size, 
     calculate_scale_ratio, 
     should_rotate_image,
     optimize_image_for_print,
     get_optimal_resampling_filter,
+    impose_images,
+    mm_to_pixels,
+    parse_media_dpi,
     # process_svg_for_print  # SVG 支持已移除
 )
 
@@ -44,16 +67,6 @@ try:
 except ImportError:  # pragma: no cover
     fitz = None
 
-try:  # pragma: no cover
-    import pythoncom  # type: ignore
-except ImportError:  # pragma: no cover
-    pythoncom = None
-
-try:  # pragma: no cover
-    import win32com.client as win32com_client  # type: ignore
-except ImportError:  # pragma: no cover
-    win32com_client = None
-
 try:  # pragma: no cover
     import win32ui  # type: ignore
     import win32con  # type: ignore
@@ -67,29 +80,54 @@ SUPPORTED_IMAGE_TYPES = {"png", "jpg", "jpeg", "bmp"}
 RAW_COMPATIBLE_TYPES = {"txt"}
 WORD_FILE_TYPES = {"doc", "docx"}
 EXCEL_FILE_TYPES = {"xls", "xlsx"}
+TEMPLATE_RECORD_TYPES = set(RECORD_FORMATS)
+ACTIVE_JOB_STATUSES = {"queued", "processing", "retrying"}
+# 尚未开始打印、可调整优先级的状态
+PENDING_JOB_STATUSES = {"queued", "retrying"}
+# 可重新放入队列的终止状态
+REQUEUEABLE_JOB_STATUSES = {"dead_letter", "failed", "cancelled"}
+# 超过保留期后可归档打印内容的终止状态
+ARCHIVABLE_JOB_STATUSES = {"completed", "failed", "cancelled"}
+# 可合并为一个打印文档的后端及其文件类型
+COALESCE_FILE_TYPES = {"raw": sorted(RAW_COMPATIBLE_TYPES), "image_gdi": sorted(SUPPORTED_IMAGE_TYPES)}
+COALESCE_MAX_BATCH = 200
+COALESCE_POLL_SECONDS = 0.02
+# 模板 ZPL 逐条生成，合并到该大小再调用一次 WritePrinter
+RAW_WRITE_CHUNK_BYTES = 64 * 1024
 
 
-def _resolve_com_active_printer(printer_name: str) -> str:
-    if not win32print:
-        return printer_name
-    try:
-        handle = win32print.OpenPrinter(printer_name)
-    except Exception:
-        return printer_name
-    active_name = printer_name
-    try:
-        info = win32print.GetPrinter(handle, 2)
-        port = info.get("pPortName") if isinstance(info, dict) else None
-        if port:
-            active_name = f"{printer_name} on {port}"
-    except Exception:
-        active_name = printer_name
-    finally:
-        try:
-            win32print.ClosePrinter(handle)
-        except Exception:
-            pass
-    return active_name
+@dataclass
+class _PrintRequest:
+    """打印所需的全部数据，在工作线程中从任务解析，受监督的打印线程不再访问 ORM 对象"""
+
+    job_id: int
+    printer_name: str
+    title: str
+    copies: int
+    mode: str
+    payload: Any
+    template_id: Optional[int] = None
+    label_size: Optional[tuple[int, int]] = None
+    media_size: Optional[str] = None
+    color_mode: Optional[str] = None
+    fit_mode: str = "fill"
+    auto_rotate: bool = True
+    enhance_quality: bool = True
+    imposition: Optional[str] = None
+
+
+def _status_snapshot(job: PrintJob) -> tuple:
+    """在提交前记下发布状态事件所需的字段，提交后读取属性会重新查询"""
+    return job.id, job.status, job.error_message, job.owner_id, job.printer_id
+
+
+def _publish_status(*snapshots: tuple) -> None:
+    """状态变化提交后更新状态缓存、通知其他进程并发布事件"""
+    for job_id, job_status, error_message, owner_id, printer_id in snapshots:
+        job_state_cache.put(job_id, JobState(job_status, error_message, owner_id, printer_id))
+    cache_invalidation_feed.publish("job", (snapshot[0] for snapshot in snapshots))
+    for job_id, job_status, error_message, owner_id, printer_id in snapshots:
+        job_event_bus.publish_status(job_id, job_status, error_message, owner_id, printer_id)
 
 
 def _decode_job_content(job_in: PrintJobCreate) -> bytes:
@@ -99,19 +137,90 @@ def _decode_job_content(job_in: PrintJobCreate) -> bytes:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="打印内容格式错误") from exc
 
 
-def create_print_job(db: Session, job_in: PrintJobCreate, owner_id: Optional[int]) -> PrintJob:
-    content = _decode_job_content(job_in)
+def _dispatch_printer(db: Session, job_in: PrintJobCreate) -> Optional[Printer]:
+    """未指定打印机时，在指定分组（或默认打印机所在分组）内选择预计最快完成的成员"""
+    default_printer = db.query(Printer).filter(Printer.is_default == true()).first()
+    if job_in.printer_group:
+        group = db.query(PrinterGroup).filter(PrinterGroup.name == job_in.printer_group).first()
+        if not group:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="指定的打印机分组不存在")
+        group_id = group.id
+    elif default_printer and default_printer.group_id:
+        group_id = default_printer.group_id
+    else:
+        return default_printer
+    members = printer_service.list_group_members(db, group_id)
+    chosen = printer_dispatcher.choose(db, members, job_in.copies, printer_health.is_available)
+    return chosen or default_printer or (members[0] if members else None)
+
+
+def _validate_template_job(db: Session, job_in: PrintJobCreate, content: bytes) -> None:
+    """模板任务必须指定存在的模板，且记录数据能够解析"""
+    if job_in.file_type not in TEMPLATE_RECORD_TYPES:
+        if job_in.template_id is not None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="模板任务的文件类型必须是 csv、json 或 jsonl")
+        return
+    if job_in.template_id is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="记录数据需要指定标签模板")
+    if not db.query(LabelTemplate.id).filter(LabelTemplate.id == job_in.template_id).first():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="标签模板不存在")
+    try:
+        next(iter_records(content, job_in.file_type), None)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="记录数据无法解析") from exc
+
+
+def create_print_job(
+    db: Session,
+    job_in: PrintJobCreate,
+    owner_id: Optional[int],
+    idempotency_key: Optional[str] = None,
+) -> PrintJob:
+    """创建打印任务；携带幂等键的重复提交直接返回原任务，不再校验内容"""
+    if idempotency_key and owner_id is not None:
+        content = _decode_job_content(job_in)
+        request_fingerprint = idempotency_service.fingerprint(content_key(content), job_in.title, job_in.printer_name)
+        existing_id = idempotency_service.claim(db, owner_id, idempotency_key, request_fingerprint)
+        if existing_id is not None:
+            return get_print_job(db, existing_id)
+        try:
+            job = _insert_print_job(db, job_in, owner_id, idempotency_key, content)
+        except Exception:
+            db.rollback()
+            idempotency_service.release(db, owner_id, idempotency_key)
+            raise
+        idempotency_service.finish(owner_id, idempotency_key)
+    else:
+        job = _insert_print_job(db, job_in, owner_id)
+
+    _publish_status(_status_snapshot(job))
+    create_job_log(job.id, "info", "打印任务已创建并进入队列")
+    job_queue.enqueue(job.id, job.priority, job.owner_id)
+    return job
+
+
+def _insert_print_job(
+    db: Session,
+    job_in: PrintJobCreate,
+    owner_id: Optional[int],
+    idempotency_key: Optional[str] = None,
+    content: Optional[bytes] = None,
+) -> PrintJob:
+    if content is None:
+        content = _decode_job_content(job_in)
 
     if job_in.file_type not in ALLOWED_FILE_TYPES:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="文件类型不受支持")
 
+    _validate_template_job(db, job_in, content)
+
     printer: Optional[Printer] = None
     if job_in.printer_name:
         printer = db.query(Printer).filter(Printer.name == job_in.printer_name).first()
         if not printer:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="指定的打印机不存在")
     else:
-        printer = db.query(Printer).filter(Printer.is_default.is_(True)).first()
+        printer = _dispatch_printer(db, job_in)
 
     # 存储 DPI 信息到 media_size 中（如果客户端单独指定了 DPI）
     media_size_with_dpi = job_in.media_size
@@ -130,9 +239,12 @@ def create_print_job(db: Session, job_in: PrintJobCreate, owner_id: Optional[int
     if enhance_quality is None:
         enhance_quality = True
     
+    stored, codec = _encode_content(content, job_in.file_type)
     job = PrintJob(
         title=job_in.title,
-        content=content,
+        content=stored,
+        content_codec=codec,
+        content_hash=content_key(content),
         file_type=job_in.file_type,
         copies=job_in.copies,
         priority=job_in.priority,
@@ -142,18 +254,70 @@ def create_print_job(db: Session, job_in: PrintJobCreate, owner_id: Optional[int
         fit_mode=fit_mode,
         auto_rotate=1 if auto_rotate else 0,  # 转换为整数存储
         enhance_quality=1 if enhance_quality else 0,  # 转换为整数存储
+        imposition=job_in.imposition,
+        template_id=job_in.template_id,
+        batch_id=job_in.batch_id,
         owner_id=owner_id,
         printer_id=printer.id if printer else None,
     )
     db.add(job)
+    if idempotency_key:
+        db.flush()
+        idempotency_service.attach(db, owner_id, idempotency_key, job.id)
     db.commit()
     db.refresh(job)
-
-    create_job_log(db, job.id, "info", "打印任务已创建并进入队列")
-    job_queue.enqueue(job.id, job.priority)
     return job
 
 
+def reprint_print_job(db: Session, job: PrintJob, reprint_in: PrintJobReprint, owner_id: Optional[int]) -> PrintJob:
+    """
+    重印已有任务：新任务只引用原任务的内容，不复制数据
+
+    重印的重印同样指向最初的任务，内容哈希沿用原任务，Office 文档直接命中转换缓存。
+    """
+    source = job.source_job if job.source_job_id is not None else job
+    if source.payload_archived_at is not None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="原任务的打印内容已归档，无法重印")
+    printer_id = job.printer_id
+    if reprint_in.printer_name:
+        printer = db.query(Printer).filter(Printer.name == reprint_in.printer_name).first()
+        if not printer:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="指定的打印机不存在")
+        printer_id = printer.id
+
+    reprint = PrintJob(
+        title=job.title,
+        content=b"",
+        content_hash=source.content_hash,
+        source_job_id=source.id,
+        file_type=job.file_type,
+        copies=reprint_in.copies or job.copies,
+        priority=reprint_in.priority or job.priority,
+        media_size=reprint_in.media_size or job.media_size,
+        color_mode=job.color_mode,
+        duplex=job.duplex,
+        fit_mode=job.fit_mode,
+        auto_rotate=job.auto_rotate,
+        enhance_quality=job.enhance_quality,
+        imposition=job.imposition,
+        template_id=job.template_id,
+        batch_id=job.batch_id,
+        owner_id=owner_id,
+        printer_id=printer_id,
+    )
+    db.add(reprint)
+    db.flush()
+    # 任务与日志在同一个事务中写入
+    db.add(JobLog(job_id=reprint.id, level="info", message=f"重印任务 {job.id}，已进入队列"))
+    db.commit()
+    db.refresh(reprint)
+
+    _publish_status(_status_snapshot(reprint))
+    job_event_bus.publish_log(reprint.id, "info", f"重印任务 {job.id}，已进入队列")
+    job_queue.enqueue(reprint.id, reprint.priority, reprint.owner_id)
+    return reprint
+
+
 def list_print_jobs(db: Session, skip: int = 0, limit: int = 20) -> List[PrintJob]:
     return db.query(PrintJob).order_by(PrintJob.created_at.desc()).offset(skip).limit(limit).all()
 
@@ -165,8 +329,80 @@ def get_print_job(db: Session, job_id: int) -> PrintJob:
     return job
 
 
+async def list_print_jobs_async(db: AsyncSession, skip: int = 0, limit: int = 20) -> List[PrintJob]:
+    """异步查询任务列表，不读取打印内容"""
+    result = await db.execute(
+        select(PrintJob)
+        .options(defer(PrintJob.content), selectinload(PrintJob.printer))
+        .order_by(PrintJob.created_at.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    return list(result.scalars())
+
+
+async def get_print_job_async(db: AsyncSession, job_id: int, with_content: bool = False) -> PrintJob:
+    """
+    异步查询单个任务
+
+    异步会话不能懒加载，``with_content`` 时一并加载打印内容、重印引用的原任务和标签模板，
+    供预览在线程池中使用；否则不读取打印内容。
+    """
+    options = [selectinload(PrintJob.printer)]
+    if with_content:
+        options += [selectinload(PrintJob.source_job), selectinload(PrintJob.template)]
+    else:
+        options.append(defer(PrintJob.content))
+    job = (await db.execute(select(PrintJob).options(*options).where(PrintJob.id == job_id))).scalar_one_or_none()
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="打印任务不存在")
+    return job
+
+
+async def get_print_job_status_async(db: AsyncSession, job_id: int) -> JobState:
+    """查询任务状态，优先读取 :data:`job_state_cache`，未命中时只读取状态相关的列并回填"""
+    state = job_state_cache.get(job_id)
+    if state is not None:
+        return state
+    generation = job_state_cache.generation
+    row = (
+        await db.execute(
+            select(PrintJob.status, PrintJob.error_message, PrintJob.owner_id, PrintJob.printer_id).where(
+                PrintJob.id == job_id
+            )
+        )
+    ).one_or_none()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="打印任务不存在")
+    state = JobState(*row)
+    job_state_cache.fill(job_id, state, generation)
+    return state
+
+
+async def wait_for_print_job_async(db: AsyncSession, job_id: int, timeout: float) -> tuple[str, Optional[str]]:
+    """
+    等待任务结束，最多 ``timeout`` 秒，返回 ``(status, error_message)``
+
+    先登记等待再读取当前状态，读取期间结束的任务不会错过唤醒。等待前提交只读事务归还
+    数据库连接，等待期间不查询数据库；超时后再读取一次状态。
+    """
+    waiter = job_event_bus.waiters.register(job_id)
+    try:
+        row = await get_print_job_status_async(db, job_id)
+        if row.status in FINISHED_JOB_STATUSES or timeout <= 0:
+            return row.status, row.error_message
+        await db.commit()
+        try:
+            return await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            row = await get_print_job_status_async(db, job_id)
+            return row.status, row.error_message
+    finally:
+        job_event_bus.waiters.discard(job_id, waiter)
+
+
 def update_print_job(db: Session, job: PrintJob, job_in: PrintJobUpdate) -> PrintJob:
-    if job.status not in {"queued", "processing"}:
+    if job.status not in ACTIVE_JOB_STATUSES:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="当前任务状态不允许修改")
     data = job_in.dict(exclude_unset=True)
     for field, value in data.items():
@@ -174,106 +410,311 @@ def update_print_job(db: Session, job: PrintJob, job_in: PrintJobUpdate) -> Prin
     db.add(job)
     db.commit()
     db.refresh(job)
+    if "status" in data:
+        if job.status not in ACTIVE_JOB_STATUSES:
+            job_queue.cancel(job.id)
+        _publish_status(_status_snapshot(job))
+        create_job_log(job.id, "info", f"任务状态已修改为 {job.status}")
     if "priority" in data:
-        job_queue.enqueue(job.id, job.priority)
-        create_job_log(db, job.id, "info", "任务优先级已更新，重新进入队列")
+        if job_queue.reprioritize(job.id, job.priority):
+            create_job_log(job.id, "info", "任务优先级已更新，已调整队列位置")
+        elif job.status == "queued":
+            job_queue.enqueue(job.id, job.priority, job.owner_id)
+            create_job_log(job.id, "info", "任务优先级已更新，重新进入队列")
     return job
 
 
 def cancel_print_job(db: Session, job: PrintJob) -> PrintJob:
-    if job.status not in {"queued", "processing"}:
+    if job.status not in ACTIVE_JOB_STATUSES:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="无法取消已完成的任务")
     job_queue.cancel(job.id)
     job.status = "cancelled"
     db.add(job)
     db.commit()
     db.refresh(job)
-    create_job_log(db, job.id, "warning", "任务已被取消")
+    _publish_status(_status_snapshot(job))
+    create_job_log(job.id, "warning", "任务已被取消")
     return job
 
 
-def _prepare_temp_file(content: bytes, suffix: str) -> str:
+def _encode_content(content: bytes, file_type: str) -> tuple[bytes, Optional[str]]:
+    if not settings.payload_compression:
+        return content, None
+    return encode_payload(
+        content,
+        file_type,
+        level=settings.payload_compression_level,
+        min_bytes=settings.payload_compression_min_bytes,
+    )
+
+
+def _prepare_temp_file(content: bytes | Iterable[bytes], suffix: str) -> str:
+    """写入临时文件，``content`` 可以是分块解压的迭代器"""
     fd, path = tempfile.mkstemp(suffix=suffix)
     with os.fdopen(fd, "wb") as tmp:
-        tmp.write(content)
+        if isinstance(content, bytes):
+            tmp.write(content)
+        else:
+            for chunk in content:
+                tmp.write(chunk)
     return path
 
 
+def _resolve_print_backend(file_type: str) -> str:
+    if file_type in RAW_COMPATIBLE_TYPES:
+        return "raw"
+    if file_type in SUPPORTED_IMAGE_TYPES:
+        return "image_gdi"
+    if file_type == "pdf":
+        return "file"
+    if file_type in WORD_FILE_TYPES:
+        return "word"
+    if file_type in EXCEL_FILE_TYPES:
+        return "excel"
+    if file_type in TEMPLATE_RECORD_TYPES:
+        return "template"
+    return "unknown"
+
+
+def _resolve_print_timeout(file_type: str, backend: str) -> float:
+    if file_type in settings.print_file_type_timeouts:
+        return settings.print_file_type_timeouts[file_type]
+    return settings.print_backend_timeouts.get(backend, settings.print_timeout_seconds)
+
+
+def _prepare_converted_pdf(job: PrintJob, application: str) -> bytes:
+    """将 Word/Excel 文档转换为 PDF，重复的文档直接命中缓存，不再启动 Office"""
+    key = job.content_hash or content_key(job.print_content)
+    pdf = conversion_cache.get(key)
+    if pdf is None:
+        source_path = _prepare_temp_file(job.iter_print_content(), suffix=f".{job.file_type.lower()}")
+        try:
+            pdf = office_pools.get(application).export_pdf(source_path)
+        finally:
+            os.remove(source_path)
+        conversion_cache.put(key, pdf)
+    else:
+        logger.info("命中 Office 转换缓存: {}", job.id)
+    return pdf
+
+
+def _iter_job_records(content: bytes, file_type: str) -> Iterator[dict]:
+    try:
+        yield from iter_records(content, file_type)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise PrintContentError(f"记录数据无法解析: {exc}") from exc
+
+
+def _prepare_template_payload(job: PrintJob) -> tuple[str, Iterator[bytes] | Iterator[Image.Image]]:
+    """
+    模板任务：ZPL 模板返回逐条生成的 RAW 指令块迭代器，位图模板返回逐条渲染的标签图片迭代器
+
+    记录内容与渲染器在当前线程读取，迭代器只引用普通数据，在打印线程中边解析边输出。
+    """
+    renderer = template_service.get_renderer(job.template)
+    records = _iter_job_records(job.print_content, job.file_type.lower())
+    if job.template.output == "zpl":
+        return "raw", renderer.iter_zpl(records, job.copies)
+    return "label_gdi", renderer.render_all(records)
+
+
 def _prepare_print_payload(job: PrintJob) -> tuple[str, str | bytes]:
     file_type = job.file_type.lower()
     if file_type in RAW_COMPATIBLE_TYPES:
-        return "raw", job.content
+        return "raw", job.print_content
     if file_type in SUPPORTED_IMAGE_TYPES:
-        return "image_gdi", job.content
+        return "image_gdi", job.print_content
     # SVG 支持已移除
     if file_type == "pdf":
-        path = _prepare_temp_file(job.content, suffix=".pdf")
+        path = _prepare_temp_file(job.iter_print_content(), suffix=".pdf")
         return "file", path
     if file_type in WORD_FILE_TYPES:
-        path = _prepare_temp_file(job.content, suffix=f".{file_type}")
+        if settings.office_cache_enabled and fitz:
+            return "pdf_gdi", _prepare_converted_pdf(job, "word")
+        path = _prepare_temp_file(job.iter_print_content(), suffix=f".{file_type}")
         return "word", path
     if file_type in EXCEL_FILE_TYPES:
-        path = _prepare_temp_file(job.content, suffix=f".{file_type}")
+        if settings.office_cache_enabled and fitz:
+            return "pdf_gdi", _prepare_converted_pdf(job, "excel")
+        path = _prepare_temp_file(job.iter_print_content(), suffix=f".{file_type}")
         return "excel", path
-    raise RuntimeError(f"暂不支持的文件类型: {file_type}")
+    if file_type in TEMPLATE_RECORD_TYPES:
+        return _prepare_template_payload(job)
+    raise PrintContentError(f"暂不支持的文件类型: {file_type}")
 
 
 def _print_with_word(path: str, printer_name: str, copies: int) -> None:
-    if not win32com_client:
-        raise RuntimeError("缺少 win32com.client，无法打印 Word 文档")
-    if not pythoncom:
-        raise RuntimeError("缺少 pythoncom 模块，无法打印 Word 文档")
-
-    initialized = False
-    word = None
-    doc = None
-    try:
-        pythoncom.CoInitialize()
-        initialized = True
-        word = win32com_client.Dispatch("Word.Application")
-        word.Visible = False
-        doc = word.Documents.Open(path, ReadOnly=True)
-        try:
-            active_name = _resolve_com_active_printer(printer_name)
-            word.ActivePrinter = active_name
-            doc.PrintOut(Background=False, Copies=copies, ActivePrinter=active_name)
-        finally:
-            if doc:
-                doc.Close(False)
-    finally:
-        if word:
-            word.Quit()
-        if initialized:
-            pythoncom.CoUninitialize()
+    office_pools.get("word").print_document(path, printer_name, copies)
 
 
 def _print_with_excel(path: str, printer_name: str, copies: int) -> None:
-    if not win32com_client:
-        raise RuntimeError("缺少 win32com.client，无法打印 Excel 文档")
-    if not pythoncom:
-        raise RuntimeError("缺少 pythoncom 模块，无法打印 Excel 文档")
-
-    initialized = False
-    excel = None
-    workbook = None
+    office_pools.get("excel").print_document(path, printer_name, copies)
+
+
+def _iter_pdf_pages(pdf: bytes, dpi: int) -> Iterator[Image.Image]:
+    """按指定 DPI 逐页渲染 PDF，内存中只保留当前页"""
+    try:
+        doc = fitz.open(stream=pdf, filetype="pdf")
+    except Exception as exc:
+        raise PrintContentError("无法解析转换后的 PDF") from exc
+    with doc:
+        if doc.page_count == 0:
+            raise PrintContentError("PDF 文件无内容")
+        matrix = fitz.Matrix(dpi / 72, dpi / 72)
+        for page in doc:
+            pix = page.get_pixmap(matrix=matrix, alpha=False)
+            yield Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+
+
+def _print_pdf_with_gdi(pdf: bytes, printer_name: str, copies: int, title: Optional[str]) -> None:
+    """
+    按打印机 DPI 逐页渲染 PDF 并通过 GDI 输出，整份文档只有一个打印文档
+
+    与 Office 的 PrintOut 一样在 EndDoc 返回后才算完成，打印受监督线程的截止时间约束。
+    """
+    if not win32print or not win32ui or not win32con:
+        raise RuntimeError("缺少打印所需的 Win32 模块")
+    if not ImageWin:
+        raise RuntimeError("缺少 Pillow ImageWin 模块，无法打印图片")
+
+    hdc = win32ui.CreateDC()
     try:
-        pythoncom.CoInitialize()
-        initialized = True
-        excel = win32com_client.Dispatch("Excel.Application")
-        excel.Visible = False
-        workbook = excel.Workbooks.Open(path, ReadOnly=True)
+        hdc.CreatePrinterDC(printer_name)
+        dpi = hdc.GetDeviceCaps(win32con.LOGPIXELSX)
+        printable_width = hdc.GetDeviceCaps(win32con.HORZRES)
+        printable_height = hdc.GetDeviceCaps(win32con.VERTRES)
+        doc_started = False
         try:
-            active_name = _resolve_com_active_printer(printer_name)
-            excel.ActivePrinter = active_name
-            workbook.PrintOut(Copies=copies, ActivePrinter=active_name)
-        finally:
-            if workbook:
-                workbook.Close(False)
+            hdc.StartDoc(title or "Print Job")
+            doc_started = True
+            # 多份按整份文档重复输出（逐份打印）
+            for _ in range(max(1, copies)):
+                for page in _iter_pdf_pages(pdf, dpi):
+                    if should_rotate_image(page.width, page.height, printable_width, printable_height):
+                        page = page.rotate(90, expand=True)
+                    # 超出可打印区域时等比缩小
+                    ratio = min(1.0, printable_width / page.width, printable_height / page.height)
+                    rect = (0, 0, int(page.width * ratio), int(page.height * ratio))
+                    dib = ImageWin.Dib(page)
+                    hdc.StartPage()
+                    try:
+                        dib.draw(hdc.GetHandleOutput(), rect)
+                    finally:
+                        hdc.EndPage()
+            hdc.EndDoc()
+        except Exception:
+            if doc_started:
+                hdc.AbortDoc()
+            raise
     finally:
-        if excel:
-            excel.Quit()
-        if initialized:
-            pythoncom.CoUninitialize()
+        hdc.DeleteDC()
+
+
+def _load_image_for_gdi(content: bytes) -> Image.Image:
+    try:
+        with Image.open(io.BytesIO(content)) as img:
+            # 先转换为 RGB 以便后续处理
+            return img.convert("RGB")
+    except Exception as exc:
+        raise PrintContentError("无法解析图片内容") from exc
+
+
+def _resolve_printable_size(hdc, media_size: Optional[str]) -> tuple[int, int]:
+    # 尝试解析自定义尺寸
+    custom_size = parse_media_size(media_size)
+    
+    if custom_size:
+        # 使用自定义尺寸
+        printable_width, printable_height = custom_size
+        logger.info(f"使用自定义打印尺寸: {printable_width}x{printable_height} 像素 (来自 {media_size})")
+    else:
+        # 使用打印机默认尺寸
+        printable_width = hdc.GetDeviceCaps(win32con.HORZRES)
+        printable_height = hdc.GetDeviceCaps(win32con.VERTRES)
+        logger.info(f"使用打印机默认尺寸: {printable_width}x{printable_height} 像素")
+    
+    if printable_width <= 0 or printable_height <= 0:
+        raise RuntimeError("打印机可打印区域无效")
+    return printable_width, printable_height
+
+
+def _impose_for_gdi(hdc, images: List[Image.Image], media_size: Optional[str], layout: str) -> List[Image.Image]:
+    """按纸张尺寸把多张图片拼到整页上，返回需要打印的页面"""
+    page_width, page_height = _resolve_printable_size(hdc, media_size)
+    dpi = parse_media_dpi(media_size)
+    sheets = impose_images(
+        images,
+        page_width,
+        page_height,
+        margin=mm_to_pixels(settings.imposition_margin_mm, dpi),
+        spacing=mm_to_pixels(settings.imposition_spacing_mm, dpi),
+        layout=layout,
+    )
+    logger.info(f"拼版完成: {len(images)} 张图片拼为 {len(sheets)} 页 ({layout})")
+    return sheets
+
+
+def _render_image_for_gdi(
+    hdc,
+    image: Image.Image,
+    media_size: Optional[str] = None,
+    color_mode: Optional[str] = None,
+    auto_rotate: bool = True,
+    enhance_quality: bool = True
+) -> tuple:
+    """按打印机 DC 的可打印区域处理图片，返回 ``(dib, 绘制区域)``"""
+    printable_width, printable_height = _resolve_printable_size(hdc, media_size)
+
+    offset_x = hdc.GetDeviceCaps(win32con.PHYSICALOFFSETX)
+    offset_y = hdc.GetDeviceCaps(win32con.PHYSICALOFFSETY)
+
+    # 自动旋转图片以更好地适配纸张
+    if auto_rotate and should_rotate_image(image.width, image.height, printable_width, printable_height):
+        logger.info(f"自动旋转图片 90 度以适配纸张方向 (图片: {image.width}x{image.height}, 纸张: {printable_width}x{printable_height})")
+        image = image.rotate(90, expand=True)
+        logger.info(f"旋转后图片尺寸: {image.width}x{image.height}")
+
+    # 保持原始尺寸，不进行缩放
+    logger.info(f"保持原始尺寸打印: {image.width}x{image.height} (纸张: {printable_width}x{printable_height})")
+
+    # 优化图片质量（锐化、对比度增强、颜色转换）
+    if enhance_quality:
+        logger.info(f"应用质量增强: 锐化、对比度优化、颜色模式={color_mode}")
+        # 解析 DPI（用于优化）
+        target_dpi = 203  # 默认值
+        if media_size and '@' in media_size:
+            try:
+                dpi_str = media_size.split('@')[1].replace('dpi', '')
+                target_dpi = int(dpi_str)
+            except:
+                pass
+        
+        image = optimize_image_for_print(
+            image,
+            target_dpi=target_dpi,
+            color_mode=color_mode,
+            enhance_quality=True
+        )
+    else:
+        # 不增强质量，只做基本颜色转换
+        if color_mode and color_mode.lower() in ["monochrome", "mono", "bw"]:
+            image = image.convert("1")
+        elif color_mode and color_mode.lower() in ["grayscale", "gray"]:
+            image = image.convert("L")
+        else:
+            image = image.convert("RGB")
+
+    # 居中对齐打印
+    draw_left = offset_x + max(0, (printable_width - image.width) // 2)
+    draw_top = offset_y + max(0, (printable_height - image.height) // 2)
+    draw_right = draw_left + image.width
+    draw_bottom = draw_top + image.height
+    logger.info(f"居中对齐打印位置: ({draw_left}, {draw_top}) 到 ({draw_right}, {draw_bottom})")
+
+    dib = ImageWin.Dib(image)
+    return dib, (draw_left, draw_top, draw_right, draw_bottom)
+
+
 def _print_image_with_gdi(
     content: bytes, 
     printer_name: str, 
@@ -283,100 +724,181 @@ def _print_image_with_gdi(
     color_mode: Optional[str] = None,
     fit_mode: str = "fill",
     auto_rotate: bool = True,
-    enhance_quality: bool = True
+    enhance_quality: bool = True,
+    imposition: Optional[str] = None
 ) -> None:
     if not win32print or not win32ui or not win32con:
         raise RuntimeError("缺少打印所需的 Win32 模块")
     if not ImageWin:
         raise RuntimeError("缺少 Pillow ImageWin 模块，无法打印图片")
 
+    image = _load_image_for_gdi(content)
+    printable_title = title or "Print Job"
+
+    hdc = win32ui.CreateDC()
     try:
-        with Image.open(io.BytesIO(content)) as img:
-            # 先转换为 RGB 以便后续处理
-            image = img.convert("RGB")
+        hdc.CreatePrinterDC(printer_name)
+        if imposition:
+            # 多份拼到同一页，每页只渲染、打印一次
+            sheets = _impose_for_gdi(hdc, [image] * max(1, copies), media_size, imposition)
+            pages = [
+                (_render_image_for_gdi(hdc, sheet, media_size, color_mode, False, enhance_quality), 1)
+                for sheet in sheets
+            ]
+        else:
+            pages = [(_render_image_for_gdi(hdc, image, media_size, color_mode, auto_rotate, enhance_quality), copies)]
+
+        doc_started = False
+        try:
+            hdc.StartDoc(printable_title)
+            doc_started = True
+            for (dib, rect), page_copies in pages:
+                for _ in range(max(1, page_copies)):
+                    hdc.StartPage()
+                    try:
+                        dib.draw(hdc.GetHandleOutput(), rect)
+                    finally:
+                        hdc.EndPage()
+            hdc.EndDoc()
+        except Exception:
+            if doc_started:
+                hdc.AbortDoc()
+            raise
+    finally:
+        hdc.DeleteDC()
+
+
+def _write_raw_chunks(handle, chunks: Iterable[bytes]) -> None:
+    """把逐块生成的 RAW 指令合并到 ``RAW_WRITE_CHUNK_BYTES`` 左右再写入，避免每条记录一次 WritePrinter"""
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer += chunk
+        if len(buffer) >= RAW_WRITE_CHUNK_BYTES:
+            win32print.WritePrinter(handle, bytes(buffer))
+            buffer.clear()
+    if buffer:
+        win32print.WritePrinter(handle, bytes(buffer))
+
+
+def _write_raw_document(printer_name: str, title: str, pages: List[tuple[bytes | Iterator[bytes], int]]) -> None:
+    """
+    将 ``(内容, 份数)`` 列表作为一个 RAW 打印文档写入打印机
+
+    内容也可以是逐块生成的指令迭代器（模板 ZPL），此时份数必须为 1。
+    迭代过程中记录解析失败时删除已提交的打印作业，内容错误原样抛出。
+    """
+    try:
+        handle = win32print.OpenPrinter(printer_name)
     except Exception as exc:
-        raise RuntimeError("无法解析图片内容") from exc
+        raise PrinterUnavailableError(f"无法打开打印机 '{printer_name}'") from exc
+    try:
+        job_info = (title, None, "RAW")
+        doc_started = False
+        try:
+            win32print.StartDocPrinter(handle, 1, job_info)
+            doc_started = True
+            for payload, copies in pages:
+                for _ in range(copies):
+                    win32print.StartPagePrinter(handle)
+                    if isinstance(payload, (bytes, bytearray)):
+                        win32print.WritePrinter(handle, payload)
+                    else:
+                        _write_raw_chunks(handle, payload)
+                    win32print.EndPagePrinter(handle)
+            win32print.EndDocPrinter(handle)
+        except PrintContentError:
+            if doc_started:
+                win32print.AbortPrinter(handle)
+            raise
+        except Exception as exc:
+            raise RuntimeError(f"打印过程失败: {exc}") from exc
+    finally:
+        win32print.ClosePrinter(handle)
 
-    printable_title = title or "Print Job"
+
+def _print_images_with_gdi_batch(requests: List[_PrintRequest], printer_name: str, title: str) -> None:
+    """将多个图片任务作为一个 GDI 打印文档输出，每个任务按份数占若干页"""
+    if not win32print or not win32ui or not win32con:
+        raise RuntimeError("缺少打印所需的 Win32 模块")
+    if not ImageWin:
+        raise RuntimeError("缺少 Pillow ImageWin 模块，无法打印图片")
 
     hdc = win32ui.CreateDC()
     try:
         hdc.CreatePrinterDC(printer_name)
-
-        # 尝试解析自定义尺寸
-        custom_size = parse_media_size(media_size)
-        
-        if custom_size:
-            # 使用自定义尺寸
-            printable_width, printable_height = custom_size
-            logger.info(f"使用自定义打印尺寸: {printable_width}x{printable_height} 像素 (来自 {media_size})")
+        pages = []
+        leader = requests[0]
+        if leader.imposition:
+            # 合并的任务按份数展开后一起拼版
+            expanded = [request.payload for request in requests for _ in range(max(1, request.copies))]
+            for sheet in _impose_for_gdi(hdc, expanded, leader.media_size, leader.imposition):
+                dib, rect = _render_image_for_gdi(
+                    hdc, sheet, leader.media_size, leader.color_mode, False, leader.enhance_quality
+                )
+                pages.append((dib, rect, 1))
         else:
-            # 使用打印机默认尺寸
-            printable_width = hdc.GetDeviceCaps(win32con.HORZRES)
-            printable_height = hdc.GetDeviceCaps(win32con.VERTRES)
-            logger.info(f"使用打印机默认尺寸: {printable_width}x{printable_height} 像素")
-        
-        if printable_width <= 0 or printable_height <= 0:
-            raise RuntimeError("打印机可打印区域无效")
-
-        offset_x = hdc.GetDeviceCaps(win32con.PHYSICALOFFSETX)
-        offset_y = hdc.GetDeviceCaps(win32con.PHYSICALOFFSETY)
-
-        # 自动旋转图片以更好地适配纸张
-        if auto_rotate and should_rotate_image(image.width, image.height, printable_width, printable_height):
-            logger.info(f"自动旋转图片 90 度以适配纸张方向 (图片: {image.width}x{image.height}, 纸张: {printable_width}x{printable_height})")
-            image = image.rotate(90, expand=True)
-            logger.info(f"旋转后图片尺寸: {image.width}x{image.height}")
-
-        # 保持原始尺寸，不进行缩放
-        logger.info(f"保持原始尺寸打印: {image.width}x{image.height} (纸张: {printable_width}x{printable_height})")
-
-        # 优化图片质量（锐化、对比度增强、颜色转换）
-        if enhance_quality:
-            logger.info(f"应用质量增强: 锐化、对比度优化、颜色模式={color_mode}")
-            # 解析 DPI（用于优化）
-            target_dpi = 203  # 默认值
-            if media_size and '@' in media_size:
-                try:
-                    dpi_str = media_size.split('@')[1].replace('dpi', '')
-                    target_dpi = int(dpi_str)
-                except:
-                    pass
-            
-            image = optimize_image_for_print(
-                image,
-                target_dpi=target_dpi,
-                color_mode=color_mode,
-                enhance_quality=True
-            )
-        else:
-            # 不增强质量，只做基本颜色转换
-            if color_mode and color_mode.lower() in ["monochrome", "mono", "bw"]:
-                image = image.convert("1")
-            elif color_mode and color_mode.lower() in ["grayscale", "gray"]:
-                image = image.convert("L")
-            else:
-                image = image.convert("RGB")
+            for request in requests:
+                dib, rect = _render_image_for_gdi(
+                    hdc, request.payload, request.media_size, request.color_mode, request.auto_rotate, request.enhance_quality
+                )
+                pages.append((dib, rect, request.copies))
 
-        # 居中对齐打印
-        draw_left = offset_x + max(0, (printable_width - image.width) // 2)
-        draw_top = offset_y + max(0, (printable_height - image.height) // 2)
-        draw_right = draw_left + image.width
-        draw_bottom = draw_top + image.height
-        logger.info(f"居中对齐打印位置: ({draw_left}, {draw_top}) 到 ({draw_right}, {draw_bottom})")
+        doc_started = False
+        try:
+            hdc.StartDoc(title)
+            doc_started = True
+            for dib, rect, copies in pages:
+                for _ in range(max(1, copies)):
+                    hdc.StartPage()
+                    try:
+                        dib.draw(hdc.GetHandleOutput(), rect)
+                    finally:
+                        hdc.EndPage()
+            hdc.EndDoc()
+        except Exception:
+            if doc_started:
+                hdc.AbortDoc()
+            raise
+    finally:
+        hdc.DeleteDC()
 
-        dib = ImageWin.Dib(image)
 
+def _print_labels_with_gdi(
+    labels: Iterator[Image.Image],
+    printer_name: str,
+    copies: int,
+    title: Optional[str],
+    width_mm: int,
+    height_mm: int,
+) -> None:
+    """逐张渲染、逐张输出模板标签，整批只有一个打印文档，内存中只保留当前标签"""
+    if not win32print or not win32ui or not win32con:
+        raise RuntimeError("缺少打印所需的 Win32 模块")
+    if not ImageWin:
+        raise RuntimeError("缺少 Pillow ImageWin 模块，无法打印图片")
+
+    hdc = win32ui.CreateDC()
+    try:
+        hdc.CreatePrinterDC(printer_name)
+        # 按打印机自身 DPI 换算标签的物理尺寸
+        rect = (
+            0,
+            0,
+            mm_to_pixels(width_mm, hdc.GetDeviceCaps(win32con.LOGPIXELSX)),
+            mm_to_pixels(height_mm, hdc.GetDeviceCaps(win32con.LOGPIXELSY)),
+        )
         doc_started = False
         try:
-            hdc.StartDoc(printable_title)
+            hdc.StartDoc(title or "Label Job")
             doc_started = True
-            for _ in range(max(1, copies)):
-                hdc.StartPage()
-                try:
-                    dib.draw(hdc.GetHandleOutput(), (draw_left, draw_top, draw_right, draw_bottom))
-                finally:
-                    hdc.EndPage()
+            for label in labels:
+                dib = ImageWin.Dib(label)
+                for _ in range(max(1, copies)):
+                    hdc.StartPage()
+                    try:
+                        dib.draw(hdc.GetHandleOutput(), rect)
+                    finally:
+                        hdc.EndPage()
             hdc.EndDoc()
         except Exception:
             if doc_started:
@@ -386,13 +908,7 @@ def _print_image_with_gdi(
         hdc.DeleteDC()
 
 
-def _send_to_printer(job: PrintJob) -> None:
-    if os.environ.get("PRINT_PROXY_DISABLE_PRINT") == "1":
-        logger.info("测试模式下跳过实际打印: {}", job.id)
-        return
-    if not win32print:
-        raise RuntimeError("win32print 未安装，无法执行打印")
-
+def _resolve_printer_name(job: PrintJob) -> str:
     printer_name = None
     if job.printer and job.printer.name:
         printer_name = job.printer.name
@@ -400,77 +916,124 @@ def _send_to_printer(job: PrintJob) -> None:
         try:
             printer_name = win32print.GetDefaultPrinter()
         except Exception as exc:  # pragma: no cover
-            raise RuntimeError("系统没有默认打印机") from exc
+            raise PrinterUnavailableError("系统没有默认打印机") from exc
 
     if not printer_name:
-        raise RuntimeError("未找到可用打印机")
+        raise PrinterUnavailableError("未找到可用打印机")
+    return printer_name
+
+
+def _build_print_request(job: PrintJob, printer_name: str, mode: str, payload: Any) -> _PrintRequest:
+    return _PrintRequest(
+        job_id=job.id,
+        printer_name=printer_name,
+        title=job.title,
+        copies=job.copies,
+        mode=mode,
+        payload=payload,
+        template_id=job.template_id,
+        label_size=(job.template.width_mm, job.template.height_mm) if job.template_id else None,
+        media_size=job.media_size,
+        color_mode=job.color_mode,
+        fit_mode=job.fit_mode or "fill",
+        # 将整数转换为布尔值
+        auto_rotate=bool(job.auto_rotate) if job.auto_rotate is not None else True,
+        enhance_quality=bool(job.enhance_quality) if job.enhance_quality is not None else True,
+        imposition=job.imposition,
+    )
+
+
+def _printing_disabled(job_ids: List[int]) -> bool:
+    if os.environ.get("PRINT_PROXY_DISABLE_PRINT") == "1":
+        logger.info("测试模式下跳过实际打印: {}", job_ids[0] if len(job_ids) == 1 else job_ids)
+        return True
+    if not win32print:
+        raise RuntimeError("win32print 未安装，无法执行打印")
+    return False
+
 
+def _prepare_print_request(job: PrintJob) -> Optional[_PrintRequest]:
+    """在截止时间开始前解析打印机并准备打印内容；测试模式下不打印，返回 ``None``"""
+    if _printing_disabled([job.id]):
+        return None
+    printer_name = _resolve_printer_name(job)
     mode, payload = _prepare_print_payload(job)
+    return _build_print_request(job, printer_name, mode, payload)
+
+
+def _prepare_batch_requests(ready: List[tuple[PrintJob, bytes | Image.Image]], backend: str) -> Optional[List[_PrintRequest]]:
+    """合并打印的 :func:`_prepare_print_request`，全部任务使用首个任务的打印机"""
+    if _printing_disabled([job.id for job, _ in ready]):
+        return None
+    printer_name = _resolve_printer_name(ready[0][0])
+    return [_build_print_request(job, printer_name, backend, payload) for job, payload in ready]
+
+
+def _send_batch_to_printer(requests: Optional[List[_PrintRequest]], backend: str) -> None:
+    """将合并的任务写入同一个打印文档（一次 StartDoc/EndDoc）"""
+    if requests is None:
+        return
+    leader = requests[0]
+    title = f"{leader.title} 等 {len(requests)} 个任务"
+    if backend == "raw":
+        _write_raw_document(leader.printer_name, title, [(request.payload, request.copies) for request in requests])
+    else:
+        _print_images_with_gdi_batch(requests, leader.printer_name, title)
+
+
+def _send_to_printer(request: Optional[_PrintRequest]) -> None:
+    if request is None:
+        return
+    printer_name, mode, payload = request.printer_name, request.mode, request.payload
 
     if mode == "raw":
-        try:
-            handle = win32print.OpenPrinter(printer_name)
-        except Exception as exc:
-            raise RuntimeError(f"无法打开打印机 '{printer_name}'") from exc
-        try:
-            job_info = (job.title, None, "RAW")
-            try:
-                win32print.StartDocPrinter(handle, 1, job_info)
-                for _ in range(job.copies):
-                    win32print.StartPagePrinter(handle)
-                    win32print.WritePrinter(handle, payload)
-                    win32print.EndPagePrinter(handle)
-                win32print.EndDocPrinter(handle)
-            except Exception as exc:
-                raise RuntimeError(f"打印过程失败: {exc}") from exc
-        finally:
-            win32print.ClosePrinter(handle)
+        # 模板生成的 ZPL 已用 ^PQ 指定每张标签的份数
+        copies = 1 if request.template_id else request.copies
+        _write_raw_document(printer_name, request.title, [(payload, copies)])
+    elif mode == "label_gdi":
+        width_mm, height_mm = request.label_size
+        _print_labels_with_gdi(payload, printer_name, request.copies, request.title, width_mm, height_mm)
     elif mode == "file":
         if not win32api:
             raise RuntimeError("缺少 win32api，无法处理文件打印")
         if not isinstance(payload, str):
-            raise RuntimeError("无效的打印内容类型")
+            raise PrintContentError("无效的打印内容类型")
         path = payload
         try:
-            for _ in range(job.copies):
+            for _ in range(request.copies):
                 win32api.ShellExecute(0, "printto", path, f'"{printer_name}"', ".", 0)
         finally:
             if os.path.exists(path):
                 os.remove(path)
+    elif mode == "pdf_gdi":
+        # 缓存的 Office 转换结果：同步逐页打印，不交给系统 PDF 阅读器
+        _print_pdf_with_gdi(payload, printer_name, request.copies, request.title)
     elif mode == "image_gdi":
         if not isinstance(payload, (bytes, bytearray)):
-            raise RuntimeError("无效的打印内容类型")
-        
-        # 从数据库模型中获取打印选项
-        fit_mode = getattr(job, 'fit_mode', 'fill') or 'fill'
-        auto_rotate_value = getattr(job, 'auto_rotate', 1)
-        enhance_quality_value = getattr(job, 'enhance_quality', 1)
-        
-        # 将整数转换为布尔值
-        auto_rotate = bool(auto_rotate_value) if auto_rotate_value is not None else True
-        enhance_quality = bool(enhance_quality_value) if enhance_quality_value is not None else True
+            raise PrintContentError("无效的打印内容类型")
         
         _print_image_with_gdi(
             bytes(payload), 
             printer_name, 
-            job.copies, 
-            job.title,
-            media_size=job.media_size,
-            color_mode=job.color_mode,
-            fit_mode=fit_mode,
-            auto_rotate=auto_rotate,
-            enhance_quality=enhance_quality
+            request.copies, 
+            request.title,
+            media_size=request.media_size,
+            color_mode=request.color_mode,
+            fit_mode=request.fit_mode,
+            auto_rotate=request.auto_rotate,
+            enhance_quality=request.enhance_quality,
+            imposition=request.imposition
         )
     # SVG 支持已移除
     else:
         if not isinstance(payload, str):
-            raise RuntimeError("无效的打印内容类型")
+            raise PrintContentError("无效的打印内容类型")
         path = payload
         try:
             if mode == "word":
-                _print_with_word(path, printer_name, job.copies)
+                _print_with_word(path, printer_name, request.copies)
             elif mode == "excel":
-                _print_with_excel(path, printer_name, job.copies)
+                _print_with_excel(path, printer_name, request.copies)
             else:
                 raise RuntimeError("未知的打印模式")
         finally:
@@ -478,41 +1041,350 @@ def _send_to_printer(job: PrintJob) -> None:
                 os.remove(path)
 
 
+def _job_filter_conditions(db: Session, job_filter: JobFilter) -> list:
+    conditions = []
+    if job_filter.job_ids is not None:
+        conditions.append(PrintJob.id.in_(job_filter.job_ids))
+    if job_filter.owner_id is not None:
+        conditions.append(PrintJob.owner_id == job_filter.owner_id)
+    if job_filter.printer_name:
+        printer = db.query(Printer).filter(Printer.name == job_filter.printer_name).first()
+        if not printer:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="指定的打印机不存在")
+        conditions.append(PrintJob.printer_id == printer.id)
+    if job_filter.statuses:
+        conditions.append(PrintJob.status.in_(job_filter.statuses))
+    if job_filter.batch_id:
+        conditions.append(PrintJob.batch_id == job_filter.batch_id)
+    if job_filter.created_from is not None:
+        conditions.append(PrintJob.created_at >= job_filter.created_from)
+    if job_filter.created_to is not None:
+        conditions.append(PrintJob.created_at < job_filter.created_to)
+    if not conditions and not job_filter.all:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="未指定筛选条件，如需操作全部任务请设置 all=true"
+        )
+    return conditions
+
+
+def _bulk_update_jobs(
+    db: Session,
+    job_filter: JobFilter,
+    allowed_statuses: set,
+    values: dict,
+    level: str,
+    message: str,
+    extra_conditions: tuple = (),
+) -> list:
+    """
+    以一条 UPDATE 更新所有符合条件的任务，返回受影响任务的
+    ``(id, priority, owner_id, status, error_message, printer_id)``
+
+    只更新处于 ``allowed_statuses`` 的任务；日志以一条批量 INSERT 写入，与更新在同一事务中提交，
+    提交后为每个任务发布状态与日志事件。
+    """
+    conditions = _job_filter_conditions(db, job_filter)
+    conditions.append(PrintJob.status.in_(allowed_statuses))
+    conditions.extend(extra_conditions)
+    rows = db.execute(
+        update(PrintJob)
+        .where(*conditions)
+        .values(**values)
+        .returning(
+            PrintJob.id,
+            PrintJob.priority,
+            PrintJob.owner_id,
+            PrintJob.status,
+            PrintJob.error_message,
+            PrintJob.printer_id,
+        )
+        .execution_options(synchronize_session=False)
+    ).all()
+    summary = f"{message}（批量操作，共 {len(rows)} 个任务）"
+    if rows:
+        db.execute(insert(JobLog), [{"job_id": row.id, "level": level, "message": summary} for row in rows])
+    db.commit()
+    logger.info("{}: {} 个任务", message, len(rows))
+    for row in rows:
+        if "status" in values:
+            _publish_status((row.id, row.status, row.error_message, row.owner_id, row.printer_id))
+        job_event_bus.publish_log(row.id, level, summary)
+    return rows
+
+
+def bulk_cancel_jobs(db: Session, job_filter: JobFilter) -> int:
+    rows = _bulk_update_jobs(db, job_filter, ACTIVE_JOB_STATUSES, {"status": "cancelled"}, "warning", "任务已被取消")
+    job_queue.cancel_many(row.id for row in rows)
+    return len(rows)
+
+
+def bulk_reprioritize_jobs(db: Session, request: BulkJobReprioritize) -> int:
+    rows = _bulk_update_jobs(
+        db, request, PENDING_JOB_STATUSES, {"priority": request.priority}, "info", f"任务优先级已调整为 {request.priority}"
+    )
+    missing = set(job_queue.reprioritize_many([row.id for row in rows], request.priority))
+    job_queue.enqueue_many((row.id, row.priority, row.owner_id) for row in rows if row.id in missing and row.status == "queued")
+    return len(rows)
+
+
+def bulk_requeue_jobs(db: Session, job_filter: JobFilter) -> int:
+    values = {"status": "queued", "attempts": 0, "next_attempt_at": None, "error_message": None}
+    # 打印内容已归档的任务（包括原任务内容已归档的重印任务）无法再执行
+    source = aliased(PrintJob)
+    rows = _bulk_update_jobs(
+        db,
+        job_filter,
+        REQUEUEABLE_JOB_STATUSES,
+        values,
+        "info",
+        "任务已重新进入队列",
+        extra_conditions=(
+            PrintJob.payload_archived_at.is_(None),
+            ~exists().where(source.id == PrintJob.source_job_id, source.payload_archived_at.is_not(None)),
+        ),
+    )
+    job_queue.enqueue_many((row.id, row.priority, row.owner_id) for row in rows)
+    return len(rows)
+
+
+def requeue_dead_letter_jobs(db: Session, request: DeadLetterRequeue) -> int:
+    return bulk_requeue_jobs(db, JobFilter(job_ids=request.job_ids, statuses=["dead_letter"]))
+
+
+def restore_pending_jobs(db: Session) -> int:
+    """服务启动时将数据库中排队和等待重试的任务重新放入内存队列"""
+    jobs = db.query(PrintJob).filter(PrintJob.status.in_(["queued", "retrying"])).order_by(PrintJob.id).all()
+    now = now_shanghai()
+    for job in jobs:
+        if job.status == "retrying" and job.next_attempt_at:
+            next_attempt_at = job.next_attempt_at
+            if next_attempt_at.tzinfo is None:
+                next_attempt_at = next_attempt_at.replace(tzinfo=now.tzinfo)
+            job_queue.enqueue_delayed(job.id, job.priority, (next_attempt_at - now).total_seconds(), job.owner_id)
+        else:
+            job_queue.enqueue(job.id, job.priority, job.owner_id)
+    return len(jobs)
+
+
+def _route_to_available_printer(db: Session, job: PrintJob) -> None:
+    """打印机熔断时改派到同组预计最快完成的可用成员，组内没有可用成员时按打印机不可用处理"""
+    printer = job.printer
+    if printer is None or printer_health.allow_request(printer.id):
+        return
+    failover = None
+    if printer.group_id is not None:
+        members = printer_service.list_group_members(db, printer.group_id, exclude_id=printer.id)
+        failover = printer_dispatcher.choose(db, members, job.copies, printer_health.is_available)
+    if failover is None or not printer_health.allow_request(failover.id):
+        raise PrinterUnavailableError(f"打印机 '{printer.name}' 暂不可用（已熔断）")
+    job.printer_id = failover.id
+    job.printer = failover
+    create_job_log(job.id, "warning", f"打印机 '{printer.name}' 已熔断，任务改派到 '{failover.name}'")
+
+
+def _handle_print_failure(db: Session, job: PrintJob, exc: Exception, record_health: bool = True) -> Optional[float]:
+    """按错误类别的重试策略处理失败，返回下次重试前的等待秒数（不再重试时返回 None）"""
+    error_class = classify_error(exc)
+    policy = get_retry_policy(error_class)
+    if record_health and job.printer_id is not None:
+        if error_class in {"printer_unavailable", "timeout"}:
+            printer_health.record_failure(job.printer_id, str(exc))
+        else:
+            # 内容错误等与打印机无关的失败不影响熔断状态，但要归还半开状态的试探名额
+            printer_health.release_trial(job.printer_id)
+    attempts = job.attempts or 1
+    job.error_message = str(exc)
+    if attempts < policy.max_attempts:
+        delay = policy.delay_for(attempts)
+        job.status = "retrying"
+        job.next_attempt_at = now_shanghai() + timedelta(seconds=delay)
+        create_job_log(job.id, "warning", f"打印失败（{error_class}），{delay:.0f} 秒后进行第 {attempts + 1} 次尝试: {exc}")
+        return delay
+    job.next_attempt_at = None
+    if policy.max_attempts > 1:
+        job.status = "dead_letter"
+        create_job_log(job.id, "error", f"已尝试 {attempts} 次仍然失败，任务移入死信: {exc}")
+    else:
+        job.status = "failed"
+        create_job_log(job.id, "error", f"打印失败: {exc}")
+    return None
+
+
+def _claim_job(db: Session, job_id: int, statuses: tuple[str, ...] = ("queued", "retrying")) -> bool:
+    """以条件更新认领任务，多个工作线程或重复入队时同一任务只会执行一次"""
+    claimed = (
+        db.query(PrintJob)
+        .filter(PrintJob.id == job_id, PrintJob.status.in_(statuses))
+        .update(
+            {
+                PrintJob.status: "processing",
+                PrintJob.attempts: func.coalesce(PrintJob.attempts, 0) + 1,
+                PrintJob.next_attempt_at: None,
+            },
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    return bool(claimed)
+
+
+def _collect_coalesced_jobs(db: Session, batch: List[PrintJob], backend: str) -> None:
+    """在打印机的合并窗口内认领同一打印机、纸张、颜色模式和拼版方式的排队任务，追加到 ``batch``
+
+    ``batch[0]`` 是已认领的首个任务；认领到的任务立即追加，出错时调用方仍能处理它们。
+    窗口在工作线程上等待，队首换成其他打印机的任务时提前结束，不让其他打印机等待合并窗口。
+    """
+    leader = batch[0]
+    printer = leader.printer
+    if printer is None or backend not in COALESCE_FILE_TYPES:
+        return
+    window = (printer.coalesce_window_ms or 0) / 1000
+    limit = printer.coalesce_max_jobs or 0
+    if window <= 0 and limit <= 1:
+        return
+    if limit <= 0:
+        limit = COALESCE_MAX_BATCH
+
+    deadline = time.monotonic() + window
+    checked_head = None
+    while True:
+        candidate_ids = [
+            job_id
+            for (job_id,) in db.query(PrintJob.id)
+            .filter(
+                PrintJob.status == "queued",
+                PrintJob.printer_id == printer.id,
+                PrintJob.file_type.in_(COALESCE_FILE_TYPES[backend]),
+                PrintJob.media_size.is_not_distinct_from(leader.media_size),
+                PrintJob.color_mode.is_not_distinct_from(leader.color_mode),
+                PrintJob.imposition.is_not_distinct_from(leader.imposition),
+            )
+            .order_by(PrintJob.priority, PrintJob.id)
+            .limit(limit - len(batch))
+            .all()
+        ]
+        for job_id in candidate_ids:
+            if _claim_job(db, job_id, ("queued",)):
+                job_queue.cancel(job_id)
+                batch.append(db.query(PrintJob).filter(PrintJob.id == job_id).first())
+                _publish_status(_status_snapshot(batch[-1]))
+        remaining = deadline - time.monotonic()
+        if len(batch) >= limit or remaining <= 0:
+            break
+        head = job_queue.peek()
+        if head is not None and head != checked_head:
+            if db.query(PrintJob.printer_id).filter(PrintJob.id == head).scalar() != printer.id:
+                break
+            checked_head = head
+        time.sleep(min(COALESCE_POLL_SECONDS, remaining))
+
+
+def _ensure_payload_available(job: PrintJob) -> None:
+    """打印内容（重印任务为原任务的内容）已归档时无法打印"""
+    if job.payload_source.payload_archived_at is not None:
+        raise PrintContentError("打印内容已归档，无法打印")
+
+
+def _prepare_batch_payloads(batch: List[PrintJob], backend: str) -> tuple[list, list]:
+    """在合并打印前逐个解析内容，返回 ``(可打印的 (任务, 内容) 列表, 内容无效的 (任务, 异常) 列表)``"""
+    ready, rejected = [], []
+    for job in batch:
+        try:
+            _ensure_payload_available(job)
+            payload = job.print_content if backend == "raw" else _load_image_for_gdi(job.print_content)
+        except PrintContentError as exc:
+            rejected.append((job, exc))
+            continue
+        ready.append((job, payload))
+    return ready, rejected
+
+
 def process_print_job(job_id: int) -> None:
+    retries: List[tuple[int, int, float, Optional[int]]] = []
+    finished: dict = {}
     with session_scope() as db:
-        job = db.query(PrintJob).filter(PrintJob.id == job_id).first()
-        if not job:
-            logger.warning("队列中的任务不存在: {}", job_id)
+        if not _claim_job(db, job_id):
+            if db.query(PrintJob.id).filter(PrintJob.id == job_id).first() is None:
+                logger.warning("队列中的任务不存在: {}", job_id)
             return
-        if job.status not in {"queued", "processing"}:
-            return
-        if job.status == "cancelled":
-            return
-        job.status = "processing"
-        db.add(job)
-        db.commit()
-        db.refresh(job)
+        job = db.query(PrintJob).filter(PrintJob.id == job_id).first()
+        _publish_status(_status_snapshot(job))
 
+        batch = [job]
+        failures: List[tuple[PrintJob, Exception]] = []
         try:
-            _send_to_printer(job)
-            job.status = "completed"
-            job.error_message = None
-            create_job_log(db, job.id, "info", "任务打印完成")
+            file_type = job.file_type.lower()
+            backend = _resolve_print_backend(file_type)
+            # 在当前线程确定并加载打印机，监督线程中不再触发懒加载
+            _route_to_available_printer(db, job)
+            # 模板同样在当前线程加载
+            if file_type in TEMPLATE_RECORD_TYPES and job.template is None:
+                raise PrintContentError("标签模板已被删除")
+            # 重印任务引用的原任务内容同样在当前线程加载
+            if job.source_job_id is not None and job.source_job is None:
+                raise PrintContentError("重印引用的原任务已被删除")
+            _ensure_payload_available(job)
+            _collect_coalesced_jobs(db, batch, backend)
+            # 打印机与打印内容在当前线程准备好，准备耗时不计入打印截止时间；
+            # 超时后本线程会提交并关闭会话，被放弃的打印线程只使用这些普通数据
+            if len(batch) > 1:
+                ready, failures = _prepare_batch_payloads(batch, backend)
+                batch = [item for item, _ in ready]
+                if ready:
+                    requests = _prepare_batch_requests(ready, backend)
+                    started = time.monotonic()
+                    print_watchdog.run(
+                        job.id,
+                        lambda: _send_batch_to_printer(requests, backend),
+                        timeout=_resolve_print_timeout(file_type, backend) * len(ready),
+                        backend=backend,
+                    )
+            else:
+                request = _prepare_print_request(job)
+                started = time.monotonic()
+                print_watchdog.run(
+                    job.id,
+                    lambda: _send_to_printer(request),
+                    timeout=_resolve_print_timeout(file_type, backend),
+                    backend=backend,
+                )
+            for item in batch:
+                item.status = "completed"
+                item.error_message = None
+                if len(batch) > 1:
+                    create_job_log(item.id, "info", f"任务打印完成（{len(batch)} 个任务合并为一个打印文档）")
+                else:
+                    create_job_log(item.id, "info", "任务打印完成")
+            if batch and job.printer_id is not None:
+                printer_health.record_success(job.printer_id)
+                pages = sum(item.copies for item in batch)
+                printer_dispatcher.record_completion(job.printer_id, pages, time.monotonic() - started)
         except Exception as exc:  # pragma: no cover
-            logger.exception("打印任务失败: {}", job.id)
-            job.status = "failed"
-            job.error_message = str(exc)
-            create_job_log(db, job.id, "error", f"打印失败: {exc}")
+            logger.exception("打印任务失败: {}", [item.id for item in batch])
+            failures.extend((item, exc) for item in batch)
         finally:
-            db.add(job)
+            for index, (item, exc) in enumerate(failures):
+                # 合并文档失败只计一次打印机故障
+                retry_delay = _handle_print_failure(db, item, exc, record_health=index == 0)
+                if retry_delay is not None:
+                    retries.append((item.id, item.priority, retry_delay, item.owner_id))
+            for item in batch:
+                db.add(item)
+            # 出错时批次中的任务同时在 failures 中，按任务 ID 去重
+            finished = {item.id: _status_snapshot(item) for item in [*batch, *(item for item, _ in failures)]}
             db.commit()
 
+    _publish_status(*finished.values())
+    # 状态提交后再进入延迟队列，避免重试先于 "retrying" 状态落库
+    for retry_job_id, priority, retry_delay, owner_id in retries:
+        job_queue.enqueue_delayed(retry_job_id, priority, retry_delay, owner_id)
+
 
 def generate_preview(job: PrintJob) -> bytes:
     file_type = job.file_type.lower()
     if file_type in SUPPORTED_IMAGE_TYPES:
         try:
-            image = Image.open(io.BytesIO(job.content))
+            image = Image.open(io.BytesIO(job.print_content))
         except Exception as exc:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="图片内容无法读取") from exc
         preview = image.copy()
@@ -524,10 +1396,19 @@ def generate_preview(job: PrintJob) -> bytes:
     if file_type == "pdf":
         if not fitz:
             raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail="缺少 PyMuPDF，无法生成 PDF 预览")
-        doc = fitz.open(stream=job.content, filetype="pdf")
+        doc = fitz.open(stream=job.print_content, filetype="pdf")
         if doc.page_count == 0:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="PDF 文件无内容")
         page = doc.load_page(0)
         pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))
         return pix.tobytes("png")
+    if file_type in TEMPLATE_RECORD_TYPES and job.template is not None:
+        try:
+            record = next(iter_records(job.print_content, file_type), None) or {}
+            preview = template_service.get_renderer(job.template).render(record)
+        except (RuntimeError, ValueError, UnicodeDecodeError) as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"标签无法渲染: {exc}") from exc
+        buffer = io.BytesIO()
+        preview.save(buffer, format="PNG")
+        return buffer.getvalue()
     raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="当前任务不支持预览")
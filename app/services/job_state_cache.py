@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, NamedTuple, Optional
+
+from app.core.config import settings
+from app.services.cache_invalidation import cache_invalidation_feed
+
+
+class JobState(NamedTuple):
+    status: str
+    error_message: Optional[str]
+    owner_id: Optional[int]
+    printer_id: Optional[int]
+
+
+class JobStateCache:
+    """任务状态的内存缓存
+
+    任务服务在每次状态变化提交后写入最新状态（:meth:`put`），状态查询先读缓存，
+    未命中时查询数据库并回填（:meth:`fill`）。按最近使用淘汰，最多保留 ``max_entries`` 个任务。
+    回填不覆盖已有的缓存项，并且在读取数据库期间发生过失效时放弃回填，
+    避免较早读到的状态覆盖较新的状态。多进程部署时通过 :data:`cache_invalidation_feed`
+    删除其他进程修改过的任务。``max_entries`` 为 0 时不缓存。
+    """
+
+    def __init__(self, max_entries: int = 10000) -> None:
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, JobState]" = OrderedDict()
+        self._generation = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    @property
+    def generation(self) -> int:
+        """读取数据库前记下，回填时传给 :meth:`fill`"""
+        return self._generation
+
+    def get(self, job_id: int) -> Optional[JobState]:
+        with self._lock:
+            state = self._entries.get(job_id)
+            if state is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(job_id)
+            self._hits += 1
+            return state
+
+    def put(self, job_id: int, state: JobState) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[job_id] = state
+            self._entries.move_to_end(job_id)
+            self._evict()
+
+    def fill(self, job_id: int, state: JobState, generation: int) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            if job_id in self._entries or generation != self._generation:
+                return
+            self._entries[job_id] = state
+            self._evict()
+
+    def invalidate(self, job_ids: Iterable) -> None:
+        with self._lock:
+            self._generation += 1
+            for job_id in job_ids:
+                if self._entries.pop(int(job_id), None) is not None:
+                    self._invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+            }
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+
+job_state_cache = JobStateCache(max_entries=settings.job_state_cache_size)
+cache_invalidation_feed.register("job", job_state_cache.invalidate)
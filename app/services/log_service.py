@@ -1,20 +1,312 @@
 from __future__ import annotations
 
+import asyncio
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from loguru import logger
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
+from app.core.database import SessionLocal, session_scope
+from app.core.time_utils import now_shanghai
 from app.models import JobLog
+from app.services.job_events import job_event_bus
+
+
+class JobLogSink:
+    """任务日志批量写入器
+
+    日志先进入内存缓冲区，由后台线程在缓冲达到 ``batch_size`` 条或等待超过
+    ``flush_interval`` 秒时以一条批量 INSERT 写入并提交，任务的热路径不再为
+    每条日志单独提交。写入按缓冲顺序串行进行，同一任务的日志顺序不变。
+    写入失败（如数据库暂时被锁定）时日志放回缓冲区开头，间隔 ``flush_interval`` 后重试，
+    连续失败 ``max_retries`` 次才丢弃。
+    ``synchronous`` 模式下每条日志在调用返回前写入，便于测试。
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 200,
+        flush_interval: float = 0.2,
+        synchronous: bool = False,
+        session_factory: Callable[[], Session] = SessionLocal,
+        max_retries: int = 3,
+    ) -> None:
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.synchronous = synchronous
+        self.max_retries = max(1, max_retries)
+        self._session_factory = session_factory
+        self._buffer: List[Dict[str, Any]] = []
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._written = 0
+        self._flushes = 0
+        self._dropped = 0
+        self._failures = 0
+
+    def write(self, job_id: int, level: str, message: str) -> None:
+        entry = {"job_id": job_id, "level": level, "message": message, "created_at": now_shanghai()}
+        with self._condition:
+            self._buffer.append(entry)
+            if len(self._buffer) >= self.batch_size:
+                self._condition.notify()
+        if self.synchronous:
+            self.flush()
+        elif not self._running:
+            self.start()
+
+    def flush(self) -> int:
+        """立即写入缓冲区中的全部日志，返回写入的条数"""
+        with self._flush_lock:
+            with self._condition:
+                entries, self._buffer = self._buffer, []
+            if not entries:
+                return 0
+            try:
+                with self._session_factory() as db:
+                    db.execute(insert(JobLog), entries)
+                    db.commit()
+            except Exception:
+                self._failures += 1
+                if self._failures < self.max_retries:
+                    logger.warning("写入任务日志失败（第 {} 次），{} 条稍后重试", self._failures, len(entries))
+                    with self._condition:
+                        self._buffer[:0] = entries
+                    return 0
+                self._failures = 0
+                self._dropped += len(entries)
+                logger.exception("写入任务日志连续失败 {} 次，丢弃 {} 条", self.max_retries, len(entries))
+                return 0
+            self._failures = 0
+            self._written += len(entries)
+            self._flushes += 1
+            return len(entries)
+
+    def start(self) -> None:
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name="job-log-sink", daemon=True)
+        self._thread.start()
 
+    def stop(self) -> None:
+        """停止后台线程并写入剩余日志"""
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+        while self._failures and self.has_pending():
+            time.sleep(self.flush_interval)
+            self.flush()
 
-def create_job_log(db: Session, job_id: int, level: str, message: str) -> JobLog:
-    log = JobLog(job_id=job_id, level=level, message=message)
-    db.add(log)
-    db.commit()
-    db.refresh(log)
-    return log
+    def has_pending(self) -> bool:
+        with self._condition:
+            return bool(self._buffer)
 
+    def stats(self) -> Dict[str, int]:
+        with self._condition:
+            pending = len(self._buffer)
+        return {"pending": pending, "written": self._written, "flushes": self._flushes, "dropped": self._dropped}
 
-def list_job_logs(db: Session, job_id: int | None = None):
-    query = db.query(JobLog)
+    def _run(self) -> None:
+        while self._running:
+            with self._condition:
+                # 写入失败后同样等待一个间隔再重试
+                if self._running and (len(self._buffer) < self.batch_size or self._failures):
+                    self._condition.wait(self.flush_interval)
+            self.flush()
+
+
+job_log_sink = JobLogSink(
+    batch_size=settings.job_log_batch_size,
+    flush_interval=settings.job_log_flush_interval_ms / 1000,
+    synchronous=settings.job_log_synchronous,
+)
+
+
+def create_job_log(job_id: int, level: str, message: str) -> None:
+    """记录任务日志，由 :data:`job_log_sink` 批量写入，同时发布日志事件"""
+    job_log_sink.write(job_id, level, message)
+    job_event_bus.publish_log(job_id, level, message)
+
+
+def _log_conditions(
+    job_id: Optional[int] = None,
+    level: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+) -> list:
+    conditions = []
     if job_id is not None:
-        query = query.filter(JobLog.job_id == job_id)
-    return query.order_by(JobLog.created_at.desc()).all()
+        conditions.append(JobLog.job_id == job_id)
+    if level:
+        conditions.append(JobLog.level == level)
+    if created_from is not None:
+        conditions.append(JobLog.created_at >= created_from)
+    if created_to is not None:
+        conditions.append(JobLog.created_at < created_to)
+    return conditions
+
+
+def _filtered_logs(
+    db: Session,
+    job_id: Optional[int] = None,
+    level: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+):
+    return db.query(JobLog).filter(*_log_conditions(job_id, level, created_from, created_to))
+
+
+async def list_job_logs_async(
+    db: AsyncSession,
+    job_id: Optional[int] = None,
+    level: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    after_id: Optional[int] = None,
+    limit: int = 100,
+) -> List[JobLog]:
+    """
+    按写入顺序（与 ``created_at`` 升序一致）分页查询日志
+
+    使用游标分页：下一页传入本页最后一条的 ID 作为 ``after_id``，翻页代价与页码无关。
+    缓冲中有日志时先在线程池中写入，保证读到刚刚发生的事件。
+    """
+    if job_log_sink.has_pending():
+        await asyncio.to_thread(job_log_sink.flush)
+    conditions = _log_conditions(job_id, level, created_from, created_to)
+    if after_id is not None:
+        conditions.append(JobLog.id > after_id)
+    result = await db.execute(select(JobLog).where(*conditions).order_by(JobLog.id).limit(limit))
+    return list(result.scalars())
+
+
+def iter_job_logs(
+    job_id: Optional[int] = None,
+    level: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    chunk_size: int = 1000,
+) -> Iterator[JobLog]:
+    """按写入顺序逐批导出全部符合条件的日志，每批使用独立的短会话，不长时间持有读事务"""
+    job_log_sink.flush()
+    after_id = 0
+    while True:
+        with SessionLocal() as db:
+            chunk = (
+                _filtered_logs(db, job_id, level, created_from, created_to)
+                .filter(JobLog.id > after_id)
+                .order_by(JobLog.id)
+                .limit(chunk_size)
+                .all()
+            )
+            db.expunge_all()
+        yield from chunk
+        if len(chunk) < chunk_size:
+            return
+        after_id = chunk[-1].id
+
+
+class JobLogRetention:
+    """任务日志保留策略
+
+    后台线程定期删除超过保留天数的日志，可选先按天追加到 NDJSON 归档文件。
+    每个事务只处理 ``batch_size`` 条，批次之间短暂让出写锁，不阻塞任务写入。
+    """
+
+    def __init__(self, batch_pause: float = 0.05) -> None:
+        self.batch_pause = batch_pause
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self, retention_days: int, batch_size: int, archive_directory: str = "") -> int:
+        """删除（并归档）过期日志，返回处理的条数"""
+        if retention_days <= 0:
+            return 0
+        cutoff = now_shanghai() - timedelta(days=retention_days)
+        removed = 0
+        while True:
+            with session_scope() as db:
+                logs = (
+                    db.query(JobLog)
+                    .filter(JobLog.created_at < cutoff)
+                    # 按 created_at 排序才能沿索引只读取过期的部分，按 id 排序会退化为全表扫描
+                    .order_by(JobLog.created_at, JobLog.id)
+                    .limit(max(1, batch_size))
+                    .all()
+                )
+                if not logs:
+                    break
+                if archive_directory:
+                    self._archive(archive_directory, logs)
+                db.query(JobLog).filter(JobLog.id.in_([log.id for log in logs])).delete(synchronize_session=False)
+            removed += len(logs)
+            if len(logs) < batch_size:
+                break
+            time.sleep(self.batch_pause)
+        if removed:
+            logger.info("已清理过期任务日志 {} 条", removed)
+        return removed
+
+    @staticmethod
+    def _archive(directory: str, logs: List[JobLog]) -> None:
+        os.makedirs(directory, exist_ok=True)
+        files: Dict[str, List[str]] = {}
+        for log in logs:
+            line = json.dumps(
+                {
+                    "id": log.id,
+                    "job_id": log.job_id,
+                    "level": log.level,
+                    "message": log.message,
+                    "created_at": log.created_at.isoformat(),
+                },
+                ensure_ascii=False,
+            )
+            files.setdefault(log.created_at.strftime("%Y-%m-%d"), []).append(line)
+        for day, lines in files.items():
+            with open(os.path.join(directory, f"job_logs-{day}.ndjson"), "a", encoding="utf-8") as archive:
+                archive.write("\n".join(lines) + "\n")
+
+    def start(self, interval: float) -> None:
+        if interval <= 0 or settings.job_log_retention_days <= 0:
+            return
+        if self._thread and self._thread.is_alive():
+            if not self._stop.is_set():
+                return
+            self._thread.join()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), name="job-log-retention", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.run_once(
+                    settings.job_log_retention_days,
+                    settings.job_log_retention_batch_size,
+                    settings.job_log_archive_directory,
+                )
+            except Exception:
+                logger.exception("清理任务日志失败")
+
+
+job_log_retention = JobLogRetention()
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import gzip
+import os
+import threading
+import time
+from datetime import timedelta
+from typing import Dict, Iterable, Optional
+
+from loguru import logger
+from sqlalchemy import exists, update
+from sqlalchemy.orm import Query, aliased
+
+from app.core.config import settings
+from app.core.database import engine, is_sqlite_file, session_scope
+from app.core.time_utils import now_shanghai
+from app.models import PrintJob
+from app.services.job_service import ARCHIVABLE_JOB_STATUSES
+from app.utils.payload_codec import iter_decoded
+
+
+class PayloadArchiver:
+    """任务打印内容分层归档
+
+    后台线程定期处理结束超过保留天数的任务：打印内容可选先以 gzip 压缩写入归档目录，
+    然后从数据库中清空，任务的其余字段保持不变，仍可正常查询。每个事务只处理
+    ``batch_size`` 个任务，批次之间短暂让出写锁。仍有未结束的重印任务引用的原任务不会被归档。
+    处理完成后执行增量 VACUUM 将释放的页面归还给文件系统。
+    """
+
+    def __init__(self, batch_pause: float = 0.05) -> None:
+        self.batch_pause = batch_pause
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._archived = 0
+        self._bytes_released = 0
+
+    def run_once(self, retention_days: int, batch_size: int, archive_directory: str = "", vacuum_pages: int = 0) -> int:
+        """归档（或删除）过期任务的打印内容，返回处理的任务数"""
+        if retention_days <= 0:
+            return 0
+        cutoff = now_shanghai() - timedelta(days=retention_days)
+        batch_size = max(1, batch_size)
+        processed = 0
+        while True:
+            with session_scope() as db:
+                candidates = self._candidates(db, cutoff, batch_size).all()
+                if not candidates:
+                    break
+                paths: Dict[int, Optional[str]] = {}
+                released = 0
+                for job_id, created_at, file_type in candidates:
+                    # 逐个读取内容，避免一次把整批大文件载入内存
+                    content, codec = db.query(PrintJob.content, PrintJob.content_codec).filter(PrintJob.id == job_id).one()
+                    released += len(content or b"")
+                    paths[job_id] = (
+                        self._archive(archive_directory, job_id, created_at, file_type, iter_decoded(content or b"", codec))
+                        if archive_directory
+                        else None
+                    )
+                archived_at = now_shanghai()
+                for job_id, path in paths.items():
+                    db.execute(
+                        update(PrintJob)
+                        # 再次检查引用，候选查询之后新建的重印任务仍能读到内容
+                        .where(PrintJob.id == job_id, PrintJob.payload_archived_at.is_(None), ~self._referenced())
+                        .values(
+                            content=b"",
+                            content_codec=None,
+                            payload_archived_at=archived_at,
+                            payload_archive_path=path,
+                            # 归档不算任务本身的变更，保留原来的更新时间
+                            updated_at=PrintJob.updated_at,
+                        )
+                        .execution_options(synchronize_session=False)
+                    )
+            processed += len(candidates)
+            self._archived += len(candidates)
+            self._bytes_released += released
+            if len(candidates) < batch_size:
+                break
+            time.sleep(self.batch_pause)
+        if processed:
+            logger.info("已归档 {} 个任务的打印内容", processed)
+            if vacuum_pages > 0:
+                self.incremental_vacuum(vacuum_pages)
+        return processed
+
+    @staticmethod
+    def _referenced():
+        """任务仍被未结束的重印任务引用"""
+        reprint = aliased(PrintJob)
+        return exists().where(
+            reprint.source_job_id == PrintJob.id,
+            reprint.status.notin_(ARCHIVABLE_JOB_STATUSES),
+        )
+
+    @classmethod
+    def _candidates(cls, db, cutoff, batch_size: int) -> Query:
+        return (
+            db.query(PrintJob.id, PrintJob.created_at, PrintJob.file_type)
+            .filter(
+                # 前三个条件沿 ix_print_jobs_payload_pending 顺序读取
+                PrintJob.payload_archived_at.is_(None),
+                PrintJob.source_job_id.is_(None),
+                PrintJob.updated_at < cutoff,
+                PrintJob.status.in_(ARCHIVABLE_JOB_STATUSES),
+                ~cls._referenced(),
+            )
+            .order_by(PrintJob.updated_at)
+            .limit(batch_size)
+        )
+
+    @staticmethod
+    def _archive(directory: str, job_id: int, created_at, file_type: str, chunks: Iterable[bytes]) -> str:
+        """以 gzip 写入解压后的原始内容，数据库中的压缩格式变化不影响归档文件"""
+        folder = os.path.join(directory, created_at.strftime("%Y-%m"))
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"{job_id}.{file_type}.gz")
+        with gzip.open(path, "wb") as archive:
+            for chunk in chunks:
+                archive.write(chunk)
+        return path
+
+    @staticmethod
+    def incremental_vacuum(pages: int) -> bool:
+        """回收空闲页面，返回是否执行
+
+        数据库尚未启用增量回收时跳过：在线转换需要完整 VACUUM，期间所有写入都会等待直至超时。
+        已有数据库需停止服务后执行一次 ``scripts/enable_incremental_vacuum.py``。
+        """
+        if not is_sqlite_file(str(engine.url)):
+            return False
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            if connection.exec_driver_sql("PRAGMA auto_vacuum").scalar() != 2:
+                logger.warning("数据库未启用增量回收，跳过空间回收；请停止服务后执行 scripts/enable_incremental_vacuum.py")
+                return False
+            connection.exec_driver_sql(f"PRAGMA incremental_vacuum({int(pages)})")
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        return {"archived": self._archived, "bytes_released": self._bytes_released}
+
+    def start(self, interval: float) -> None:
+        if interval <= 0 or settings.payload_retention_days <= 0:
+            return
+        if self._thread and self._thread.is_alive():
+            if not self._stop.is_set():
+                return
+            self._thread.join()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), name="payload-archiver", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.run_once(
+                    settings.payload_retention_days,
+                    settings.payload_archive_batch_size,
+                    settings.payload_archive_directory,
+                    settings.payload_vacuum_pages,
+                )
+            except Exception:
+                logger.exception("归档任务打印内容失败")
+
+
+payload_archiver = PayloadArchiver()
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+from app.core.config import settings
+from app.core.database import session_scope
+from app.core.time_utils import now_shanghai
+from app.models import Printer
+from app.services import printer_service
+
+
+class CircuitBreaker:
+    """单台打印机的熔断器
+
+    连续失败达到阈值后断开（``open``），冷却时间过后进入半开状态
+    （``half_open``）只放行一次试探，试探成功则恢复，失败则再次断开。
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.last_error: Optional[str] = None
+        self.last_checked_at = None
+        self._trial_in_flight = False
+
+    def is_available(self) -> bool:
+        """与 ``allow_request`` 判断一致，但不占用半开状态的试探名额"""
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            return self._clock() - self.opened_at >= self.reset_timeout
+        return not self._trial_in_flight
+
+    def allow_request(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            if self._clock() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = self.HALF_OPEN
+            self._trial_in_flight = False
+        if self._trial_in_flight:
+            return False
+        self._trial_in_flight = True
+        return True
+
+    def release_trial(self) -> None:
+        """试探请求因与打印机无关的原因结束时归还名额，状态保持半开"""
+        self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.last_error = None
+        self.last_checked_at = now_shanghai()
+        self._trial_in_flight = False
+
+    def record_failure(self, reason: Optional[str] = None) -> None:
+        self.last_checked_at = now_shanghai()
+        self.last_error = reason
+        if self.state == self.OPEN:
+            return
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = self._clock()
+            self._trial_in_flight = False
+
+
+class PrinterHealthMonitor:
+    """打印机健康状态跟踪
+
+    熔断器同时由后台探测和任务执行结果驱动；后台线程按间隔通过
+    ``printer_service.probe_printer`` 探测全部打印机并同步 ``status`` 字段。
+    """
+
+    def __init__(self, probe: Optional[Callable[[str], Optional[bool]]] = None) -> None:
+        self._probe = probe
+        self._breakers: Dict[int, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _breaker(self, printer_id: int) -> CircuitBreaker:
+        breaker = self._breakers.get(printer_id)
+        if breaker is None:
+            breaker = CircuitBreaker(settings.printer_breaker_failure_threshold, settings.printer_breaker_reset_seconds)
+            self._breakers[printer_id] = breaker
+        return breaker
+
+    def allow_request(self, printer_id: int) -> bool:
+        with self._lock:
+            return self._breaker(printer_id).allow_request()
+
+    def is_available(self, printer_id: int) -> bool:
+        with self._lock:
+            breaker = self._breakers.get(printer_id)
+            return breaker is None or breaker.is_available()
+
+    def release_trial(self, printer_id: int) -> None:
+        with self._lock:
+            breaker = self._breakers.get(printer_id)
+            if breaker is not None:
+                breaker.release_trial()
+
+    def record_success(self, printer_id: int) -> None:
+        with self._lock:
+            breaker = self._breaker(printer_id)
+            recovered = breaker.state != CircuitBreaker.CLOSED
+            breaker.record_success()
+        if recovered:
+            logger.info("打印机已恢复，熔断器闭合: {}", printer_id)
+
+    def record_failure(self, printer_id: int, reason: Optional[str] = None) -> None:
+        with self._lock:
+            breaker = self._breaker(printer_id)
+            was_open = breaker.state == CircuitBreaker.OPEN
+            breaker.record_failure(reason)
+            opened = not was_open and breaker.state == CircuitBreaker.OPEN
+        if opened:
+            logger.warning("打印机连续失败，熔断器断开: {} ({})", printer_id, reason)
+
+    def probe_printers(self, printers: Iterable[Tuple[int, str]]) -> Dict[int, str]:
+        """探测 ``(printer_id, name)`` 列表并更新熔断器，返回探测得到的 ``{printer_id: status}``"""
+        probe = self._probe or printer_service.probe_printer
+        statuses: Dict[int, str] = {}
+        for printer_id, name in printers:
+            try:
+                available = probe(name)
+            except Exception as exc:
+                available = False
+                logger.warning("探测打印机失败: {} ({})", name, exc)
+            if available is None:
+                continue
+            if available:
+                self.record_success(printer_id)
+                statuses[printer_id] = "online"
+            else:
+                self.record_failure(printer_id, "健康探测失败")
+                statuses[printer_id] = "offline"
+        return statuses
+
+    def run_once(self) -> None:
+        with session_scope() as db:
+            printers = [(printer_id, name) for printer_id, name in db.query(Printer.id, Printer.name).all()]
+        statuses = self.probe_printers(printers)
+        if not statuses:
+            return
+        with session_scope() as db:
+            for printer in db.query(Printer).filter(Printer.id.in_(list(statuses))).all():
+                if printer.status != statuses[printer.id]:
+                    printer.status = statuses[printer.id]
+
+    def start(self, interval: float) -> None:
+        if interval <= 0:
+            return
+        if self._thread and self._thread.is_alive():
+            if not self._stop.is_set():
+                return
+            self._thread.join()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), name="printer-health", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("打印机健康探测失败")
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {
+                    "printer_id": printer_id,
+                    "state": breaker.state,
+                    "consecutive_failures": breaker.consecutive_failures,
+                    "last_error": breaker.last_error,
+                    "last_checked_at": breaker.last_checked_at,
+                }
+                for printer_id, breaker in sorted(self._breakers.items())
+            ]
+
+
+printer_health = PrinterHealthMonitor()
@@ -2,9 +2,13 @@ from __future__ import annotations
 
 from typing import List, Optional
 
-from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
-from app.models import Printer
+from app.models import Printer, PrinterGroup
+from app.schemas import PrinterGroupCreate
 
 try:
     import win32print  # type: ignore
@@ -14,6 +18,11 @@ except ImportError:  # pragma: no cover
     pywintypes = None
 
 
+# PRINTER_STATUS_ERROR | PRINTER_STATUS_OFFLINE | PRINTER_STATUS_NOT_AVAILABLE | PRINTER_STATUS_SERVER_UNKNOWN
+_UNAVAILABLE_STATUS_MASK = 0x00000002 | 0x00000080 | 0x00001000 | 0x00800000
+_WORK_OFFLINE_ATTRIBUTE = 0x00000400
+
+
 def fetch_system_printers() -> List[str]:
     if not win32print:
         return []
@@ -31,6 +40,27 @@ def get_default_system_printer() -> Optional[str]:
         return None
 
 
+def probe_printer(printer_name: str) -> Optional[bool]:
+    """探测打印机是否可用，无法探测（缺少 win32print）时返回 None"""
+    if not win32print:
+        return None
+    try:
+        handle = win32print.OpenPrinter(printer_name)
+    except Exception:
+        return False
+    try:
+        info = win32print.GetPrinter(handle, 2)
+    except Exception:
+        return False
+    finally:
+        win32print.ClosePrinter(handle)
+    if info.get("Status", 0) & _UNAVAILABLE_STATUS_MASK:
+        return False
+    if info.get("Attributes", 0) & _WORK_OFFLINE_ATTRIBUTE:
+        return False
+    return True
+
+
 def set_default_system_printer(printer_name: str) -> None:
     if not win32print:
         raise RuntimeError("win32print 未安装，无法设置默认打印机")
@@ -72,3 +102,47 @@ def set_default_printer(db: Session, printer: Printer) -> Printer:
     if printer.name and win32print:
         set_default_system_printer(printer.name)
     return printer
+
+
+def list_printer_groups(db: Session) -> List[PrinterGroup]:
+    return db.query(PrinterGroup).order_by(PrinterGroup.id).all()
+
+
+async def list_printers_async(db: AsyncSession) -> List[Printer]:
+    return list((await db.execute(select(Printer).order_by(Printer.id))).scalars())
+
+
+async def list_printer_groups_async(db: AsyncSession) -> List[PrinterGroup]:
+    result = await db.execute(select(PrinterGroup).options(selectinload(PrinterGroup.printers)).order_by(PrinterGroup.id))
+    return list(result.scalars())
+
+
+def create_printer_group(db: Session, group_in: PrinterGroupCreate) -> PrinterGroup:
+    if db.query(PrinterGroup).filter(PrinterGroup.name == group_in.name).first():
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="打印机分组已存在")
+    group = PrinterGroup(name=group_in.name, description=group_in.description)
+    db.add(group)
+    db.flush()
+    if group_in.printer_ids:
+        for printer in db.query(Printer).filter(Printer.id.in_(group_in.printer_ids)).all():
+            printer.group_id = group.id
+    db.commit()
+    db.refresh(group)
+    return group
+
+
+def delete_printer_group(db: Session, group: PrinterGroup) -> None:
+    db.query(Printer).filter(Printer.group_id == group.id).update({Printer.group_id: None})
+    db.delete(group)
+    db.commit()
+
+
+def list_group_members(db: Session, group_id: int, exclude_id: Optional[int] = None) -> List[Printer]:
+    """列出分组内未离线的打印机"""
+    query = db.query(Printer).filter(
+        Printer.group_id == group_id,
+        or_(Printer.status.is_(None), Printer.status != "offline"),
+    )
+    if exclude_id is not None:
+        query = query.filter(Printer.id != exclude_id)
+    return query.order_by(Printer.id).all()
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import json
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import LabelTemplate
+from app.schemas import LabelTemplateCreate, LabelTemplateUpdate
+from app.utils.label_renderer import LabelRenderer
+from app.utils.print_utils import mm_to_pixels
+
+
+RENDERER_CACHE_SIZE = 32
+
+_renderers: "OrderedDict[tuple, LabelRenderer]" = OrderedDict()
+_renderers_lock = threading.Lock()
+
+
+def list_templates(db: Session) -> List[LabelTemplate]:
+    return db.query(LabelTemplate).order_by(LabelTemplate.id).all()
+
+
+def get_template(db: Session, template_id: int) -> LabelTemplate:
+    template = db.query(LabelTemplate).filter(LabelTemplate.id == template_id).first()
+    if not template:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="标签模板不存在")
+    return template
+
+
+def create_template(db: Session, template_in: LabelTemplateCreate, owner_id: Optional[int]) -> LabelTemplate:
+    if db.query(LabelTemplate).filter(LabelTemplate.name == template_in.name).first():
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="标签模板已存在")
+    data = template_in.dict()
+    data["elements"] = json.dumps(data["elements"], ensure_ascii=False)
+    template = LabelTemplate(**data, owner_id=owner_id)
+    db.add(template)
+    db.commit()
+    db.refresh(template)
+    return template
+
+
+def update_template(db: Session, template: LabelTemplate, template_in: LabelTemplateUpdate) -> LabelTemplate:
+    data = template_in.dict(exclude_unset=True)
+    if "elements" in data:
+        data["elements"] = json.dumps(data["elements"], ensure_ascii=False)
+    output = data.get("output", template.output)
+    elements = json.loads(data.get("elements", template.elements))
+    if output == "zpl" and any(element["type"] == "image" and element.get("field") for element in elements):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="ZPL 输出不支持可变图片字段")
+    for field, value in data.items():
+        setattr(template, field, value)
+    db.add(template)
+    db.commit()
+    db.refresh(template)
+    return template
+
+
+def delete_template(db: Session, template: LabelTemplate) -> None:
+    db.delete(template)
+    db.commit()
+
+
+def get_renderer(template: LabelTemplate) -> LabelRenderer:
+    """按模板版本缓存渲染器，静态底图在同一版本的所有任务间复用"""
+    key = (template.id, template.updated_at)
+    with _renderers_lock:
+        renderer = _renderers.get(key)
+        if renderer is not None:
+            _renderers.move_to_end(key)
+            return renderer
+    renderer = LabelRenderer(
+        mm_to_pixels(template.width_mm, template.dpi),
+        mm_to_pixels(template.height_mm, template.dpi),
+        json.loads(template.elements),
+        font_path=settings.label_font_path or None,
+        format_name=f"TPL{template.id}",
+    )
+    with _renderers_lock:
+        _renderers[key] = renderer
+        while len(_renderers) > RENDERER_CACHE_SIZE:
+            _renderers.popitem(last=False)
+    return renderer
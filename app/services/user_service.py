@@ -3,12 +3,16 @@ from __future__ import annotations
 import secrets
 from typing import Optional
 
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.concurrency import run_cpu_bound
 from app.core.security import get_password_hash, verify_password
 from app.core.time_utils import now_shanghai
 from app.models import User
-from app.schemas import UserCreate
+from app.schemas import UserCreate, UserUpdate
+from app.services.auth_cache import invalidate_user
 
 
 def get_user_by_username(db: Session, username: str) -> Optional[User]:
@@ -33,6 +37,21 @@ def create_user(db: Session, user_in: UserCreate, is_admin: bool = False) -> Use
     return user
 
 
+def update_user(db: Session, user: User, user_in: UserUpdate) -> User:
+    data = user_in.dict(exclude_unset=True)
+    password = data.pop("password", None)
+    if password:
+        data["hashed_password"] = get_password_hash(password)
+    for field, value in data.items():
+        setattr(user, field, value)
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    # 停用、降权等修改立即对已缓存的认证结果生效
+    invalidate_user(user.id)
+    return user
+
+
 def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
     user = get_user_by_username(db, username)
     if not user:
@@ -42,12 +61,24 @@ def authenticate_user(db: Session, username: str, password: str) -> Optional[Use
     return user
 
 
+async def authenticate_user_async(db: AsyncSession, username: str, password: str) -> Optional[User]:
+    """异步查询用户，bcrypt 校验在 CPU 线程池中执行，不占用事件循环和接口线程池"""
+    user = (await db.execute(select(User).where(User.username == username))).scalar_one_or_none()
+    if not user:
+        return None
+    if not await run_cpu_bound(verify_password, password, user.hashed_password):
+        return None
+    return user
+
+
 def generate_api_key(db: Session, user: User) -> str:
     api_key = secrets.token_urlsafe(32)
     user.api_key = api_key
     db.add(user)
     db.commit()
     db.refresh(user)
+    # 旧的 API Key 立即失效
+    invalidate_user(user.id)
     return api_key
 
 
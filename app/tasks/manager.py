@@ -2,49 +2,137 @@ from __future__ import annotations
 
 import threading
 import time
-from queue import PriorityQueue, Empty
-from typing import Callable, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from loguru import logger
+
+from app.core.config import settings
+from app.tasks.scheduler import FairScheduler, IndexedHeap
 
 
 class JobQueueManager:
     def __init__(self) -> None:
-        self._queue: PriorityQueue[tuple[int, float, int]] = PriorityQueue()
+        self._scheduler = FairScheduler(
+            aging_seconds=settings.queue_aging_seconds,
+            weights=settings.queue_owner_weights,
+            max_inflight=settings.queue_max_inflight_per_owner,
+        )
+        self._condition = threading.Condition()
+        self._delayed = IndexedHeap()
+        self._delayed_jobs: Dict[int, tuple[int, Optional[int]]] = {}
+        self._delayed_lock = threading.Lock()
         self._processor: Optional[Callable[[int], None]] = None
-        self._worker_thread: Optional[threading.Thread] = None
+        self._workers: List[threading.Thread] = []
         self._running = False
-        self._cancelled: set[int] = set()
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
 
     def configure(self, processor: Callable[[int], None]) -> None:
         self._processor = processor
         if not self._running:
-            self._start_worker()
+            self._start_workers(max(1, settings.queue_worker_count))
+
+    def enqueue(self, job_id: int, priority: int, owner_id: Optional[int] = None) -> None:
+        with self._condition:
+            self._scheduler.push(job_id, priority, owner_id)
+            self._condition.notify()
+
+    def enqueue_delayed(self, job_id: int, priority: int, delay: float, owner_id: Optional[int] = None) -> None:
+        """延迟 ``delay`` 秒后再进入队列，等待期间不占用工作线程"""
+        with self._delayed_lock:
+            self._delayed.push(job_id, time.monotonic() + max(0.0, delay))
+            self._delayed_jobs[job_id] = (priority, owner_id)
+
+    def enqueue_many(self, jobs: Iterable[tuple[int, int, Optional[int]]]) -> None:
+        """批量入队 ``(job_id, priority, owner_id)``，只获取一次锁"""
+        with self._condition:
+            for job_id, priority, owner_id in jobs:
+                self._scheduler.push(job_id, priority, owner_id)
+            self._condition.notify_all()
 
-    def enqueue(self, job_id: int, priority: int) -> None:
-        self._queue.put((priority, time.time(), job_id))
+    def cancel(self, job_id: int) -> bool:
+        """从队列（含延迟队列）中删除任务，任务不在队列中时返回 ``False``"""
+        return self.cancel_many([job_id]) == 1
 
-    def cancel(self, job_id: int) -> None:
-        self._cancelled.add(job_id)
+    def cancel_many(self, job_ids: Iterable[int]) -> int:
+        """批量从队列（含延迟队列）中删除任务，返回实际删除的数量"""
+        job_ids = list(job_ids)
+        with self._condition:
+            removed = {job_id for job_id in job_ids if self._scheduler.remove(job_id)}
+        with self._delayed_lock:
+            for job_id in job_ids:
+                if self._delayed.remove(job_id):
+                    del self._delayed_jobs[job_id]
+                    removed.add(job_id)
+        return len(removed)
 
-    def _start_worker(self) -> None:
+    def reprioritize(self, job_id: int, priority: int) -> bool:
+        """原位调整排队中任务的优先级，任务不在队列中时返回 ``False``"""
+        return not self.reprioritize_many([job_id], priority)
+
+    def reprioritize_many(self, job_ids: Iterable[int], priority: int) -> List[int]:
+        """批量原位调整优先级，返回不在队列中的任务 ID"""
+        with self._condition:
+            missing = [job_id for job_id in job_ids if not self._scheduler.reprioritize(job_id, priority)]
+        with self._delayed_lock:
+            for job_id in missing:
+                if job_id in self._delayed_jobs:
+                    _, owner_id = self._delayed_jobs[job_id]
+                    self._delayed_jobs[job_id] = (priority, owner_id)
+            return [job_id for job_id in missing if job_id not in self._delayed_jobs]
+
+    def peek(self) -> Optional[int]:
+        """返回队首的任务 ID，队列为空时返回 ``None``"""
+        with self._condition:
+            return self._scheduler.peek()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            stats = self._scheduler.stats()
+        with self._delayed_lock:
+            stats["delayed"] = len(self._delayed)
+        stats["workers"] = len(self._workers)
+        return stats
+
+    def _promote_delayed(self) -> float:
+        """将到期的延迟任务移入队列，返回距下一个延迟任务到期的秒数"""
+        now = time.monotonic()
+        with self._delayed_lock:
+            while self._delayed and self._delayed.peek()[1] <= now:
+                job_id, _ = self._delayed.pop()
+                priority, owner_id = self._delayed_jobs.pop(job_id)
+                self.enqueue(job_id, priority, owner_id)
+            if self._delayed:
+                return self._delayed.peek()[1] - now
+        return 1.0
+
+    def _start_workers(self, count: int) -> None:
         self._running = True
-        self._worker_thread = threading.Thread(target=self._worker_loop, daemon=True)
-        self._worker_thread.start()
+        for index in range(count):
+            worker = threading.Thread(target=self._worker_loop, name=f"print-worker-{index}", daemon=True)
+            self._workers.append(worker)
+            worker.start()
 
     def _worker_loop(self) -> None:
         while self._running:
+            wait = min(1.0, self._promote_delayed())
+            with self._condition:
+                item = self._scheduler.pop()
+                if item is None:
+                    self._condition.wait(timeout=max(0.01, wait))
+                    continue
+            job_id, owner_id = item
             try:
-                priority, _, job_id = self._queue.get(timeout=1)
-            except Empty:
-                continue
-            if job_id in self._cancelled:
-                self._cancelled.discard(job_id)
-                continue
-            if not self._processor:
-                continue
-            try:
-                self._processor(job_id)
+                if self._processor:
+                    self._processor(job_id)
+            except Exception:
+                logger.exception("处理任务失败: {}", job_id)
             finally:
-                self._queue.task_done()
+                with self._condition:
+                    self._scheduler.done(owner_id)
+                    self._condition.notify()
 
 
 job_queue = JobQueueManager()
@@ -0,0 +1,487 @@
+from __future__ import annotations
+
+import os
+import signal
+import tempfile
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from queue import Empty, Queue
+from typing import Any, Callable, Dict, List, Optional
+
+from loguru import logger
+
+from app.core.config import settings
+from app.core.exceptions import PrintTimeoutError
+
+try:  # pragma: no cover
+    import pythoncom  # type: ignore
+except ImportError:  # pragma: no cover
+    pythoncom = None
+
+try:  # pragma: no cover
+    import win32com.client as win32com_client  # type: ignore
+except ImportError:  # pragma: no cover
+    win32com_client = None
+
+try:  # pragma: no cover
+    import win32print  # type: ignore
+    import win32process  # type: ignore
+except ImportError:  # pragma: no cover
+    win32print = None
+    win32process = None
+
+try:  # pragma: no cover
+    import win32gui  # type: ignore
+except ImportError:  # pragma: no cover
+    win32gui = None
+
+
+def _resolve_com_active_printer(printer_name: str) -> str:
+    if not win32print:
+        return printer_name
+    try:
+        handle = win32print.OpenPrinter(printer_name)
+    except Exception:
+        return printer_name
+    active_name = printer_name
+    try:
+        info = win32print.GetPrinter(handle, 2)
+        port = info.get("pPortName") if isinstance(info, dict) else None
+        if port:
+            active_name = f"{printer_name} on {port}"
+    except Exception:
+        active_name = printer_name
+    finally:
+        try:
+            win32print.ClosePrinter(handle)
+        except Exception:
+            pass
+    return active_name
+
+
+class OfficeConverter(ABC):
+    """Office 自动化转换器接口
+
+    实例只会在所属的池工作线程内创建和调用（COM 单线程套间的要求），
+    唯一的例外是 ``kill``，它由等待超时的线程调用。
+    """
+
+    def start(self) -> None:
+        """启动底层应用实例"""
+
+    @abstractmethod
+    def print_document(self, path: str, printer_name: str, copies: int) -> None:
+        """在指定打印机上打印文档，打印提交完成后返回"""
+
+    @abstractmethod
+    def export_pdf(self, path: str, output_path: str) -> None:
+        """将文档导出为 PDF 文件"""
+
+    def is_healthy(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        """正常关闭底层应用实例"""
+
+    def kill(self) -> None:
+        """强制结束已挂起的底层实例"""
+
+
+class _ComOfficeConverter(OfficeConverter):
+    prog_id = ""
+    display_name = "Office"
+
+    def __init__(self) -> None:
+        self._app: Any = None
+        self._initialized = False
+        self._pid: Optional[int] = None
+
+    def start(self) -> None:
+        if not win32com_client:
+            raise RuntimeError(f"缺少 win32com.client，无法启动 {self.display_name}")
+        if not pythoncom:
+            raise RuntimeError(f"缺少 pythoncom 模块，无法启动 {self.display_name}")
+        pythoncom.CoInitialize()
+        self._initialized = True
+        # DispatchEx 保证每个工作线程拥有独立进程，回收时不会影响用户自己打开的 Office
+        self._app = win32com_client.DispatchEx(self.prog_id)
+        self._app.Visible = False
+        self._app.DisplayAlerts = 0
+        self._pid = self._resolve_process_id()
+
+    def _resolve_process_id(self) -> Optional[int]:
+        return None
+
+    def is_healthy(self) -> bool:
+        if self._app is None:
+            return False
+        try:
+            self._app.Name
+        except Exception:
+            return False
+        return True
+
+    def close(self) -> None:
+        app, self._app = self._app, None
+        if app is not None:
+            try:
+                app.Quit()
+            except Exception:
+                logger.warning("{} 实例退出失败", self.display_name)
+        if self._initialized:
+            self._initialized = False
+            pythoncom.CoUninitialize()
+
+    def kill(self) -> None:
+        if not self._pid:
+            return
+        try:
+            os.kill(self._pid, signal.SIGTERM)
+        except OSError:
+            logger.warning("无法结束 {} 进程: {}", self.display_name, self._pid)
+
+
+class ComWordConverter(_ComOfficeConverter):
+    prog_id = "Word.Application"
+    display_name = "Word"
+
+    def _resolve_process_id(self) -> Optional[int]:
+        # Word 的 Application 对象没有 Hwnd，先设置唯一标题再按主窗口类名查找窗口
+        if not win32gui or not win32process:
+            return None
+        try:
+            caption = f"print-proxy-{uuid.uuid4().hex}"
+            self._app.Caption = caption
+            hwnd = win32gui.FindWindow("OpusApp", caption)
+            if not hwnd:
+                return None
+            _, pid = win32process.GetWindowThreadProcessId(hwnd)
+        except Exception:
+            return None
+        return pid
+
+    def print_document(self, path: str, printer_name: str, copies: int) -> None:
+        doc = self._app.Documents.Open(path, ReadOnly=True)
+        try:
+            active_name = _resolve_com_active_printer(printer_name)
+            self._app.ActivePrinter = active_name
+            doc.PrintOut(Background=False, Copies=copies, ActivePrinter=active_name)
+        finally:
+            doc.Close(False)
+
+    def export_pdf(self, path: str, output_path: str) -> None:
+        doc = self._app.Documents.Open(path, ReadOnly=True)
+        try:
+            doc.ExportAsFixedFormat(output_path, 17)  # wdExportFormatPDF
+        finally:
+            doc.Close(False)
+
+
+class ComExcelConverter(_ComOfficeConverter):
+    prog_id = "Excel.Application"
+    display_name = "Excel"
+
+    def _resolve_process_id(self) -> Optional[int]:
+        if not win32process:
+            return None
+        try:
+            _, pid = win32process.GetWindowThreadProcessId(self._app.Hwnd)
+        except Exception:
+            return None
+        return pid
+
+    def print_document(self, path: str, printer_name: str, copies: int) -> None:
+        workbook = self._app.Workbooks.Open(path, ReadOnly=True)
+        try:
+            active_name = _resolve_com_active_printer(printer_name)
+            self._app.ActivePrinter = active_name
+            workbook.PrintOut(Copies=copies, ActivePrinter=active_name)
+        finally:
+            workbook.Close(False)
+
+    def export_pdf(self, path: str, output_path: str) -> None:
+        workbook = self._app.Workbooks.Open(path, ReadOnly=True)
+        try:
+            workbook.ExportAsFixedFormat(0, output_path)  # xlTypePDF
+        finally:
+            workbook.Close(False)
+
+
+class FakeOfficeConverter(OfficeConverter):
+    """不依赖 Office 的转换器，用于 Linux 环境和测试"""
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.started = False
+        self.healthy = True
+        self.printed: List[tuple[str, str, int]] = []
+        self.exported: List[str] = []
+        self._killed = threading.Event()
+
+    def start(self) -> None:
+        self.started = True
+
+    def print_document(self, path: str, printer_name: str, copies: int) -> None:
+        if self.delay and self._killed.wait(self.delay):
+            raise RuntimeError("实例已被强制结束")
+        self.printed.append((path, printer_name, copies))
+
+    def export_pdf(self, path: str, output_path: str) -> None:
+        if self.delay and self._killed.wait(self.delay):
+            raise RuntimeError("实例已被强制结束")
+        with open(path, "rb") as source, open(output_path, "wb") as target:
+            target.write(b"%PDF-1.4\n% fake export\n" + source.read())
+        self.exported.append(path)
+
+    def is_healthy(self) -> bool:
+        return self.started and self.healthy
+
+    def close(self) -> None:
+        self.started = False
+
+    def kill(self) -> None:
+        self._killed.set()
+
+
+CONVERTER_PROVIDERS: Dict[str, Dict[str, Callable[[], OfficeConverter]]] = {
+    "com": {"word": ComWordConverter, "excel": ComExcelConverter},
+    "fake": {"word": FakeOfficeConverter, "excel": FakeOfficeConverter},
+}
+
+
+class _PoolTask:
+    def __init__(self, action: Callable[[OfficeConverter], Any]) -> None:
+        self.action = action
+        self.future: Future = Future()
+        self.started = threading.Event()
+        self.worker: Optional[_OfficeWorker] = None
+
+
+class _OfficeWorker:
+    def __init__(self, pool: OfficePool, index: int) -> None:
+        self.pool = pool
+        self.converter: Optional[OfficeConverter] = None
+        self.jobs_done = 0
+        self.busy = False
+        self.abandoned = False
+        self.thread = threading.Thread(target=self._run, name=f"office-{pool.name}-{index}", daemon=True)
+
+    def _start_converter(self) -> OfficeConverter:
+        converter = self.pool.factory()
+        converter.start()
+        self.converter = converter
+        self.jobs_done = 0
+        self.pool._record("started")
+        return converter
+
+    def _close_converter(self) -> None:
+        converter, self.converter = self.converter, None
+        if converter is None:
+            return
+        try:
+            converter.close()
+        except Exception:
+            logger.exception("关闭 {} 实例失败", self.pool.name)
+
+    def _ensure_converter(self) -> OfficeConverter:
+        if self.converter is not None and not self.converter.is_healthy():
+            logger.warning("{} 实例健康检查失败，重新启动", self.pool.name)
+            self.pool._record("unhealthy")
+            self._close_converter()
+        if self.converter is None:
+            return self._start_converter()
+        return self.converter
+
+    def _recycle(self) -> None:
+        self._close_converter()
+        self.pool._record("recycled")
+        try:
+            self._start_converter()
+        except Exception:
+            logger.exception("{} 实例回收后重启失败，将在下个任务时重试", self.pool.name)
+
+    def _run(self) -> None:
+        try:
+            if self.pool.prewarm:
+                try:
+                    self._start_converter()
+                except Exception:
+                    logger.exception("{} 实例预热失败", self.pool.name)
+            while not self.abandoned:
+                try:
+                    task = self.pool._tasks.get(timeout=1)
+                except Empty:
+                    continue
+                if task is None:
+                    break
+                if not task.future.set_running_or_notify_cancel():
+                    continue
+                self.busy = True
+                task.worker = self
+                task.started.set()
+                try:
+                    result = task.action(self._ensure_converter())
+                except BaseException as exc:
+                    task.future.set_exception(exc)
+                else:
+                    task.future.set_result(result)
+                    self.jobs_done += 1
+                    if not self.abandoned and self.jobs_done >= self.pool.max_jobs_per_instance:
+                        self._recycle()
+                finally:
+                    self.busy = False
+        finally:
+            self._close_converter()
+
+
+class OfficePool:
+    """常驻的 Office 实例池
+
+    每个工作线程持有一个长期存活的应用实例，处理满 ``max_jobs_per_instance``
+    个任务后回收重启，任务开始前做健康检查。单个任务执行超过 ``timeout``
+    秒视为挂起：该线程被放弃（并尝试结束底层进程），池立即补充新的工作线程。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        factory: Callable[[], OfficeConverter],
+        size: int = 1,
+        max_jobs_per_instance: int = 50,
+        timeout: float = 120,
+        prewarm: bool = False,
+    ) -> None:
+        self.name = name
+        self.factory = factory
+        self.size = max(1, size)
+        self.max_jobs_per_instance = max(1, max_jobs_per_instance)
+        self.timeout = timeout
+        self.prewarm = prewarm
+        self._tasks: Queue[Optional[_PoolTask]] = Queue()
+        self._workers: List[_OfficeWorker] = []
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {"started": 0, "recycled": 0, "unhealthy": 0, "timeouts": 0}
+        self._next_index = 0
+
+    def _record(self, counter: str) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+
+    def _spawn_worker(self) -> None:
+        worker = _OfficeWorker(self, self._next_index)
+        self._next_index += 1
+        self._workers.append(worker)
+        worker.thread.start()
+
+    def start(self) -> None:
+        with self._lock:
+            while len(self._workers) < self.size:
+                self._spawn_worker()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for _ in workers:
+            self._tasks.put(None)
+
+    def _abandon(self, worker: Optional[_OfficeWorker]) -> None:
+        with self._lock:
+            self._counters["timeouts"] += 1
+            if worker is None or worker.abandoned:
+                return
+            worker.abandoned = True
+            if worker in self._workers:
+                self._workers.remove(worker)
+            self._spawn_worker()
+        if worker.converter is not None:
+            try:
+                worker.converter.kill()
+            except Exception:
+                logger.exception("强制结束 {} 实例失败", self.name)
+
+    def run(self, action: Callable[[OfficeConverter], Any]) -> Any:
+        self.start()
+        task = _PoolTask(action)
+        self._tasks.put(task)
+        # 排队等待空闲实例的时间不计入挂起超时，但同样最多等待 timeout 秒
+        if not task.started.wait(self.timeout) and task.future.cancel():
+            logger.error("{} 等待空闲实例超过 {} 秒", self.name, self.timeout)
+            raise PrintTimeoutError(f"{self.name} 等待空闲实例超过 {self.timeout} 秒")
+        try:
+            return task.future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            logger.error("{} 自动化执行超过 {} 秒未响应，放弃该实例", self.name, self.timeout)
+            self._abandon(task.worker)
+            raise PrintTimeoutError(f"{self.name} 自动化执行超过 {self.timeout} 秒未响应") from None
+
+    def print_document(self, path: str, printer_name: str, copies: int) -> None:
+        self.run(lambda converter: converter.print_document(path, printer_name, copies))
+
+    def export_pdf(self, path: str) -> bytes:
+        fd, output_path = tempfile.mkstemp(suffix=".pdf")
+        os.close(fd)
+        try:
+            self.run(lambda converter: converter.export_pdf(path, output_path))
+            with open(output_path, "rb") as output:
+                return output.read()
+        finally:
+            if os.path.exists(output_path):
+                os.remove(output_path)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            workers = list(self._workers)
+            counters = dict(self._counters)
+        return {
+            "size": self.size,
+            "queued": self._tasks.qsize(),
+            "workers": [
+                {"name": worker.thread.name, "busy": worker.busy, "jobs": worker.jobs_done, "warm": worker.converter is not None}
+                for worker in workers
+            ],
+            **counters,
+        }
+
+
+class OfficePoolRegistry:
+    def __init__(self) -> None:
+        self._pools: Dict[str, OfficePool] = {}
+        self._lock = threading.Lock()
+
+    def get(self, application: str) -> OfficePool:
+        with self._lock:
+            pool = self._pools.get(application)
+            if pool is None:
+                providers = CONVERTER_PROVIDERS.get(settings.office_converter_provider)
+                if not providers or application not in providers:
+                    raise RuntimeError(f"未知的 Office 转换器: {settings.office_converter_provider}/{application}")
+                pool = OfficePool(
+                    application,
+                    providers[application],
+                    size=settings.office_pool_size,
+                    max_jobs_per_instance=settings.office_max_jobs_per_instance,
+                    timeout=settings.office_job_timeout_seconds,
+                    prewarm=settings.office_pool_prewarm,
+                )
+                self._pools[application] = pool
+            return pool
+
+    def start(self) -> None:
+        for application in ("word", "excel"):
+            self.get(application).start()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.shutdown()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pools = dict(self._pools)
+        return {name: pool.stats() for name, pool in pools.items()}
+
+
+office_pools = OfficePoolRegistry()
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, replace
+from typing import Dict
+
+from app.core.config import settings
+from app.core.exceptions import PrintContentError, PrinterUnavailableError, PrintTimeoutError
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_attempts: int
+    base_delay: float
+    max_delay: float
+    multiplier: float = 2.0
+    jitter: float = 0.2
+
+    def delay_for(self, attempt: int) -> float:
+        """第 ``attempt`` 次尝试失败后的等待秒数（指数退避 + 比例抖动）"""
+        delay = min(self.max_delay, self.base_delay * self.multiplier ** max(0, attempt - 1))
+        if self.jitter:
+            delay *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        return max(0.0, delay)
+
+
+DEFAULT_RETRY_POLICIES: Dict[str, RetryPolicy] = {
+    # 超时的执行线程可能仍在打印，默认不自动重试以免重复出纸
+    "timeout": RetryPolicy(max_attempts=1, base_delay=30, max_delay=300),
+    "printer_unavailable": RetryPolicy(max_attempts=5, base_delay=10, max_delay=300),
+    "content": RetryPolicy(max_attempts=1, base_delay=0, max_delay=0),
+    "default": RetryPolicy(max_attempts=3, base_delay=5, max_delay=120),
+}
+
+ERROR_CLASSES = (
+    (PrintTimeoutError, "timeout"),
+    (PrinterUnavailableError, "printer_unavailable"),
+    (PrintContentError, "content"),
+)
+
+
+def classify_error(exc: BaseException) -> str:
+    for exc_type, error_class in ERROR_CLASSES:
+        if isinstance(exc, exc_type):
+            return error_class
+    return "default"
+
+
+def get_retry_policy(error_class: str) -> RetryPolicy:
+    policy = DEFAULT_RETRY_POLICIES.get(error_class, DEFAULT_RETRY_POLICIES["default"])
+    overrides = dict(settings.retry_policies.get(error_class) or {})
+    if "max_attempts" in overrides:
+        overrides["max_attempts"] = int(overrides["max_attempts"])
+    if overrides:
+        policy = replace(policy, **overrides)
+    return policy
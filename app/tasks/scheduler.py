@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import itertools
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class IndexedHeap:
+    """带位置索引的二叉最小堆
+
+    每个键在堆中只出现一次，可按键 O(log n) 修改排序值（decrease-key /
+    increase-key）或直接删除，堆中不会残留过期条目，内存只与当前元素数相关。
+    """
+
+    def __init__(self) -> None:
+        self._heap: List[Tuple[Any, Hashable]] = []
+        self._index: Dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._index
+
+    def get(self, key: Hashable) -> Any:
+        return self._heap[self._index[key]][0]
+
+    def peek(self) -> Optional[Tuple[Hashable, Any]]:
+        if not self._heap:
+            return None
+        sort_key, key = self._heap[0]
+        return key, sort_key
+
+    def push(self, key: Hashable, sort_key: Any) -> None:
+        if key in self._index:
+            self.update(key, sort_key)
+            return
+        self._heap.append((sort_key, key))
+        self._index[key] = len(self._heap) - 1
+        self._sift_up(len(self._heap) - 1)
+
+    def pop(self) -> Tuple[Hashable, Any]:
+        sort_key, key = self._heap[0]
+        self._remove_at(0)
+        return key, sort_key
+
+    def update(self, key: Hashable, sort_key: Any) -> None:
+        position = self._index[key]
+        previous = self._heap[position][0]
+        self._heap[position] = (sort_key, key)
+        if sort_key < previous:
+            self._sift_up(position)
+        else:
+            self._sift_down(position)
+
+    def remove(self, key: Hashable) -> bool:
+        position = self._index.get(key)
+        if position is None:
+            return False
+        self._remove_at(position)
+        return True
+
+    def _remove_at(self, position: int) -> None:
+        _, key = self._heap[position]
+        del self._index[key]
+        last = self._heap.pop()
+        if position == len(self._heap):
+            return
+        self._heap[position] = last
+        self._index[last[1]] = position
+        self._sift_up(position)
+        self._sift_down(self._index[last[1]])
+
+    def _swap(self, i: int, j: int) -> None:
+        heap = self._heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self._index[heap[i][1]] = i
+        self._index[heap[j][1]] = j
+
+    def _sift_up(self, position: int) -> None:
+        heap = self._heap
+        while position > 0:
+            parent = (position - 1) // 2
+            if not heap[position][0] < heap[parent][0]:
+                break
+            self._swap(position, parent)
+            position = parent
+
+    def _sift_down(self, position: int) -> None:
+        heap = self._heap
+        size = len(heap)
+        while True:
+            smallest = position
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < size and heap[child][0] < heap[smallest][0]:
+                    smallest = child
+            if smallest == position:
+                return
+            self._swap(position, smallest)
+            position = smallest
+
+
+class _OwnerQueue:
+    __slots__ = ("jobs", "weight", "finish_tag", "inflight")
+
+    def __init__(self, weight: float) -> None:
+        self.jobs = IndexedHeap()
+        self.weight = weight
+        self.finish_tag = 0.0
+        self.inflight = 0
+
+
+class _QueuedJob:
+    __slots__ = ("owner", "enqueued_at", "sequence")
+
+    def __init__(self, owner: Hashable, enqueued_at: float, sequence: int) -> None:
+        self.owner = owner
+        self.enqueued_at = enqueued_at
+        self.sequence = sequence
+
+
+class FairScheduler:
+    """按所有者加权公平排队的任务调度器
+
+    - 同一所有者的任务按 ``入队时间 + 优先级 × aging_seconds`` 排序：每等待
+      ``aging_seconds`` 秒相当于提升一个优先级，低优先级任务不会被无限期压后；
+    - 不同所有者之间按起始时间公平排队（SFQ）轮流出队，权重为 2 的所有者
+      获得的出队次数是权重为 1 的两倍，单个所有者大量提交不会饿死其他人；
+    - ``max_inflight`` 大于 0 时，所有者正在执行的任务达到上限后暂停出队，
+      直到调用 ``done``。
+
+    任务以 ``job_id`` 为句柄建立索引：重复入队只会调整原有位置，``remove`` 和
+    ``reprioritize`` 直接修改堆，入队、出队、删除和调整优先级都是 O(log n)。
+    本类不加锁，由 ``JobQueueManager`` 负责同步。
+    """
+
+    def __init__(
+        self,
+        aging_seconds: float,
+        weights: Optional[Dict[str, float]] = None,
+        max_inflight: int = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.aging_seconds = aging_seconds
+        self.weights = weights or {}
+        self.max_inflight = max_inflight
+        self._clock = clock
+        self._owners: Dict[Hashable, _OwnerQueue] = {}
+        self._jobs: Dict[int, _QueuedJob] = {}
+        self._ready = IndexedHeap()
+        self._virtual_time = 0.0
+        self._sequence = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def __contains__(self, job_id: int) -> bool:
+        return job_id in self._jobs
+
+    def _weight(self, owner: Hashable) -> float:
+        weight = float(self.weights.get(str(owner), 1.0))
+        return weight if weight > 0 else 1.0
+
+    def _can_run(self, queue: _OwnerQueue) -> bool:
+        return bool(queue.jobs) and (self.max_inflight <= 0 or queue.inflight < self.max_inflight)
+
+    def _schedule(self, owner: Hashable, queue: _OwnerQueue) -> None:
+        if owner in self._ready or not self._can_run(queue):
+            return
+        # 空闲后重新排队的所有者从当前虚拟时间开始，不能攒下历史额度
+        start_tag = max(queue.finish_tag, self._virtual_time)
+        queue.finish_tag = start_tag
+        self._ready.push(owner, (start_tag, next(self._sequence)))
+
+    def _release_owner(self, owner: Hashable, queue: _OwnerQueue) -> None:
+        if not queue.jobs:
+            self._ready.remove(owner)
+            if not queue.inflight:
+                del self._owners[owner]
+
+    def _sort_key(self, job: _QueuedJob, priority: int) -> Tuple[float, int]:
+        return job.enqueued_at + priority * self.aging_seconds, job.sequence
+
+    def push(self, job_id: int, priority: int, owner: Hashable = None) -> None:
+        """加入队列；任务已在队列中时只按新优先级调整位置"""
+        job = self._jobs.get(job_id)
+        if job is not None and job.owner == owner:
+            self.reprioritize(job_id, priority)
+            return
+        if job is not None:
+            self.remove(job_id)
+        queue = self._owners.get(owner)
+        if queue is None:
+            queue = self._owners[owner] = _OwnerQueue(self._weight(owner))
+        job = self._jobs[job_id] = _QueuedJob(owner, self._clock(), next(self._sequence))
+        queue.jobs.push(job_id, self._sort_key(job, priority))
+        self._schedule(owner, queue)
+
+    def reprioritize(self, job_id: int, priority: int) -> bool:
+        """调整排队中任务的优先级，保留原入队时间累积的老化；任务不在队列中时返回 ``False``"""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return False
+        self._owners[job.owner].jobs.update(job_id, self._sort_key(job, priority))
+        return True
+
+    def remove(self, job_id: int) -> bool:
+        """从队列中删除任务；任务不在队列中（已出队或不存在）时返回 ``False``"""
+        job = self._jobs.pop(job_id, None)
+        if job is None:
+            return False
+        queue = self._owners[job.owner]
+        queue.jobs.remove(job_id)
+        self._release_owner(job.owner, queue)
+        return True
+
+    def pop(self) -> Optional[Tuple[int, Hashable]]:
+        """取出下一个任务，返回 ``(job_id, owner)``；没有可执行的任务时返回 ``None``"""
+        if not self._ready:
+            return None
+        owner, (start_tag, _) = self._ready.pop()
+        queue = self._owners[owner]
+        job_id, _ = queue.jobs.pop()
+        del self._jobs[job_id]
+        self._virtual_time = start_tag
+        queue.finish_tag = start_tag + 1.0 / queue.weight
+        queue.inflight += 1
+        self._schedule(owner, queue)
+        return job_id, owner
+
+    def peek(self) -> Optional[int]:
+        """返回下一个将出队的任务 ID，不取出"""
+        if not self._ready:
+            return None
+        owner, _ = self._ready.peek()
+        return self._owners[owner].jobs.peek()[0]
+
+    def done(self, owner: Hashable) -> None:
+        """标记所有者的一个任务执行结束，释放并发名额"""
+        queue = self._owners.get(owner)
+        if queue is None:
+            return
+        queue.inflight = max(0, queue.inflight - 1)
+        if not queue.jobs and not queue.inflight:
+            del self._owners[owner]
+            return
+        self._schedule(owner, queue)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": len(self._jobs),
+            "owners": {
+                str(owner): {"queued": len(queue.jobs), "inflight": queue.inflight, "weight": queue.weight}
+                for owner, queue in self._owners.items()
+            },
+        }
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from loguru import logger
+
+from app.core.exceptions import PrintTimeoutError
+from app.core.time_utils import now_shanghai
+
+
+class _Execution:
+    def __init__(self, job_id: int, backend: str, timeout: float) -> None:
+        self.job_id = job_id
+        self.backend = backend
+        self.timeout = timeout
+        self.started_at = now_shanghai()
+        self.started_monotonic = time.monotonic()
+        self.abandoned = False
+        self.done = threading.Event()
+        self.error: Optional[BaseException] = None
+        self.thread: Optional[threading.Thread] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "backend": self.backend,
+            "state": "abandoned" if self.abandoned else "running",
+            "started_at": self.started_at.isoformat(),
+            "elapsed_seconds": round(time.monotonic() - self.started_monotonic, 3),
+            "timeout_seconds": self.timeout,
+            "thread": self.thread.name if self.thread else None,
+        }
+
+
+class ExecutionWatchdog:
+    """在受监督的线程中执行打印，超过截止时间即放弃
+
+    Python 线程无法被强制结束，超时的执行线程会被放弃并在心跳中标记为
+    ``abandoned``，直到它自行返回；可被结束的后端（如 Office 实例池）
+    会在各自的超时处理中结束底层进程。
+    """
+
+    def __init__(self, heartbeat_interval: float = 1.0) -> None:
+        self.heartbeat_interval = heartbeat_interval
+        self._executions: Dict[int, _Execution] = {}
+        self._lock = threading.Lock()
+        self._last_heartbeat = now_shanghai()
+        self._timeouts = 0
+
+    def run(self, job_id: int, action: Callable[[], None], timeout: float, backend: str = "unknown") -> None:
+        execution = _Execution(job_id, backend, timeout)
+
+        def target() -> None:
+            try:
+                action()
+            except BaseException as exc:
+                execution.error = exc
+            finally:
+                execution.done.set()
+                if execution.abandoned:
+                    logger.warning("已放弃的打印执行最终返回: {}", job_id)
+                    self._unregister(execution)
+
+        execution.thread = threading.Thread(target=target, name=f"print-job-{job_id}", daemon=True)
+        with self._lock:
+            self._executions[id(execution)] = execution
+        execution.thread.start()
+
+        deadline = execution.started_monotonic + timeout
+        while not execution.done.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            execution.done.wait(min(self.heartbeat_interval, remaining))
+            self._last_heartbeat = now_shanghai()
+
+        if not execution.done.is_set():
+            execution.abandoned = True
+            # 标记后再检查一次，恰好在截止时刻完成的执行仍按正常结果处理
+            if not execution.done.is_set():
+                with self._lock:
+                    self._timeouts += 1
+                logger.error("打印执行超过 {} 秒未完成，放弃执行线程: {} ({})", timeout, job_id, backend)
+                raise PrintTimeoutError(f"打印执行超过 {timeout:g} 秒未完成（{backend}）")
+            execution.abandoned = False
+
+        self._unregister(execution)
+        if execution.error is not None:
+            raise execution.error
+
+    def _unregister(self, execution: _Execution) -> None:
+        with self._lock:
+            self._executions.pop(id(execution), None)
+
+    def executing(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            executions = list(self._executions.values())
+        return [execution.to_dict() for execution in executions]
+
+    def heartbeat(self) -> Dict[str, Any]:
+        with self._lock:
+            timeouts = self._timeouts
+        return {
+            "timestamp": now_shanghai().isoformat(),
+            "last_heartbeat": self._last_heartbeat.isoformat(),
+            "timeouts": timeouts,
+            "executing": self.executing(),
+        }
+
+
+print_watchdog = ExecutionWatchdog()
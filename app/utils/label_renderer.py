@@ -0,0 +1,258 @@
+"""
+标签模板渲染模块
+将模板元素（文本、条码、二维码、图片、方框）与逐条记录渲染为位图或 ZPL 指令，
+不含占位符的静态元素只渲染一次
+"""
+from __future__ import annotations
+
+import base64
+import csv
+import io
+import json
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from PIL import Image, ImageDraw, ImageFont
+
+try:  # pragma: no cover
+    import qrcode  # type: ignore
+except ImportError:  # pragma: no cover
+    qrcode = None
+
+try:  # pragma: no cover
+    import barcode  # type: ignore
+    from barcode.writer import ImageWriter  # type: ignore
+except ImportError:  # pragma: no cover
+    barcode = None
+    ImageWriter = None
+
+
+ELEMENT_TYPES = ("text", "barcode", "qrcode", "image", "box")
+RECORD_FORMATS = ("csv", "json", "jsonl")
+PLACEHOLDER_PATTERN = re.compile(r"\{(\w+)\}")
+
+
+def iter_records(content: bytes, record_format: str) -> Iterator[Dict[str, Any]]:
+    """
+    逐条读取记录数据
+
+    - csv: 首行为表头，UTF-8（可带 BOM）
+    - jsonl: 每行一个 JSON 对象，逐行解析
+    - json: 对象数组，或带 "records" 数组的对象
+    """
+    if record_format == "csv":
+        reader = csv.DictReader(io.TextIOWrapper(io.BytesIO(content), encoding="utf-8-sig", newline=""))
+        yield from reader
+    elif record_format == "jsonl":
+        for line in io.BytesIO(content):
+            if line.strip():
+                yield json.loads(line)
+    elif record_format == "json":
+        data = json.loads(content)
+        if isinstance(data, dict):
+            data = data.get("records", [])
+        if not isinstance(data, list):
+            raise ValueError("JSON 记录必须是数组")
+        yield from data
+    else:
+        raise ValueError(f"不支持的记录格式: {record_format}")
+
+
+def fill_placeholders(text: str, record: Dict[str, Any]) -> str:
+    """将 "{字段名}" 替换为记录中的值，缺失的字段替换为空字符串"""
+    return PLACEHOLDER_PATTERN.sub(lambda match: str(record.get(match.group(1), "") or ""), text)
+
+
+def is_variable(element: Dict[str, Any]) -> bool:
+    return bool(element.get("field")) or bool(PLACEHOLDER_PATTERN.search(element.get("text") or ""))
+
+
+def _decode_image(data: str) -> Image.Image:
+    with Image.open(io.BytesIO(base64.b64decode(data))) as img:
+        return img.convert("L")
+
+
+def _zpl_escape(value: str) -> str:
+    """配合 ^FH 使用，转义 ZPL 控制字符"""
+    return value.replace("_", "_5F").replace("^", "_5E").replace("~", "_7E")
+
+
+class LabelRenderer:
+    """
+    标签渲染器
+
+    Args:
+        width: 标签宽度（像素）
+        height: 标签高度（像素）
+        elements: 元素列表，坐标与尺寸单位均为像素（点）
+        font_path: TrueType 字体路径，中文内容需要指定中文字体
+        format_name: ZPL 格式名称，静态部分以 ^DF 存入打印机后按记录 ^XF 调用
+    """
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        elements: List[Dict[str, Any]],
+        font_path: Optional[str] = None,
+        format_name: str = "LABEL",
+    ) -> None:
+        self.width = width
+        self.height = height
+        self.elements = elements
+        self.font_path = font_path
+        self.format_name = format_name
+        self.static_elements = [element for element in elements if not is_variable(element)]
+        self.variable_elements = [element for element in elements if is_variable(element)]
+        self._static_layer: Optional[Image.Image] = None
+        self._fonts: Dict[int, Any] = {}
+
+    def _font(self, size: int):
+        font = self._fonts.get(size)
+        if font is None:
+            if self.font_path:
+                font = ImageFont.truetype(self.font_path, size)
+            else:
+                font = ImageFont.load_default(size=size)
+            self._fonts[size] = font
+        return font
+
+    @property
+    def static_layer(self) -> Image.Image:
+        """静态元素组成的底图，只渲染一次"""
+        if self._static_layer is None:
+            layer = Image.new("L", (self.width, self.height), 255)
+            draw = ImageDraw.Draw(layer)
+            for element in self.static_elements:
+                self._draw(layer, draw, element, {})
+            self._static_layer = layer
+        return self._static_layer
+
+    def render(self, record: Dict[str, Any]) -> Image.Image:
+        label = self.static_layer.copy()
+        draw = ImageDraw.Draw(label)
+        for element in self.variable_elements:
+            self._draw(label, draw, element, record)
+        return label
+
+    def render_all(self, records: Iterable[Dict[str, Any]]) -> Iterator[Image.Image]:
+        for record in records:
+            yield self.render(record)
+
+    def _draw(self, label: Image.Image, draw: ImageDraw.ImageDraw, element: Dict[str, Any], record: Dict[str, Any]) -> None:
+        kind = element.get("type")
+        x, y = int(element.get("x", 0)), int(element.get("y", 0))
+        if kind == "text":
+            text = fill_placeholders(element.get("text") or "", record)
+            draw.text((x, y), text, fill=0, font=self._font(int(element.get("size") or 24)))
+        elif kind == "box":
+            right = x + int(element.get("width") or 0)
+            bottom = y + int(element.get("height") or 0)
+            draw.rectangle([x, y, right, bottom], outline=0, width=int(element.get("thickness") or 2))
+        elif kind == "barcode":
+            value = fill_placeholders(element.get("text") or "", record)
+            if value:
+                label.paste(self._render_barcode(value, element), (x, y))
+        elif kind == "qrcode":
+            value = fill_placeholders(element.get("text") or "", record)
+            if value:
+                label.paste(self._render_qrcode(value, element), (x, y))
+        elif kind == "image":
+            data = record.get(element["field"]) if element.get("field") else element.get("image_base64")
+            if not data:
+                return
+            image = _decode_image(data)
+            if element.get("width") and element.get("height"):
+                image = image.resize((int(element["width"]), int(element["height"])))
+            label.paste(image, (x, y))
+        else:
+            raise ValueError(f"不支持的模板元素类型: {kind}")
+
+    def _render_barcode(self, value: str, element: Dict[str, Any]) -> Image.Image:
+        if not barcode or not ImageWriter:
+            raise RuntimeError("缺少 python-barcode，无法渲染条码")
+        module = int(element.get("size") or 2)
+        height = int(element.get("height") or 80)
+        # python-barcode 以毫米为单位，按固定 DPI 换算使输出像素等于 module/height
+        dpi = 300
+        code = barcode.get("code128", value, writer=ImageWriter())
+        image = code.render(
+            writer_options={
+                "module_width": module / dpi * 25.4,
+                "module_height": height / dpi * 25.4,
+                "quiet_zone": 0,
+                "dpi": dpi,
+                "write_text": False,
+            }
+        )
+        return image.convert("L")
+
+    def _render_qrcode(self, value: str, element: Dict[str, Any]) -> Image.Image:
+        if not qrcode:
+            raise RuntimeError("缺少 qrcode，无法渲染二维码")
+        code = qrcode.QRCode(box_size=int(element.get("size") or 4), border=0)
+        code.add_data(value)
+        code.make(fit=True)
+        return code.make_image(fill_color="black", back_color="white").get_image().convert("L")
+
+    def _zpl_element(self, element: Dict[str, Any], field_number: Optional[int]) -> str:
+        """单个元素的 ZPL 指令；``field_number`` 不为空时数据以 ^FN 占位"""
+        kind = element.get("type")
+        origin = f"^FO{int(element.get('x', 0))},{int(element.get('y', 0))}"
+        if kind == "box":
+            width = int(element.get("width") or 0)
+            height = int(element.get("height") or 0)
+            return f"{origin}^GB{width},{height},{int(element.get('thickness') or 2)}^FS"
+        if kind == "image":
+            if field_number is not None:
+                raise ValueError("ZPL 输出不支持可变图片字段")
+            image = _decode_image(element["image_base64"])
+            if element.get("width") and element.get("height"):
+                image = image.resize((int(element["width"]), int(element["height"])))
+            bitmap = image.convert("1")
+            bytes_per_row = (bitmap.width + 7) // 8
+            # ZPL 中 1 为黑点，PIL 的 "1" 模式中 1 为白点，需要取反
+            data = bytes(byte ^ 0xFF for byte in bitmap.tobytes())
+            return f"{origin}^GFA,{len(data)},{len(data)},{bytes_per_row},{data.hex().upper()}^FS"
+        if kind == "text":
+            size = int(element.get("size") or 24)
+            command = f"{origin}^A0N,{size},{size}"
+        elif kind == "barcode":
+            command = f"{origin}^BY{int(element.get('size') or 2)}^BCN,{int(element.get('height') or 80)},N,N,N"
+        elif kind == "qrcode":
+            command = f"{origin}^BQN,2,{int(element.get('size') or 4)}"
+        else:
+            raise ValueError(f"不支持的模板元素类型: {kind}")
+        if field_number is not None:
+            return f"{command}^FN{field_number}^FS"
+        value = element.get("text") or ""
+        if kind == "qrcode":
+            value = f"QA,{value}"
+        return f"{command}^FH^FD{_zpl_escape(value)}^FS"
+
+    def zpl_format(self) -> str:
+        """静态部分与字段占位组成的 ZPL 格式定义（^DF），每次打印只发送一次"""
+        commands = ["^XA", f"^DFR:{self.format_name}.ZPL^FS", f"^PW{self.width}", f"^LL{self.height}", "^CI28"]
+        for element in self.static_elements:
+            commands.append(self._zpl_element(element, None))
+        for index, element in enumerate(self.variable_elements, start=1):
+            commands.append(self._zpl_element(element, index))
+        commands.append("^XZ")
+        return "\n".join(commands) + "\n"
+
+    def zpl_record(self, record: Dict[str, Any], copies: int = 1) -> str:
+        commands = ["^XA", f"^XFR:{self.format_name}.ZPL", "^CI28"]
+        for index, element in enumerate(self.variable_elements, start=1):
+            value = fill_placeholders(element.get("text") or "", record)
+            if element.get("type") == "qrcode":
+                value = f"QA,{value}"
+            commands.append(f"^FN{index}^FH^FD{_zpl_escape(value)}^FS")
+        if copies > 1:
+            commands.append(f"^PQ{copies}")
+        commands.append("^XZ")
+        return "".join(commands) + "\n"
+
+    def iter_zpl(self, records: Iterable[Dict[str, Any]], copies: int = 1) -> Iterator[bytes]:
+        yield self.zpl_format().encode("utf-8")
+        for record in records:
+            yield self.zpl_record(record, copies).encode("utf-8")
@@ -0,0 +1,81 @@
+"""
+打印内容压缩编解码
+按内容逐个决定是否以 zlib 压缩存储，编码方式记录在任务的 content_codec 字段中
+"""
+from __future__ import annotations
+
+import zlib
+from typing import Iterator, Optional, Tuple
+
+# 未压缩的内容 content_codec 为空，兼容压缩功能上线前写入的任务
+CODEC_ZLIB = "zlib"
+
+# 本身已压缩的格式，再压缩只会浪费 CPU
+INCOMPRESSIBLE_FILE_TYPES = {"png", "jpg", "jpeg"}
+
+SAMPLE_BYTES = 64 * 1024
+# 样本或整体压缩后超过原大小的该比例时放弃压缩
+MIN_SAVING_RATIO = 0.9
+STREAM_CHUNK_BYTES = 1024 * 1024
+
+
+def encode_payload(content: bytes, file_type: str, level: int = 6, min_bytes: int = 1024) -> Tuple[bytes, Optional[str]]:
+    """
+    按需压缩打印内容
+
+    Args:
+        content: 原始内容
+        file_type: 文件类型，PNG/JPEG 直接跳过
+        level: zlib 压缩级别
+        min_bytes: 小于该大小的内容不压缩
+
+    Returns:
+        (存储的内容, 编码方式)，不压缩时编码方式为 None
+    """
+    if len(content) < min_bytes or file_type.lower() in INCOMPRESSIBLE_FILE_TYPES:
+        return content, None
+    if len(content) > SAMPLE_BYTES:
+        # 先用最快的级别试压缩开头一段，压不动的内容（如内嵌图片为主的 PDF）不再压缩整体
+        sample = content[:SAMPLE_BYTES]
+        if len(zlib.compress(sample, 1)) > len(sample) * MIN_SAVING_RATIO:
+            return content, None
+    compressed = zlib.compress(content, level)
+    if len(compressed) > len(content) * MIN_SAVING_RATIO:
+        return content, None
+    return compressed, CODEC_ZLIB
+
+
+def decode_payload(content: bytes, codec: Optional[str]) -> bytes:
+    """解码完整的打印内容"""
+    if not codec:
+        return content
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(content)
+    raise ValueError(f"未知的内容编码: {codec}")
+
+
+def iter_decoded(content: bytes, codec: Optional[str], chunk_size: int = STREAM_CHUNK_BYTES) -> Iterator[bytes]:
+    """
+    分块解码打印内容，写入临时文件时无需在内存中保留完整的解压结果
+
+    Args:
+        content: 存储的内容
+        codec: 编码方式
+        chunk_size: 每块解压输出的最大字节数
+    """
+    if not codec:
+        for offset in range(0, len(content), chunk_size):
+            yield content[offset:offset + chunk_size]
+        return
+    if codec != CODEC_ZLIB:
+        raise ValueError(f"未知的内容编码: {codec}")
+    decompressor = zlib.decompressobj()
+    data = content
+    while data:
+        chunk = decompressor.decompress(data, chunk_size)
+        if chunk:
+            yield chunk
+        data = decompressor.unconsumed_tail
+    tail = decompressor.flush()
+    if tail:
+        yield tail
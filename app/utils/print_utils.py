@@ -5,7 +5,7 @@
 from __future__ import annotations
 
 import re
-from typing import Optional, Tuple
+from typing import List, NamedTuple, Optional, Sequence, Tuple
 from PIL import Image, ImageEnhance, ImageFilter
 import io
 
@@ -274,5 +274,162 @@ def get_optimal_resampling_filter() -> Image.Resampling:
         return Image.ANTIALIAS
 
 
+IMPOSITION_LAYOUTS = ("grid", "shelf")
+
+
+class Placement(NamedTuple):
+    """拼版结果中一张图片的位置：``index`` 为输入列表中的序号"""
+    index: int
+    x: int
+    y: int
+    width: int
+    height: int
+
+
+def parse_media_dpi(media_size: Optional[str], default: int = 203) -> int:
+    """从 "40x60mm@300dpi" 形式的 media_size 中取出 DPI，未指定时返回 ``default``"""
+    match = re.search(r'@(\d+)dpi$', (media_size or '').lower().strip())
+    return int(match.group(1)) if match else default
+
+
+def mm_to_pixels(value_mm: float, dpi: int) -> int:
+    return int(round(value_mm / 25.4 * dpi))
+
+
+def _fit_within(width: int, height: int, max_width: int, max_height: int) -> Tuple[int, int]:
+    """只缩小不放大，保持宽高比"""
+    if width <= max_width and height <= max_height:
+        return (width, height)
+    return calculate_scale_ratio(width, height, max_width, max_height, fit_mode="contain")
+
+
+def plan_grid_layout(
+    sizes: Sequence[Tuple[int, int]],
+    page_width: int,
+    page_height: int,
+    margin: int = 0,
+    spacing: int = 0,
+) -> List[List[Placement]]:
+    """
+    网格拼版：单元格取所有图片的最大宽高，按行排满后换页
+    
+    超出可打印区域的图片会等比缩小到一个单元格内，图片在单元格内居中。
+    
+    Returns:
+        每页的位置列表
+    """
+    if not sizes:
+        return []
+    area_width = max(1, page_width - 2 * margin)
+    area_height = max(1, page_height - 2 * margin)
+    cell_width = min(area_width, max(width for width, _ in sizes))
+    cell_height = min(area_height, max(height for _, height in sizes))
+    columns = max(1, (area_width + spacing) // (cell_width + spacing))
+    rows = max(1, (area_height + spacing) // (cell_height + spacing))
+    per_page = columns * rows
+
+    pages: List[List[Placement]] = []
+    for index, (width, height) in enumerate(sizes):
+        slot = index % per_page
+        if slot == 0:
+            pages.append([])
+        row, column = divmod(slot, columns)
+        width, height = _fit_within(width, height, cell_width, cell_height)
+        x = margin + column * (cell_width + spacing) + (cell_width - width) // 2
+        y = margin + row * (cell_height + spacing) + (cell_height - height) // 2
+        pages[-1].append(Placement(index, x, y, width, height))
+    return pages
+
+
+def plan_shelf_layout(
+    sizes: Sequence[Tuple[int, int]],
+    page_width: int,
+    page_height: int,
+    margin: int = 0,
+    spacing: int = 0,
+) -> List[List[Placement]]:
+    """
+    货架装箱拼版（First-Fit Decreasing Height）：图片按高度从高到低排序，
+    依次放入第一个剩余宽度足够的“货架”（一行），放不下时在有空间的页面
+    新开货架，否则新开一页。尺寸不一的图片比网格拼版更省纸。
+    
+    Returns:
+        每页的位置列表，页内按放置顺序排列
+    """
+    area_width = max(1, page_width - 2 * margin)
+    area_height = max(1, page_height - 2 * margin)
+    fitted = [_fit_within(width, height, area_width, area_height) for width, height in sizes]
+    order = sorted(range(len(fitted)), key=lambda i: (-fitted[i][1], i))
+
+    pages: List[List[Placement]] = []
+    # 每页的货架：[y, 货架高度, 下一个可用 x]；每页已用高度
+    shelves: List[List[List[int]]] = []
+    used_heights: List[int] = []
+    for index in order:
+        width, height = fitted[index]
+        placed = False
+        for page_index, page_shelves in enumerate(shelves):
+            for shelf in page_shelves:
+                if height <= shelf[1] and shelf[2] + width <= margin + area_width:
+                    pages[page_index].append(Placement(index, shelf[2], shelf[0], width, height))
+                    shelf[2] += width + spacing
+                    placed = True
+                    break
+            if placed:
+                break
+            top = margin + used_heights[page_index]
+            if top + height <= margin + area_height:
+                page_shelves.append([top, height, margin + width + spacing])
+                used_heights[page_index] += height + spacing
+                pages[page_index].append(Placement(index, margin, top, width, height))
+                placed = True
+                break
+        if not placed:
+            pages.append([Placement(index, margin, margin, width, height)])
+            shelves.append([[margin, height, margin + width + spacing]])
+            used_heights.append(height + spacing)
+    return pages
+
+
+def impose_images(
+    images: Sequence[Image.Image],
+    page_width: int,
+    page_height: int,
+    margin: int = 0,
+    spacing: int = 0,
+    layout: str = "grid",
+) -> List[Image.Image]:
+    """
+    将多张小图拼到尽量少的整页图片上，每页只需渲染和打印一次
+    
+    Args:
+        images: 待拼版的图片（同一张图片可重复出现，例如多份）
+        page_width: 页面宽度（像素）
+        page_height: 页面高度（像素）
+        margin: 页边距（像素）
+        spacing: 图片间距（像素）
+        layout: "grid" 网格或 "shelf" 货架装箱
+    
+    Returns:
+        白底 RGB 页面图片列表
+    """
+    if layout not in IMPOSITION_LAYOUTS:
+        raise ValueError(f"不支持的拼版方式: {layout}")
+    planner = plan_grid_layout if layout == "grid" else plan_shelf_layout
+    plans = planner([image.size for image in images], page_width, page_height, margin, spacing)
+
+    resample = get_optimal_resampling_filter()
+    sheets: List[Image.Image] = []
+    for placements in plans:
+        sheet = Image.new("RGB", (page_width, page_height), "white")
+        for placement in placements:
+            image = images[placement.index]
+            if image.size != (placement.width, placement.height):
+                image = image.resize((placement.width, placement.height), resample)
+            sheet.paste(image.convert("RGB"), (placement.x, placement.y))
+        sheets.append(sheet)
+    return sheets
+
+
 # SVG 支持已完全移除以简化依赖和提高兼容性
 # 支持的图片格式：PNG, JPG, JPEG, BMP, GIF, TIFF, PDF
@@ -0,0 +1,54 @@
+"""Alembic 迁移环境：数据库地址与引擎参数沿用应用配置"""
+from __future__ import annotations
+
+from logging.config import fileConfig
+
+from alembic import context
+
+from app.core.database import Base, create_database_engine
+from app.core.config import settings
+import app.models  # noqa: F401  确保所有模型已注册到 Base.metadata
+
+
+config = context.config
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=config.get_main_option("sqlalchemy.url") or settings.database_url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run_with_connection(connection)
+        return
+    engine = create_database_engine(config.get_main_option("sqlalchemy.url") or settings.database_url)
+    try:
+        with engine.connect() as connection:
+            _run_with_connection(connection)
+    finally:
+        engine.dispose()
+
+
+def _run_with_connection(connection) -> None:
+    # SQLite 不支持大部分 ALTER TABLE，使用 batch 模式重建表
+    context.configure(connection=connection, target_metadata=target_metadata, render_as_batch=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,146 @@
+"""baseline schema
+
+接管此前由 ``create_all`` + ``ensure_schema`` 维护的表结构。迁移是幂等的：
+新数据库直接建表；已有数据库只补齐缺失的表、列和索引，不修改已有数据。
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2025-10-20 09:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001_baseline"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+metadata = sa.MetaData()
+
+sa.Table(
+    "users",
+    metadata,
+    sa.Column("id", sa.Integer, primary_key=True, index=True),
+    sa.Column("username", sa.String(50), unique=True, nullable=False, index=True),
+    sa.Column("full_name", sa.String(120), nullable=True),
+    sa.Column("hashed_password", sa.String(255), nullable=False),
+    sa.Column("is_active", sa.Boolean, nullable=True),
+    sa.Column("is_admin", sa.Boolean, nullable=True),
+    sa.Column("api_key", sa.String(128), unique=True, nullable=True, index=True),
+    sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+)
+
+sa.Table(
+    "printer_groups",
+    metadata,
+    sa.Column("id", sa.Integer, primary_key=True, index=True),
+    sa.Column("name", sa.String(200), unique=True, nullable=False),
+    sa.Column("description", sa.String(200), nullable=True),
+    sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+)
+
+sa.Table(
+    "label_templates",
+    metadata,
+    sa.Column("id", sa.Integer, primary_key=True, index=True),
+    sa.Column("name", sa.String(200), unique=True, nullable=False),
+    sa.Column("description", sa.String(200), nullable=True),
+    sa.Column("width_mm", sa.Integer, nullable=False),
+    sa.Column("height_mm", sa.Integer, nullable=False),
+    sa.Column("dpi", sa.Integer, nullable=False),
+    sa.Column("output", sa.String(20), nullable=False),
+    sa.Column("elements", sa.Text, nullable=False),
+    sa.Column("owner_id", sa.Integer, sa.ForeignKey("users.id"), nullable=True),
+    sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+)
+
+sa.Table(
+    "printers",
+    metadata,
+    sa.Column("id", sa.Integer, primary_key=True, index=True),
+    sa.Column("name", sa.String(200), unique=True, nullable=False),
+    sa.Column("is_default", sa.Boolean, nullable=True),
+    sa.Column("status", sa.String(50), nullable=True),
+    sa.Column("location", sa.String(200), nullable=True),
+    sa.Column("group_id", sa.Integer, sa.ForeignKey("printer_groups.id", ondelete="SET NULL"), nullable=True, index=True),
+    sa.Column("coalesce_window_ms", sa.Integer, server_default="0", nullable=True),
+    sa.Column("coalesce_max_jobs", sa.Integer, server_default="0", nullable=True),
+    sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+)
+
+sa.Table(
+    "print_jobs",
+    metadata,
+    sa.Column("id", sa.Integer, primary_key=True, index=True),
+    sa.Column("title", sa.String(200), nullable=False),
+    sa.Column("status", sa.String(50), nullable=True, index=True),
+    sa.Column("priority", sa.Integer, nullable=True, index=True),
+    sa.Column("copies", sa.Integer, nullable=True),
+    sa.Column("media_size", sa.String(50), nullable=True),
+    sa.Column("color_mode", sa.String(30), nullable=True),
+    sa.Column("duplex", sa.String(30), nullable=True),
+    sa.Column("fit_mode", sa.String(20), nullable=True),
+    sa.Column("auto_rotate", sa.Integer, nullable=True),
+    sa.Column("enhance_quality", sa.Integer, nullable=True),
+    sa.Column("imposition", sa.String(20), nullable=True),
+    sa.Column("batch_id", sa.String(64), nullable=True, index=True),
+    sa.Column("file_type", sa.String(20), nullable=False),
+    sa.Column("content", sa.LargeBinary, nullable=False),
+    sa.Column("content_hash", sa.String(64), nullable=True),
+    sa.Column("source_job_id", sa.Integer, sa.ForeignKey("print_jobs.id"), nullable=True, index=True),
+    sa.Column("owner_id", sa.Integer, sa.ForeignKey("users.id"), nullable=True),
+    sa.Column("printer_id", sa.Integer, sa.ForeignKey("printers.id"), nullable=True),
+    sa.Column("template_id", sa.Integer, sa.ForeignKey("label_templates.id", ondelete="SET NULL"), nullable=True),
+    sa.Column("error_message", sa.Text, nullable=True),
+    sa.Column("attempts", sa.Integer, server_default="0", nullable=True),
+    sa.Column("next_attempt_at", sa.DateTime(timezone=True), nullable=True),
+    sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+)
+
+sa.Table(
+    "idempotency_keys",
+    metadata,
+    sa.Column("id", sa.Integer, primary_key=True, index=True),
+    sa.Column("key", sa.String(200), nullable=False),
+    sa.Column("owner_id", sa.Integer, sa.ForeignKey("users.id"), nullable=False),
+    sa.Column("job_id", sa.Integer, sa.ForeignKey("print_jobs.id", ondelete="CASCADE"), nullable=True),
+    sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False, index=True),
+    sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    sa.UniqueConstraint("owner_id", "key", name="uq_idempotency_owner_key"),
+)
+
+sa.Table(
+    "job_logs",
+    metadata,
+    sa.Column("id", sa.Integer, primary_key=True, index=True),
+    sa.Column("job_id", sa.Integer, sa.ForeignKey("print_jobs.id", ondelete="CASCADE"), nullable=False, index=True),
+    sa.Column("level", sa.String(20), nullable=True),
+    sa.Column("message", sa.Text, nullable=False),
+    sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, index=True),
+)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    for table in metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            table.create(bind=bind)
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                # 旧版本数据库缺少的列只能以可空列补齐
+                server_default = column.server_default.arg if column.server_default is not None else None
+                op.add_column(table.name, sa.Column(column.name, column.type, server_default=server_default, nullable=True))
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+
+
+def downgrade() -> None:
+    for table in reversed(metadata.sorted_tables):
+        op.drop_table(table.name)
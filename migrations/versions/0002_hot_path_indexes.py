@@ -0,0 +1,69 @@
+"""hot path indexes
+
+按实际查询补充复合索引与部分索引，并移除被复合索引覆盖的单列索引：
+
+- 任务列表与批量操作：``owner_id``、``created_at``、``(status, priority, created_at)``
+- 调度器统计排队页数：``(printer_id, status, copies)`` 覆盖索引
+- 合并打印挑选候选任务：``status = 'queued'`` 的部分索引 ``(printer_id, priority, id)``
+- 默认打印机：``is_default = 1`` 的部分索引
+
+SQLite 只有在查询条件与索引条件字面一致时才会使用部分索引，
+``status IN (?, ?)`` 这类绑定参数的条件无法命中，因此部分索引只用于等值条件。
+
+Revision ID: 0002_hot_path_indexes
+Revises: 0001_baseline
+Create Date: 2025-10-20 09:30:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002_hot_path_indexes"
+down_revision = "0001_baseline"
+branch_labels = None
+depends_on = None
+
+
+NEW_INDEXES = [
+    ("ix_print_jobs_owner_id", "print_jobs", ["owner_id"], None, None),
+    ("ix_print_jobs_created_at", "print_jobs", ["created_at"], None, None),
+    ("ix_print_jobs_status_priority_created", "print_jobs", ["status", "priority", "created_at"], None, None),
+    ("ix_print_jobs_printer_status", "print_jobs", ["printer_id", "status", "copies"], None, None),
+    ("ix_print_jobs_queued_by_printer", "print_jobs", ["printer_id", "priority", "id"], "status = 'queued'", "status = 'queued'"),
+    ("ix_printers_default", "printers", ["is_default"], "is_default = 1", "is_default"),
+]
+
+# 被 ix_print_jobs_status_priority_created 的前缀覆盖，或选择性过低
+REPLACED_INDEXES = [
+    ("ix_print_jobs_status", "print_jobs", ["status"]),
+    ("ix_print_jobs_priority", "print_jobs", ["priority"]),
+]
+
+
+def _index_names(table_name: str) -> set:
+    return {index["name"] for index in sa.inspect(op.get_bind()).get_indexes(table_name)}
+
+
+def upgrade() -> None:
+    for name, table_name, columns, sqlite_where, postgresql_where in NEW_INDEXES:
+        if name in _index_names(table_name):
+            continue
+        op.create_index(
+            name,
+            table_name,
+            columns,
+            sqlite_where=sa.text(sqlite_where) if sqlite_where else None,
+            postgresql_where=sa.text(postgresql_where) if postgresql_where else None,
+        )
+    for name, table_name, _ in REPLACED_INDEXES:
+        if name in _index_names(table_name):
+            op.drop_index(name, table_name=table_name)
+
+
+def downgrade() -> None:
+    for name, table_name, columns in REPLACED_INDEXES:
+        if name not in _index_names(table_name):
+            op.create_index(name, table_name, columns)
+    for name, table_name, _, _, _ in reversed(NEW_INDEXES):
+        if name in _index_names(table_name):
+            op.drop_index(name, table_name=table_name)
@@ -0,0 +1,40 @@
+"""payload archive
+
+记录任务打印内容的归档时间与归档文件路径，并为归档扫描添加索引。
+
+没有统计信息时 SQLite 规划器优先选择等值条件多的索引，部分索引
+``(updated_at) WHERE payload_archived_at IS NULL`` 会输给 ``source_job_id`` 等单列索引，
+因此使用以两个 IS NULL 条件开头的复合索引。
+
+Revision ID: 0003_payload_archive
+Revises: 0002_hot_path_indexes
+Create Date: 2025-10-21 09:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003_payload_archive"
+down_revision = "0002_hot_path_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    columns = {column["name"] for column in inspector.get_columns("print_jobs")}
+    if "payload_archived_at" not in columns:
+        op.add_column("print_jobs", sa.Column("payload_archived_at", sa.DateTime(timezone=True), nullable=True))
+    if "payload_archive_path" not in columns:
+        op.add_column("print_jobs", sa.Column("payload_archive_path", sa.String(500), nullable=True))
+    if "ix_print_jobs_payload_pending" not in {index["name"] for index in inspector.get_indexes("print_jobs")}:
+        op.create_index(
+            "ix_print_jobs_payload_pending", "print_jobs", ["payload_archived_at", "source_job_id", "updated_at"]
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_print_jobs_payload_pending", table_name="print_jobs")
+    with op.batch_alter_table("print_jobs") as batch_op:
+        batch_op.drop_column("payload_archive_path")
+        batch_op.drop_column("payload_archived_at")
@@ -0,0 +1,38 @@
+"""content codec
+
+记录打印内容的压缩方式，已有任务的内容保持未压缩（字段为空）。
+
+Revision ID: 0004_content_codec
+Revises: 0003_payload_archive
+Create Date: 2025-10-22 09:00:00
+"""
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004_content_codec"
+down_revision = "0003_payload_archive"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    columns = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("print_jobs")}
+    if "content_codec" not in columns:
+        op.add_column("print_jobs", sa.Column("content_codec", sa.String(20), nullable=True))
+
+
+def downgrade() -> None:
+    # 降级前先解压已压缩的内容，旧版本只能读取原始内容
+    bind = op.get_bind()
+    rows = bind.execute(sa.text("SELECT id FROM print_jobs WHERE content_codec = 'zlib'")).scalars().all()
+    for job_id in rows:
+        content = bind.execute(sa.text("SELECT content FROM print_jobs WHERE id = :id"), {"id": job_id}).scalar()
+        bind.execute(
+            sa.text("UPDATE print_jobs SET content = :content, content_codec = NULL WHERE id = :id"),
+            {"id": job_id, "content": zlib.decompress(content)},
+        )
+    with op.batch_alter_table("print_jobs") as batch_op:
+        batch_op.drop_column("content_codec")
@@ -0,0 +1,35 @@
+"""cache invalidations
+
+多进程部署时各进程通过该表互相通知内存缓存失效。
+
+Revision ID: 0005_cache_invalidations
+Revises: 0004_content_codec
+Create Date: 2025-10-23 09:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005_cache_invalidations"
+down_revision = "0004_content_codec"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("cache_invalidations"):
+        return
+    op.create_table(
+        "cache_invalidations",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("kind", sa.String(20), nullable=False),
+        sa.Column("key", sa.String(200), nullable=False),
+        sa.Column("origin", sa.String(32), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_cache_invalidations_created_at", "cache_invalidations", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_cache_invalidations_created_at", table_name="cache_invalidations")
+    op.drop_table("cache_invalidations")
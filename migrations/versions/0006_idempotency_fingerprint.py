@@ -0,0 +1,27 @@
+"""idempotency fingerprint
+
+记录幂等键对应请求的内容摘要，同一个键提交不同内容时拒绝；已有的键不做校验（字段为空）。
+
+Revision ID: 0006_idempotency_fingerprint
+Revises: 0005_cache_invalidations
+Create Date: 2025-10-24 09:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006_idempotency_fingerprint"
+down_revision = "0005_cache_invalidations"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    columns = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("idempotency_keys")}
+    if "fingerprint" not in columns:
+        op.add_column("idempotency_keys", sa.Column("fingerprint", sa.String(64), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("idempotency_keys") as batch_op:
+        batch_op.drop_column("fingerprint")
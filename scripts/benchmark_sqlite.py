@@ -0,0 +1,116 @@
+"""Benchmark concurrent SQLite read/write throughput before and after tuning
+
+Usage:
+    python scripts/benchmark_sqlite.py [--readers 8] [--writers 4] [--seconds 10]
+
+Runs the same workload against a fresh temporary database file per mode:
+  - baseline: default engine (rollback journal, no pragmas)
+  - tuned:    WAL + pragmas + sized pool (the service default)
+  - queued:   tuned + FIFO writer queue (DATABASE_SERIALIZE_WRITES=true)
+Readers page through recent jobs like the API; writers insert a job and then
+update its status like a print worker.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.database import Base, create_database_engine, serialize_writes, writer_queue
+from app.models import PrintJob
+
+
+def run_workload(tuned: bool, queued: bool, readers: int, writers: int, seconds: float, think_ms: float) -> dict:
+    directory = tempfile.mkdtemp(prefix="print_proxy_bench_")
+    url = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+    engine = create_database_engine(url, tuned=tuned)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine, class_=Session, autoflush=False)
+    if queued:
+        serialize_writes(session_factory)
+
+    with session_factory() as db:
+        db.add_all(PrintJob(title=f"seed {index}", file_type="txt", content=b"x" * 512) for index in range(1000))
+        db.commit()
+
+    counters = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def count(name: str) -> None:
+        with lock:
+            counters[name] += 1
+
+    def reader() -> None:
+        while not stop.is_set():
+            try:
+                with session_factory() as db:
+                    db.query(PrintJob.id, PrintJob.status).order_by(PrintJob.id.desc()).limit(20).all()
+                count("reads")
+            except OperationalError:
+                count("errors")
+            # 模拟请求之间的处理与网络耗时；为 0 时读线程会在 GIL 上饿死写线程
+            time.sleep(think_ms / 1000)
+
+    def writer() -> None:
+        while not stop.is_set():
+            try:
+                with session_factory() as db:
+                    job = PrintJob(title="bench", file_type="txt", content=b"x" * 512)
+                    db.add(job)
+                    db.commit()
+                    job.status = "completed"
+                    db.commit()
+                count("writes")
+            except OperationalError:
+                count("errors")
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer) for _ in range(writers)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    engine.dispose()
+
+    return {
+        "reads_per_second": counters["reads"] / elapsed,
+        "writes_per_second": counters["writes"] / elapsed,
+        "errors": counters["errors"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite concurrent throughput benchmark")
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--think-ms", type=float, default=1, help="Pause between reads of one reader")
+    args = parser.parse_args()
+
+    print(f"readers={args.readers} writers={args.writers} seconds={args.seconds} think_ms={args.think_ms}")
+    print("-" * 60)
+    for name, tuned, queued in (("baseline", False, False), ("tuned", True, False), ("queued", True, True)):
+        result = run_workload(tuned, queued, args.readers, args.writers, args.seconds, args.think_ms)
+        print(
+            f"{name:<10} reads/s={result['reads_per_second']:>10.1f}  "
+            f"writes/s={result['writes_per_second']:>8.1f}  locked errors={result['errors']}"
+        )
+    print(f"writer queue: {writer_queue.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Compress print payloads stored before payload compression was enabled
+
+Usage:
+    python scripts/compress_payloads.py [--batch-size 50] [--vacuum-pages 0]
+
+Walks jobs whose content is stored uncompressed in id order, one short
+transaction per batch, and rewrites the ones that compress well. PNG/JPEG and
+small payloads are left alone. With --vacuum-pages the freed pages are
+returned to the file system afterwards (0 returns all of them).
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import func, update
+
+from app.core.config import settings
+from app.core.database import session_scope
+from app.models import PrintJob
+from app.services.payload_archive import PayloadArchiver
+from app.utils.payload_codec import encode_payload
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compress existing print payloads")
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--vacuum-pages", type=int, default=None, help="Run incremental VACUUM afterwards (0 = all free pages)")
+    args = parser.parse_args()
+
+    after_id, scanned, compressed, saved = 0, 0, 0, 0
+    while True:
+        with session_scope() as db:
+            ids = [
+                job_id
+                for (job_id,) in db.query(PrintJob.id)
+                .filter(PrintJob.id > after_id, PrintJob.content_codec.is_(None), func.length(PrintJob.content) > 0)
+                .order_by(PrintJob.id)
+                .limit(args.batch_size)
+                .all()
+            ]
+            for job_id in ids:
+                content, file_type = db.query(PrintJob.content, PrintJob.file_type).filter(PrintJob.id == job_id).one()
+                stored, codec = encode_payload(
+                    content,
+                    file_type,
+                    level=settings.payload_compression_level,
+                    min_bytes=settings.payload_compression_min_bytes,
+                )
+                if codec:
+                    saved += len(content) - len(stored)
+                    compressed += 1
+                    # 保留原来的更新时间，不影响内容归档的保留期
+                    db.execute(
+                        update(PrintJob)
+                        .where(PrintJob.id == job_id)
+                        .values(content=stored, content_codec=codec, updated_at=PrintJob.updated_at)
+                    )
+        if not ids:
+            break
+        scanned += len(ids)
+        after_id = ids[-1]
+        print(f"scanned={scanned} compressed={compressed} saved={saved / 1024 / 1024:.1f}MB")
+
+    if args.vacuum_pages is not None:
+        PayloadArchiver.incremental_vacuum(args.vacuum_pages)
+    print(f"done: {compressed} of {scanned} payloads compressed, {saved / 1024 / 1024:.1f}MB saved")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Convert an existing SQLite database to incremental auto-vacuum
+
+Usage:
+    python scripts/enable_incremental_vacuum.py
+
+Stop the service first. Databases created before incremental auto-vacuum was
+enabled need one full VACUUM to switch modes; it rewrites the whole file and
+blocks every writer until it finishes, so it is not run by the service itself.
+Afterwards the payload archiver returns freed pages after each run.
+"""
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.core.database import engine, is_sqlite_file
+
+
+def main():
+    if not is_sqlite_file(str(engine.url)):
+        print("Not a SQLite database file, nothing to do")
+        return
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        if connection.exec_driver_sql("PRAGMA auto_vacuum").scalar() == 2:
+            print("Incremental auto-vacuum is already enabled")
+            return
+        started = time.monotonic()
+        connection.exec_driver_sql("PRAGMA auto_vacuum=INCREMENTAL")
+        connection.exec_driver_sql("VACUUM")
+        mode = connection.exec_driver_sql("PRAGMA auto_vacuum").scalar()
+    if mode != 2:
+        print("Conversion failed, is the database still in use?")
+        sys.exit(1)
+    print(f"done: incremental auto-vacuum enabled in {time.monotonic() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
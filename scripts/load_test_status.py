@@ -0,0 +1,147 @@
+"""Load test: job status polling latency under many concurrent pollers
+
+Usage:
+    python scripts/load_test_status.py [--pollers 1000] [--seconds 20] [--interval 1.0] [--logins 8]
+
+Starts the service with uvicorn on a temporary SQLite database (printing
+disabled), submits one job and then keeps --pollers clients polling
+GET /api/jobs/{id}/status, each waiting --interval seconds between requests.
+At the same time --logins clients log in repeatedly so bcrypt keeps the CPU
+threads busy, which used to exhaust the threadpool that sync routes run on.
+Reports throughput and p50/p95/p99/max latency of the status requests.
+Pass --url to test an already running service instead.
+"""
+import argparse
+import asyncio
+import base64
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int) -> subprocess.Popen:
+    directory = tempfile.mkdtemp(prefix="print_proxy_load_")
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{os.path.join(directory, 'load.db')}",
+        PRINT_PROXY_DISABLE_PRINT="1",
+        LOG_DIRECTORY=directory,
+    )
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning", "--no-access-log"],
+        cwd=project_root,
+        env=env,
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            await client.get("/docs")
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.2)
+    raise RuntimeError("service did not start")
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def run(args) -> None:
+    limits = httpx.Limits(max_connections=args.pollers + args.logins + 10, max_keepalive_connections=args.pollers + args.logins + 10)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60) as client:
+        await wait_ready(client)
+        login = {"username": args.username, "password": args.password}
+        token = (await client.post("/api/auth/token", data=login)).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        payload = {"title": "load test", "file_type": "txt", "content_base64": base64.b64encode(b"load test").decode()}
+        job_id = (await client.post("/api/jobs/", json=payload, headers=headers)).json()["id"]
+
+        latencies: list = []
+        errors = 0
+        logins = 0
+        stop_at = time.monotonic() + args.seconds
+
+        async def poller(offset: float) -> None:
+            nonlocal errors
+            await asyncio.sleep(offset)
+            while time.monotonic() < stop_at:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(f"/api/jobs/{job_id}/status", headers=headers)
+                    response.raise_for_status()
+                    latencies.append(time.perf_counter() - started)
+                except httpx.HTTPError:
+                    errors += 1
+                await asyncio.sleep(args.interval)
+
+        async def login_loop() -> None:
+            nonlocal logins
+            while time.monotonic() < stop_at:
+                await client.post("/api/auth/token", data=login)
+                logins += 1
+
+        tasks = [poller(index * args.interval / args.pollers) for index in range(args.pollers)]
+        tasks += [login_loop() for _ in range(args.logins)]
+        started = time.monotonic()
+        await asyncio.gather(*tasks)
+        elapsed = time.monotonic() - started
+
+    if not latencies:
+        print(f"no successful requests, errors={errors}")
+        return
+    print(f"pollers={args.pollers} interval={args.interval}s logins={args.logins} seconds={args.seconds}")
+    print(f"status requests={len(latencies)} ({len(latencies) / elapsed:.0f}/s) errors={errors} logins={logins}")
+    print(
+        "latency ms: "
+        f"p50={percentile(latencies, 0.50) * 1000:.1f} "
+        f"p95={percentile(latencies, 0.95) * 1000:.1f} "
+        f"p99={percentile(latencies, 0.99) * 1000:.1f} "
+        f"max={max(latencies) * 1000:.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Status polling load test")
+    parser.add_argument("--pollers", type=int, default=1000)
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--interval", type=float, default=1.0, help="Pause between polls of one client")
+    parser.add_argument("--logins", type=int, default=8, help="Concurrent clients logging in to load the CPU threads")
+    parser.add_argument("--url", default="", help="Test a running service instead of starting one")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin123")
+    args = parser.parse_args()
+
+    server = None
+    if not args.url:
+        port = free_port()
+        server = start_server(port)
+        args.url = f"http://127.0.0.1:{port}"
+    try:
+        asyncio.run(run(args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -28,6 +28,10 @@ def main():
     print("\n[Database Settings]")
     print(f"  URL: {settings.database_url}")
     print(f"  Echo: {settings.database_echo}")
+    print(f"  SQLite Tuning: {settings.database_sqlite_tuning} (busy_timeout={settings.database_busy_timeout_ms}ms, pool={settings.database_pool_size}+{settings.database_max_overflow})")
+    print(f"  Serialize Writes: {settings.database_serialize_writes}")
+    print(f"  Payload Compression: {settings.payload_compression} (level={settings.payload_compression_level})")
+    print(f"  Payload Retention: {settings.payload_retention_days} days (archive={settings.payload_archive_directory or 'delete'})")
     
     # Security settings
     print("\n[Security Settings]")
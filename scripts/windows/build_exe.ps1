@@ -230,6 +230,7 @@ try {
         '--collect-all', 'pywin32',
         '--collect-all', 'uvicorn',
         '--collect-all', 'jinja2',
+        '--collect-all', 'alembic',
 
         '--collect-submodules', 'app',
         '--hidden-import', 'app.main',
@@ -237,6 +238,8 @@ try {
         '--hidden-import', 'win32timezone',
 
         '--add-data', 'app\templates;app\templates',
+        '--add-data', 'migrations;migrations',
+        '--add-data', 'alembic.ini;.',
         'scripts\windows\run_app.py'
     )
 
@@ -1,20 +1,34 @@
 import base64
+import gzip
+import io
+import json
 import os
 import sys
+import threading
 import time
+from datetime import timedelta
 from pathlib import Path
 
 import pytest
 from fastapi.testclient import TestClient
+from PIL import Image
 
 
 os.environ.setdefault("DATABASE_URL", "sqlite:///./test_print_proxy.db")
 os.environ.setdefault("PRINT_PROXY_DISABLE_PRINT", "1")
+os.environ.setdefault("JOB_LOG_SYNCHRONOUS", "true")
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
 from app.main import app  # noqa: E402
-from app.core.database import Base, engine  # noqa: E402
+from app.core.database import Base, engine, session_scope  # noqa: E402
+from app.core.time_utils import now_shanghai  # noqa: E402
+from app.core.exceptions import PrintContentError  # noqa: E402
+from app.models import JobLog, LabelTemplate, PrintJob, Printer  # noqa: E402
+from app.services import job_service  # noqa: E402
+from app.services.log_service import job_log_retention  # noqa: E402
+from app.services.payload_archive import payload_archiver  # noqa: E402
+from app.services.printer_health import printer_health  # noqa: E402
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -23,6 +37,9 @@ def prepare_database():
     Base.metadata.create_all(bind=engine)
     yield
     Base.metadata.drop_all(bind=engine)
+    # 下次启动时从头执行迁移
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP TABLE IF EXISTS alembic_version")
 
 
 @pytest.fixture()
@@ -107,3 +124,656 @@ def test_create_image_job_and_preview(client: TestClient, admin_token: str):
     )
     assert preview_response.status_code == 200
     assert len(preview_response.text) > 0
+
+
+def test_requeue_dead_letter_jobs(client: TestClient, admin_token: str):
+    with session_scope() as db:
+        job = PrintJob(title="死信任务", file_type="txt", content=b"x", status="dead_letter", attempts=3)
+        db.add(job)
+        db.flush()
+        job_id = job.id
+
+    response = client.post(
+        "/api/jobs/dead-letter/requeue",
+        json={"job_ids": [job_id]},
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert response.status_code == 200
+    assert response.json() == {"affected": 1}
+
+    job_response = client.get(f"/api/jobs/{job_id}", headers={"Authorization": f"Bearer {admin_token}"})
+    assert job_response.json()["status"] in {"queued", "processing", "completed"}
+
+
+def _wait_for_job(client: TestClient, admin_token: str, job_id: int) -> dict:
+    for _ in range(20):
+        response = client.get(f"/api/jobs/{job_id}", headers={"Authorization": f"Bearer {admin_token}"})
+        job = response.json()
+        if job["status"] in {"completed", "failed", "dead_letter"}:
+            return job
+        time.sleep(0.1)
+    pytest.fail("打印任务未在预期时间内完成")
+
+
+def test_job_fails_over_within_printer_group(client: TestClient, admin_token: str):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    with session_scope() as db:
+        primary = Printer(name="failover-primary", status="online")
+        backup = Printer(name="failover-backup", status="online")
+        db.add_all([primary, backup])
+        db.flush()
+        printer_ids = [primary.id, backup.id]
+
+    response = client.post(
+        "/api/printers/groups",
+        json={"name": "failover-group", "printer_ids": printer_ids},
+        headers=headers,
+    )
+    assert response.status_code == 201
+    assert sorted(printer["id"] for printer in response.json()["printers"]) == printer_ids
+
+    for _ in range(10):
+        printer_health.record_failure(printer_ids[0], "离线")
+
+    response = client.post(
+        "/api/jobs",
+        json={
+            "title": "熔断改派",
+            "file_type": "txt",
+            "printer_name": "failover-primary",
+            "content_base64": base64.b64encode(b"failover").decode(),
+        },
+        headers=headers,
+    )
+    assert response.status_code == 201
+    job = _wait_for_job(client, admin_token, response.json()["id"])
+    assert job["status"] == "completed"
+    assert job["printer_name"] == "failover-backup"
+
+    health = client.get("/api/printers/health", headers=headers).json()
+    assert {item["printer_id"]: item["state"] for item in health}[printer_ids[0]] == "open"
+
+
+def test_content_error_releases_half_open_trial(client: TestClient, admin_token: str):
+    from app.services.job_service import process_print_job
+
+    with session_scope() as db:
+        printer = Printer(name="half-open-printer", status="online")
+        db.add(printer)
+        db.flush()
+        # 模板已被删除的标签任务在取得试探名额后失败
+        job = PrintJob(title="无模板标签", file_type="csv", content=b"a\n1", status="queued", printer_id=printer.id)
+        db.add(job)
+        db.flush()
+        printer_id, job_id = printer.id, job.id
+    for _ in range(10):
+        printer_health.record_failure(printer_id, "离线")
+    printer_health._breakers[printer_id].opened_at -= 3600
+
+    process_print_job(job_id)
+    with session_scope() as db:
+        assert db.query(PrintJob.status).filter(PrintJob.id == job_id).scalar() == "failed"
+    assert printer_health.allow_request(printer_id) is True
+
+
+def test_print_request_detached_from_session(monkeypatch):
+    from app.services import job_service
+
+    monkeypatch.delenv("PRINT_PROXY_DISABLE_PRINT")
+    monkeypatch.setattr(job_service, "win32print", object())
+    with session_scope() as db:
+        printer = Printer(name="request-printer", status="online")
+        db.add(printer)
+        db.flush()
+        job = PrintJob(title="普通数据", file_type="txt", content=b"plain", copies=2, printer_id=printer.id)
+        db.add(job)
+        db.flush()
+        request = job_service._prepare_print_request(job)
+    # 会话关闭后打印线程仍能读取全部打印参数
+    assert (request.printer_name, request.title, request.copies) == ("request-printer", "普通数据", 2)
+    assert (request.mode, request.payload) == ("raw", b"plain")
+
+
+def test_template_zpl_streamed_after_session_closed(monkeypatch):
+    from app.services import job_service
+
+    class FakeWin32Print:
+        def __init__(self):
+            self.writes = []
+            self.aborted = False
+
+        def OpenPrinter(self, name):
+            return name
+
+        def WritePrinter(self, handle, data):
+            self.writes.append(data)
+
+        def AbortPrinter(self, handle):
+            self.aborted = True
+
+        def __getattr__(self, name):
+            return lambda *args: None
+
+    fake = FakeWin32Print()
+    monkeypatch.delenv("PRINT_PROXY_DISABLE_PRINT")
+    monkeypatch.setattr(job_service, "win32print", fake)
+    monkeypatch.setattr(job_service, "RAW_WRITE_CHUNK_BYTES", 1024)
+    records = "\n".join(json.dumps({"sku": f"SKU-{index:04d}"}) for index in range(200)).encode()
+    with session_scope() as db:
+        printer = Printer(name="zpl-stream-printer", status="online")
+        template = LabelTemplate(
+            name="流式 ZPL", width_mm=50, height_mm=30, output="zpl",
+            elements=json.dumps([{"type": "text", "x": 10, "y": 10, "text": "{sku}"}]),
+        )
+        db.add_all([printer, template])
+        db.flush()
+        job = PrintJob(title="流式", file_type="jsonl", content=records, printer_id=printer.id, template_id=template.id)
+        broken = PrintJob(title="损坏", file_type="jsonl", content=b'{"sku": 1}\n{', printer_id=printer.id, template_id=template.id)
+        db.add_all([job, broken])
+        db.flush()
+        request = job_service._prepare_print_request(job)
+        broken_request = job_service._prepare_print_request(broken)
+    # 记录在打印线程中逐条生成，按块写入打印机
+    job_service._send_to_printer(request)
+    zpl = b"".join(fake.writes).decode()
+    assert zpl.count("SKU-") == 200 and "SKU-0199" in zpl
+    assert 1 < len(fake.writes) < 200
+
+    with pytest.raises(PrintContentError):
+        job_service._send_to_printer(broken_request)
+    assert fake.aborted
+
+
+def test_job_dispatched_within_printer_group(client: TestClient, admin_token: str):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    with session_scope() as db:
+        busy = Printer(name="dispatch-busy", status="online")
+        idle = Printer(name="dispatch-idle", status="online")
+        db.add_all([busy, idle])
+        db.flush()
+        printer_ids = [busy.id, idle.id]
+        db.add(PrintJob(title="积压", file_type="txt", status="queued", copies=20, printer_id=busy.id, content=b""))
+
+    response = client.post(
+        "/api/printers/groups",
+        json={"name": "dispatch-group", "printer_ids": printer_ids},
+        headers=headers,
+    )
+    assert response.status_code == 201
+
+    payload = {
+        "title": "分组派发",
+        "file_type": "txt",
+        "printer_group": "dispatch-group",
+        "content_base64": base64.b64encode(b"dispatch").decode(),
+    }
+    response = client.post("/api/jobs", json=payload, headers=headers)
+    assert response.status_code == 201
+    assert response.json()["printer_name"] == "dispatch-idle"
+
+    payload["printer_group"] = "missing-group"
+    response = client.post("/api/jobs", json=payload, headers=headers)
+    assert response.status_code == 404
+
+
+def test_label_jobs_coalesced_into_one_document(client: TestClient, admin_token: str):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    with session_scope() as db:
+        printer = Printer(name="coalesce-label", status="online")
+        db.add(printer)
+        db.flush()
+        printer_id = printer.id
+
+    response = client.put(
+        f"/api/printers/{printer_id}",
+        json={"coalesce_window_ms": 500, "coalesce_max_jobs": 3},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert response.json()["coalesce_window_ms"] == 500
+
+    job_ids = []
+    for index in range(3):
+        response = client.post(
+            "/api/jobs",
+            json={
+                "title": f"标签 {index}",
+                "file_type": "txt",
+                "printer_name": "coalesce-label",
+                "content_base64": base64.b64encode(f"^XA^FD{index}^XZ".encode()).decode(),
+            },
+            headers=headers,
+        )
+        assert response.status_code == 201
+        job_ids.append(response.json()["id"])
+
+    for job_id in job_ids:
+        assert _wait_for_job(client, admin_token, job_id)["status"] == "completed"
+    with session_scope() as db:
+        messages = [
+            log.message for log in db.query(JobLog).filter(JobLog.job_id.in_(job_ids), JobLog.message.like("任务打印完成%")).all()
+        ]
+    assert messages == ["任务打印完成（3 个任务合并为一个打印文档）"] * 3
+
+
+def test_coalesce_window_yields_to_other_printers(client: TestClient, admin_token: str):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    with session_scope() as db:
+        slow = Printer(name="coalesce-slow-window", status="online", coalesce_window_ms=3000, coalesce_max_jobs=10)
+        other = Printer(name="coalesce-other", status="online")
+        db.add_all([slow, other])
+
+    def submit(printer_name: str) -> int:
+        payload = {"title": printer_name, "file_type": "txt", "printer_name": printer_name, "content_base64": "eA=="}
+        return client.post("/api/jobs", json=payload, headers=headers).json()["id"]
+
+    started = time.monotonic()
+    submit("coalesce-slow-window")
+    time.sleep(0.2)
+    other_id = submit("coalesce-other")
+    # 只有一个工作线程：另一台打印机的任务不必等满合并窗口
+    assert _wait_for_job(client, admin_token, other_id)["status"] == "completed"
+    assert time.monotonic() - started < 2
+
+
+def test_template_job_from_csv_records(client: TestClient, admin_token: str):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = client.post(
+        "/api/templates",
+        json={
+            "name": "库位标签",
+            "width_mm": 40,
+            "height_mm": 30,
+            "elements": [
+                {"type": "box", "x": 0, "y": 0, "width": 300, "height": 220},
+                {"type": "text", "x": 10, "y": 10, "text": "LOC {location}", "size": 24},
+            ],
+        },
+        headers=headers,
+    )
+    assert response.status_code == 201
+    template_id = response.json()["id"]
+    assert response.json()["elements"][1]["text"] == "LOC {location}"
+
+    response = client.post(f"/api/templates/{template_id}/preview", json={"location": "A-01"}, headers=headers)
+    assert response.status_code == 200
+    with Image.open(io.BytesIO(base64.b64decode(response.text))) as image:
+        assert image.size == (320, 240)
+
+    records = "location\n" + "\n".join(f"A-{index:02d}" for index in range(100))
+    payload = {
+        "title": "库位标签批量",
+        "file_type": "csv",
+        "template_id": template_id,
+        "content_base64": base64.b64encode(records.encode()).decode(),
+    }
+    response = client.post("/api/jobs", json=payload, headers=headers)
+    assert response.status_code == 201
+    job_id = response.json()["id"]
+    assert _wait_for_job(client, admin_token, job_id)["status"] == "completed"
+    assert client.get(f"/api/jobs/{job_id}/preview", headers=headers).status_code == 200
+
+    payload["template_id"] = None
+    assert client.post("/api/jobs", json=payload, headers=headers).status_code == 400
+
+
+def test_reprint_references_original_content(client: TestClient, admin_token: str):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    payload = {
+        "title": "重印测试",
+        "file_type": "txt",
+        "copies": 1,
+        "content_base64": base64.b64encode(b"reprint me").decode(),
+    }
+    job_id = client.post("/api/jobs", json=payload, headers=headers).json()["id"]
+    assert _wait_for_job(client, admin_token, job_id)["status"] == "completed"
+
+    response = client.post(f"/api/jobs/{job_id}/reprint", json={"copies": 3}, headers=headers)
+    assert response.status_code == 201
+    reprint = response.json()
+    assert reprint["source_job_id"] == job_id
+    assert reprint["copies"] == 3
+
+    # 重印的重印仍指向原任务
+    response = client.post(f"/api/jobs/{reprint['id']}/reprint", json={}, headers=headers)
+    assert response.json()["source_job_id"] == job_id
+    for reprint_id in (reprint["id"], response.json()["id"]):
+        assert _wait_for_job(client, admin_token, reprint_id)["status"] == "completed"
+
+    with session_scope() as db:
+        stored = db.query(PrintJob).filter(PrintJob.id == reprint["id"]).first()
+        assert stored.content == b""
+        assert stored.print_content == b"reprint me"
+
+    response = client.post(f"/api/jobs/{job_id}/reprint", json={"printer_name": "不存在"}, headers=headers)
+    assert response.status_code == 404
+
+
+def test_idempotency_key_returns_original_job(client: TestClient, admin_token: str):
+    headers = {"Authorization": f"Bearer {admin_token}", "Idempotency-Key": "order-20240101-0001"}
+    payload = {
+        "title": "幂等提交",
+        "file_type": "txt",
+        "content_base64": base64.b64encode(b"only once").decode(),
+    }
+    results = []
+
+    def submit():
+        results.append(client.post("/api/jobs", json=payload, headers=headers))
+
+    threads = [threading.Thread(target=submit) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(response.status_code == 201 for response in results)
+    job_ids = {response.json()["id"] for response in results}
+    assert len(job_ids) == 1
+
+    # 超时重试：重复提交直接返回原任务
+    response = client.post("/api/jobs", json=payload, headers=headers)
+    assert response.json()["id"] in job_ids
+    with session_scope() as db:
+        assert db.query(PrintJob).filter(PrintJob.title == "幂等提交").count() == 1
+
+    # 创建失败时释放幂等键，修正请求后可用同一个键重试
+    headers["Idempotency-Key"] = "order-20240101-0002"
+    bad_payload = dict(payload, printer_name="不存在的打印机")
+    assert client.post("/api/jobs", json=bad_payload, headers=headers).status_code == 404
+    response = client.post("/api/jobs", json=payload, headers=headers)
+    assert response.status_code == 201
+    assert response.json()["id"] not in job_ids
+
+    # 同一个键提交不同的内容被拒绝
+    other_payload = dict(payload, content_base64=base64.b64encode(b"something else").decode())
+    assert client.post("/api/jobs", json=other_payload, headers=headers).status_code == 422
+
+
+def test_idempotency_placeholder_lease(client: TestClient, admin_token: str):
+    from app.models import IdempotencyKey, User
+    from app.services import idempotency_service
+
+    headers = {"Authorization": f"Bearer {admin_token}", "Idempotency-Key": "order-crashed"}
+    payload = {"title": "租期", "file_type": "txt", "content_base64": base64.b64encode(b"lease").decode()}
+    with session_scope() as db:
+        owner_id = db.query(User.id).filter(User.username == "admin").scalar()
+        # 模拟首个请求占用后进程退出：占位只有短暂的租期
+        assert idempotency_service.claim(db, owner_id, "order-crashed") is None
+        lease_end = db.query(IdempotencyKey.expires_at).filter(IdempotencyKey.key == "order-crashed").scalar()
+        assert lease_end < now_shanghai().replace(tzinfo=None) + timedelta(minutes=5)
+        db.query(IdempotencyKey).filter(IdempotencyKey.key == "order-crashed").update(
+            {IdempotencyKey.expires_at: now_shanghai() - timedelta(seconds=1)}
+        )
+    idempotency_service.finish(owner_id, "order-crashed")
+
+    response = client.post("/api/jobs", json=payload, headers=headers)
+    assert response.status_code == 201
+    with session_scope() as db:
+        expires_at = db.query(IdempotencyKey.expires_at).filter(IdempotencyKey.key == "order-crashed").scalar()
+        assert expires_at > now_shanghai().replace(tzinfo=None) + timedelta(hours=1)
+
+
+def test_bulk_job_operations(client: TestClient, admin_token: str):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    with session_scope() as db:
+        jobs = [
+            PrintJob(title=f"批量任务 {index}", file_type="txt", content=b"x", status="retrying", batch_id="runaway-1")
+            for index in range(50)
+        ]
+        db.add_all(jobs)
+        db.flush()
+        job_ids = [job.id for job in jobs]
+
+    response = client.post("/api/jobs/bulk/reprioritize", json={"batch_id": "runaway-1", "priority": 1}, headers=headers)
+    assert response.json() == {"affected": 50}
+
+    response = client.post("/api/jobs/bulk/cancel", json={"batch_id": "runaway-1", "statuses": ["retrying"]}, headers=headers)
+    assert response.json() == {"affected": 50}
+    # 已取消的任务不会被再次取消
+    response = client.post("/api/jobs/bulk/cancel", json={"batch_id": "runaway-1"}, headers=headers)
+    assert response.json() == {"affected": 0}
+    # 空的筛选条件不会作用于全部任务
+    assert client.post("/api/jobs/bulk/cancel", json={}, headers=headers).status_code == 400
+
+    with session_scope() as db:
+        assert db.query(PrintJob).filter(PrintJob.id.in_(job_ids), PrintJob.status == "cancelled", PrintJob.priority == 1).count() == 50
+        assert db.query(JobLog).filter(JobLog.job_id.in_(job_ids), JobLog.message.like("任务已被取消（批量操作%")).count() == 50
+
+    response = client.post("/api/jobs/bulk/requeue", json={"job_ids": job_ids[:5]}, headers=headers)
+    assert response.json() == {"affected": 5}
+    assert _wait_for_job(client, admin_token, job_ids[0])["status"] == "completed"
+
+
+def test_job_logs_pagination_export_and_retention(client: TestClient, admin_token: str, tmp_path: Path):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    with session_scope() as db:
+        job = PrintJob(title="日志任务", file_type="txt", content=b"x", status="completed")
+        db.add(job)
+        db.flush()
+        job_id = job.id
+        old = now_shanghai() - timedelta(days=40)
+        db.add_all(
+            JobLog(job_id=job_id, level="error" if index % 5 == 0 else "info", message=f"日志 {index}", created_at=old if index < 30 else now_shanghai())
+            for index in range(50)
+        )
+
+    messages, cursor = [], None
+    while True:
+        params = {"job_id": job_id, "limit": 20}
+        if cursor:
+            params["after_id"] = cursor
+        response = client.get("/api/logs/", params=params, headers=headers)
+        messages.extend(log["message"] for log in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert messages == [f"日志 {index}" for index in range(50)]
+
+    response = client.get("/api/logs/", params={"job_id": job_id, "level": "error"}, headers=headers)
+    assert len(response.json()) == 10
+
+    response = client.get("/api/logs/export", params={"job_id": job_id}, headers=headers)
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["message"] for line in lines] == [f"日志 {index}" for index in range(50)]
+
+    assert job_log_retention.run_once(30, batch_size=7, archive_directory=str(tmp_path)) == 30
+    response = client.get("/api/logs/", params={"job_id": job_id}, headers=headers)
+    assert len(response.json()) == 20
+    archived = [line for path in tmp_path.glob("job_logs-*.ndjson") for line in path.read_text(encoding="utf-8").splitlines()]
+    assert len(archived) == 30
+
+
+def test_payload_archival_keeps_metadata(client: TestClient, admin_token: str, tmp_path: Path):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    old = now_shanghai() - timedelta(days=40)
+    with session_scope() as db:
+        jobs = [
+            PrintJob(title=f"归档任务 {index}", file_type="txt", content=b"payload %d" % index, status="completed", updated_at=old)
+            for index in range(5)
+        ]
+        recent = PrintJob(title="新任务", file_type="txt", content=b"recent", status="completed")
+        db.add_all(jobs + [recent])
+        db.flush()
+        # 排队中的重印任务仍引用原任务，原任务暂不归档
+        db.add(PrintJob(title="重印", file_type="txt", content=b"", status="queued", source_job_id=jobs[0].id))
+        archived_ids = [job.id for job in jobs[1:]]
+        referenced_id, recent_id = jobs[0].id, recent.id
+
+    assert payload_archiver.run_once(30, batch_size=2, archive_directory=str(tmp_path), vacuum_pages=100) == 4
+
+    with session_scope() as db:
+        for job_id in archived_ids:
+            job = db.query(PrintJob).filter(PrintJob.id == job_id).first()
+            assert job.content == b"" and job.payload_archived_at is not None
+            with open(job.payload_archive_path, "rb") as archive:
+                assert gzip.decompress(archive.read()) == b"payload %d" % (job_id - archived_ids[0] + 1)
+        assert db.query(PrintJob.content).filter(PrintJob.id == referenced_id).scalar() == b"payload 0"
+        assert db.query(PrintJob.content).filter(PrintJob.id == recent_id).scalar() == b"recent"
+
+    response = client.get(f"/api/jobs/{archived_ids[0]}", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["payload_archived_at"] is not None
+    assert "payload_archive_path" not in response.json()
+    response = client.post(f"/api/jobs/{archived_ids[0]}/reprint", json={}, headers=headers)
+    assert response.status_code == 409
+
+    # 原任务已归档时，失败的重印任务不能重新入队，已在队列中的直接失败
+    with session_scope() as db:
+        failed = PrintJob(title="失败重印", file_type="txt", content=b"", status="failed", source_job_id=archived_ids[1])
+        queued = PrintJob(title="排队重印", file_type="txt", content=b"", status="queued", source_job_id=archived_ids[1])
+        db.add_all([failed, queued])
+        db.flush()
+        failed_id, queued_id = failed.id, queued.id
+    response = client.post("/api/jobs/bulk/requeue", json={"job_ids": [failed_id]}, headers=headers)
+    assert response.json()["affected"] == 0
+    job_service.process_print_job(queued_id)
+    job = client.get(f"/api/jobs/{queued_id}", headers=headers).json()
+    assert job["status"] == "failed" and "已归档" in job["error_message"]
+
+
+def test_compressible_payload_stored_compressed(client: TestClient, admin_token: str):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    text = "压缩存储测试\n".encode("utf-8") * 2000
+    payload = {"title": "压缩任务", "file_type": "txt", "copies": 1, "content_base64": base64.b64encode(text).decode()}
+    job_id = client.post("/api/jobs", json=payload, headers=headers).json()["id"]
+    assert _wait_for_job(client, admin_token, job_id)["status"] == "completed"
+
+    with session_scope() as db:
+        job = db.query(PrintJob).filter(PrintJob.id == job_id).first()
+        assert job.content_codec == "zlib"
+        assert len(job.content) < len(text) / 10
+        assert job.print_content == text
+
+
+def test_job_events_pushed_over_websocket(client: TestClient, admin_token: str):
+    payload = {"title": "事件推送", "file_type": "txt", "content_base64": base64.b64encode(b"events").decode()}
+    with client.websocket_connect(f"/api/jobs/events/ws?token={admin_token}") as websocket:
+        response = client.post("/api/jobs", json=payload, headers={"Authorization": f"Bearer {admin_token}"})
+        job_id = response.json()["id"]
+        statuses, messages = [], []
+        while "completed" not in statuses:
+            event = websocket.receive_json()
+            if event.get("job_id") != job_id:
+                continue
+            if event["type"] == "status":
+                statuses.append(event["status"])
+            elif event["type"] == "log":
+                messages.append(event["message"])
+    assert statuses[0] == "queued" and statuses[-1] == "completed"
+    assert "任务打印完成" in messages
+
+    # 按任务订阅时第一条事件是当前状态
+    with client.websocket_connect(f"/api/jobs/events/ws?job_id={job_id}&token={admin_token}") as websocket:
+        assert websocket.receive_json()["status"] == "completed"
+
+    response = client.get(f"/api/jobs/events?job_id={job_id}")
+    assert response.status_code == 401
+
+
+def test_wait_for_job_completion(client: TestClient, admin_token: str):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    payload = {"title": "等待完成", "file_type": "txt", "content_base64": base64.b64encode(b"wait").decode()}
+    response = client.post("/api/jobs?wait=10", json=payload, headers=headers)
+    assert response.status_code == 201
+    job = response.json()
+    assert job["status"] == "completed"
+
+    # 已结束的任务立即返回
+    response = client.get(f"/api/jobs/{job['id']}/status?wait=10", headers=headers)
+    assert response.json() == {"status": "completed", "error_message": None}
+
+    with session_scope() as db:
+        pending = PrintJob(title="不会执行的任务", file_type="txt", content=b"x", status="retrying")
+        db.add(pending)
+        db.flush()
+        pending_id = pending.id
+    started = time.monotonic()
+    response = client.get(f"/api/jobs/{pending_id}/status?wait=0.3", headers=headers)
+    assert response.json()["status"] == "retrying"
+    assert 0.3 <= time.monotonic() - started < 5
+
+
+def test_waiting_create_releases_connections(client: TestClient, admin_token: str):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    with session_scope() as db:
+        printer = Printer(name="wait-unavailable", status="online")
+        db.add(printer)
+        db.flush()
+        printer_id = printer.id
+    # 熔断的打印机没有可改派的成员，任务进入等待重试，不会很快结束
+    for _ in range(10):
+        printer_health.record_failure(printer_id, "离线")
+    payload = {"title": "等待中", "file_type": "txt", "printer_name": "wait-unavailable", "content_base64": "eA=="}
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(client.post("/api/jobs?wait=1.5", json=payload, headers=headers)))
+        for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.8)
+    checked_out = engine.pool.checkedout()
+    for thread in threads:
+        thread.join()
+    assert [response.json()["status"] for response in results] == ["retrying"] * 3
+    # 等待中的请求不占用同步连接池
+    assert checked_out == 0
+
+
+def test_patched_status_updates_cache(client: TestClient, admin_token: str):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    with session_scope() as db:
+        pending = PrintJob(title="修改状态", file_type="txt", content=b"x", status="retrying")
+        db.add(pending)
+        db.flush()
+        pending_id = pending.id
+    # 先读一次，使状态进入缓存
+    assert client.get(f"/api/jobs/{pending_id}/status", headers=headers).json()["status"] == "retrying"
+
+    response = client.patch(f"/api/jobs/{pending_id}", json={"status": "cancelled"}, headers=headers)
+    assert response.json()["status"] == "cancelled"
+    assert client.get(f"/api/jobs/{pending_id}/status", headers=headers).json()["status"] == "cancelled"
+
+
+def test_wait_wakes_on_patched_status(client: TestClient, admin_token: str):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    with session_scope() as db:
+        pending = PrintJob(title="等待修改状态", file_type="txt", content=b"x", status="retrying")
+        db.add(pending)
+        db.flush()
+        pending_id = pending.id
+    timer = threading.Timer(
+        0.3, client.patch, args=(f"/api/jobs/{pending_id}",), kwargs={"json": {"status": "failed"}, "headers": headers}
+    )
+    timer.start()
+    started = time.monotonic()
+    response = client.get(f"/api/jobs/{pending_id}/status?wait=10", headers=headers)
+    timer.join()
+    assert response.json()["status"] == "failed"
+    assert time.monotonic() - started < 5
+
+
+def test_cached_auth_follows_user_changes(client: TestClient, admin_token: str):
+    admin_headers = {"Authorization": f"Bearer {admin_token}"}
+    response = client.post(
+        "/api/auth/users", json={"username": "cached-user", "password": "secret123"}, headers=admin_headers
+    )
+    user_id = response.json()["id"]
+    token = client.post("/api/auth/token", data={"username": "cached-user", "password": "secret123"}).json()["access_token"]
+    api_key = client.post(f"/api/auth/users/{user_id}/api-key", headers=admin_headers).json()
+    payload = {"title": "api key", "file_type": "txt", "content_base64": base64.b64encode(b"key").decode()}
+    for _ in range(2):
+        assert client.get("/api/auth/me", headers={"Authorization": f"Bearer {token}"}).status_code == 200
+        assert client.post("/api/jobs", json=payload, headers={"X-API-Key": api_key}).status_code == 201
+
+    # 重新生成 API Key 后旧的 Key 立即失效
+    new_key = client.post(f"/api/auth/users/{user_id}/api-key", headers=admin_headers).json()
+    assert client.post("/api/jobs", json=payload, headers={"X-API-Key": api_key}).status_code == 401
+    assert client.post("/api/jobs", json=payload, headers={"X-API-Key": new_key}).status_code == 201
+
+    # 停用后已缓存的认证结果立即失效
+    response = client.patch(f"/api/auth/users/{user_id}", json={"is_active": False}, headers=admin_headers)
+    assert response.json()["is_active"] is False
+    assert client.get("/api/auth/me", headers={"Authorization": f"Bearer {token}"}).status_code == 403
+    assert client.post("/api/jobs", json=payload, headers={"X-API-Key": new_key}).status_code == 401
@@ -0,0 +1,41 @@
+"""
+测试认证结果缓存
+"""
+import time
+
+from app.models import User
+from app.services.auth_cache import AuthCache
+
+
+def make_user(user_id: int = 1, is_active: bool = True) -> User:
+    return User(id=user_id, username=f"user-{user_id}", hashed_password="x", is_active=is_active, is_admin=False)
+
+
+class TestAuthCache:
+    """测试 Token、用户缓存的过期与失效"""
+
+    def test_token_cached_until_expiry(self):
+        cache = AuthCache(ttl=30)
+        cache.put_token("valid", "user-1", time.time() + 60)
+        cache.put_token("expired", "user-1", time.time() - 1)
+        assert cache.get_token("valid") == "user-1"
+        assert cache.get_token("expired") is None
+
+    def test_user_ttl_and_invalidation(self):
+        cache = AuthCache(ttl=0.05)
+        cached = cache.put_user("username", "user-1", make_user(), cache.generation)
+        # 缓存的是与会话分离的副本
+        assert cached is not None and cache.get_user("username", "user-1") is cached
+        time.sleep(0.06)
+        assert cache.get_user("username", "user-1") is None
+
+        cache.ttl = 30
+        cache.put_user("api_key", "key-1", make_user(), cache.generation)
+        cache.invalidate(["1"])
+        assert cache.get_user("api_key", "key-1") is None
+
+        # 查询数据库期间发生失效时不缓存查到的旧数据
+        generation = cache.generation
+        cache.invalidate(["1"])
+        cache.put_user("username", "user-1", make_user(is_active=True), generation)
+        assert cache.get_user("username", "user-1") is None
@@ -0,0 +1,83 @@
+"""
+测试 Office 转换缓存
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from app.models import PrintJob
+from app.services import job_service
+from app.services.conversion_cache import ConversionCache, content_key
+from app.tasks.office_pool import FakeOfficeConverter, OfficePool
+from app.utils.payload_codec import encode_payload
+
+
+class TestConversionCache:
+    """测试命中统计与容量淘汰"""
+
+    def test_hit_and_miss_metrics(self, tmp_path):
+        cache = ConversionCache(str(tmp_path), max_bytes=1024, max_entries=10)
+        key = content_key(b"template")
+        assert cache.get(key) is None
+        cache.put(key, b"%PDF-1.4")
+        assert cache.get(key) == b"%PDF-1.4"
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_evicts_least_recently_used_by_entries(self, tmp_path):
+        cache = ConversionCache(str(tmp_path), max_bytes=1024, max_entries=2)
+        cache.put("a", b"1")
+        cache.put("b", b"2")
+        cache.get("a")
+        cache.put("c", b"3")
+        assert cache.get("b") is None
+        assert cache.get("a") == b"1"
+        assert not (tmp_path / "b.pdf").exists()
+
+    def test_evicts_by_size(self, tmp_path):
+        cache = ConversionCache(str(tmp_path), max_bytes=10, max_entries=10)
+        cache.put("a", b"x" * 6)
+        cache.put("b", b"y" * 6)
+        assert cache.stats()["bytes"] == 6
+        assert cache.get("a") is None
+
+    def test_reloads_existing_entries(self, tmp_path):
+        ConversionCache(str(tmp_path), max_bytes=1024, max_entries=10).put("a", b"pdf")
+        cache = ConversionCache(str(tmp_path), max_bytes=1024, max_entries=10)
+        assert cache.get("a") == b"pdf"
+
+
+def test_repeated_document_skips_automation(tmp_path, monkeypatch):
+    """相同文档第二次打印直接使用缓存的 PDF"""
+    converters = []
+
+    def factory():
+        converter = FakeOfficeConverter()
+        converters.append(converter)
+        return converter
+
+    pool = OfficePool("word", factory)
+    monkeypatch.setattr(job_service, "office_pools", SimpleNamespace(get=lambda application: pool))
+    monkeypatch.setattr(job_service, "conversion_cache", ConversionCache(str(tmp_path), 1024 * 1024, 10))
+    content, codec = encode_payload(b"docx-bytes" * 200, "docx")
+    job = PrintJob(id=1, content=content, content_codec=codec, file_type="docx")
+    try:
+        pdfs = [job_service._prepare_converted_pdf(job, "word") for _ in range(2)]
+    finally:
+        pool.shutdown()
+    assert all(pdf.startswith(b"%PDF") for pdf in pdfs)
+    assert len(converters[0].exported) == 1
+
+
+@pytest.mark.skipif(job_service.fitz is None, reason="缺少 PyMuPDF")
+def test_converted_pdf_rendered_page_by_page():
+    """缓存的 PDF 按打印机 DPI 逐页渲染后通过 GDI 打印"""
+    doc = job_service.fitz.open()
+    for _ in range(3):
+        doc.new_page(width=595, height=842)
+    pdf = doc.tobytes()
+    pages = list(job_service._iter_pdf_pages(pdf, 144))
+    assert len(pages) == 3
+    assert pages[0].mode == "RGB" and pages[0].size == (1190, 1684)
@@ -0,0 +1,88 @@
+"""
+测试 SQLite 调优与写入排队
+"""
+import threading
+import time
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.database import WriterQueue, create_database_engine, serialize_writes, to_async_url, writer_queue
+from app.models import Printer
+
+
+class TestSqliteTuning:
+    """测试 WAL、pragma 与写锁释放"""
+
+    def test_pragmas_applied(self, tmp_path):
+        engine = create_database_engine(f"sqlite:///{tmp_path / 'tuned.db'}", tuned=True)
+        with engine.connect() as connection:
+            assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert connection.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert connection.execute(text("PRAGMA busy_timeout")).scalar() > 0
+        engine.dispose()
+
+        engine = create_database_engine(f"sqlite:///{tmp_path / 'plain.db'}", tuned=False)
+        with engine.connect() as connection:
+            assert connection.execute(text("PRAGMA journal_mode")).scalar() == "delete"
+        engine.dispose()
+
+    def test_session_releases_writer_lock(self, tmp_path):
+        engine = create_database_engine(f"sqlite:///{tmp_path / 'writes.db'}", tuned=True)
+        Printer.__table__.create(bind=engine)
+        session_factory = sessionmaker(bind=engine, class_=Session)
+        serialize_writes(session_factory)
+
+        with session_factory() as db:
+            db.add(Printer(name="HP-LASER"))
+            db.commit()
+        with session_factory() as db:
+            db.query(Printer).filter(Printer.name == "HP-LASER").update({"location": "办公室"})
+            db.rollback()
+        with session_factory() as db:
+            db.add(Printer(name="ZEBRA"))
+            db.flush()
+        # 提交、回滚、直接关闭后写锁都已释放
+        assert writer_queue._owner is None
+        engine.dispose()
+
+
+class TestWriterQueue:
+    """测试写锁按到达顺序交接且同一线程可重入"""
+
+    def test_fifo_and_reentrant(self):
+        queue = WriterQueue()
+        queue.acquire()
+        queue.acquire()
+        order = []
+
+        def writer(index: int) -> None:
+            queue.acquire()
+            order.append(index)
+            queue.release()
+
+        threads = []
+        for index in range(5):
+            thread = threading.Thread(target=writer, args=(index,))
+            thread.start()
+            threads.append(thread)
+            # 等待线程进入队列，保证到达顺序确定
+            while queue.stats()["waiting"] < index + 1:
+                time.sleep(0.001)
+        queue.release()
+        assert order == []
+        queue.release()
+        for thread in threads:
+            thread.join()
+        assert order == [0, 1, 2, 3, 4]
+        assert queue.stats()["acquired"] == 6
+
+
+class TestAsyncUrl:
+    """测试异步驱动地址转换"""
+
+    def test_driver_swapped(self):
+        assert to_async_url("sqlite:///./print_proxy.db") == "sqlite+aiosqlite:///./print_proxy.db"
+        assert to_async_url("sqlite:///C:/PrintProxy/print_proxy.db") == "sqlite+aiosqlite:///C:/PrintProxy/print_proxy.db"
+        assert to_async_url("postgresql+psycopg2://u:p@db/print") == "postgresql+asyncpg://u:p@db/print"
+        assert to_async_url("mssql+pyodbc://u:p@db/print") == "mssql+pyodbc://u:p@db/print"
@@ -0,0 +1,33 @@
+"""
+测试打印机分组负载均衡派发
+"""
+from types import SimpleNamespace
+
+from app.core.config import settings
+from app.services.dispatcher import PrinterDispatcher
+
+
+class TestPrinterDispatcher:
+    """测试打印速度估计与按预计完成时间选择"""
+
+    def test_speed_moving_average(self, monkeypatch):
+        monkeypatch.setattr(settings, "dispatch_speed_smoothing", 0.5)
+        dispatcher = PrinterDispatcher()
+        assert dispatcher.pages_per_second(1) == settings.dispatch_default_pages_per_second
+        dispatcher.record_completion(1, 10, 5)
+        assert dispatcher.pages_per_second(1) == 2
+        dispatcher.record_completion(1, 4, 1)
+        assert dispatcher.pages_per_second(1) == 3
+
+    def test_choose_by_estimated_completion(self, monkeypatch):
+        dispatcher = PrinterDispatcher()
+        dispatcher.record_completion(1, 10, 1)
+        dispatcher.record_completion(2, 1, 1)
+        depths = {1: 50, 2: 2}
+        monkeypatch.setattr(dispatcher, "queued_pages", lambda db, ids: {i: depths[i] for i in ids})
+        printers = [SimpleNamespace(id=1), SimpleNamespace(id=2)]
+
+        # 1 号：(50 + 1) / 10 = 5.1 秒；2 号：(2 + 1) / 1 = 3 秒
+        assert dispatcher.choose(None, printers, 1).id == 2
+        assert dispatcher.choose(None, printers, 1, is_available=lambda printer_id: printer_id != 2).id == 1
+        assert dispatcher.choose(None, printers, 1, is_available=lambda printer_id: False) is None
@@ -0,0 +1,81 @@
+"""
+测试任务事件总线的过滤、合并与丢弃
+"""
+import asyncio
+import threading
+
+from app.services.job_events import JobEventBus
+
+
+class TestJobEventBus:
+    """测试订阅过滤与慢消费者的背压处理"""
+
+    def test_filters_and_log_enrichment(self):
+        async def scenario():
+            bus = JobEventBus()
+            by_owner = bus.subscribe(owner_id=7)
+            by_printer = bus.subscribe(printer_id=3)
+            bus.publish_status(1, "queued", owner_id=7, printer_id=2)
+            bus.publish_status(2, "queued", owner_id=8, printer_id=3)
+            # 日志事件从状态事件记下的索引补全所有者和打印机
+            bus.publish_log(2, "info", "任务打印完成")
+            owner_events, _ = await by_owner.get(timeout=1)
+            printer_events, _ = await by_printer.get(timeout=1)
+            bus.unsubscribe(by_owner)
+            bus.unsubscribe(by_printer)
+            return owner_events, printer_events, bus.stats()
+
+        owner_events, printer_events, stats = asyncio.run(scenario())
+        assert [(event.type, event.job_id) for event in owner_events] == [("status", 1)]
+        assert [(event.type, event.job_id) for event in printer_events] == [("status", 2), ("log", 2)]
+        assert stats["subscribers"] == 0
+
+    def test_slow_consumer_coalesced_and_dropped(self):
+        async def scenario():
+            bus = JobEventBus(max_pending=3)
+            subscription = bus.subscribe()
+
+            def publisher():
+                for status in ("queued", "processing", "completed"):
+                    bus.publish_status(1, status)
+                for index in range(5):
+                    bus.publish_log(1, "info", f"日志 {index}")
+
+            # 发布方在其他线程中运行，不会等待订阅者
+            thread = threading.Thread(target=publisher)
+            thread.start()
+            thread.join()
+            events, dropped = await subscription.get(timeout=1)
+            empty = await subscription.get(timeout=0.05)
+            return events, dropped, empty, bus.stats()
+
+        events, dropped, empty, stats = asyncio.run(scenario())
+        assert [event.data["status"] for event in events if event.type == "status"] == ["completed"]
+        assert [event.data["message"] for event in events if event.type == "log"] == ["日志 3", "日志 4"]
+        assert dropped == 3
+        assert empty == ([], 0)
+        assert stats["coalesced"] == 2 and stats["dropped"] == 3
+
+
+class TestJobWaiterRegistry:
+    """测试等待任务结束的唤醒"""
+
+    def test_finished_status_wakes_waiters(self):
+        async def scenario():
+            bus = JobEventBus()
+            first = bus.waiters.register(1)
+            second = bus.waiters.register(1)
+            other = bus.waiters.register(2)
+            # 未结束的状态不会唤醒等待者
+            bus.publish_status(1, "processing")
+            threading.Thread(target=bus.publish_status, args=(1, "failed", "缺纸")).start()
+            results = await asyncio.gather(asyncio.wait_for(first, 1), asyncio.wait_for(second, 1))
+            waiting = bus.waiters.stats()
+            bus.waiters.discard(2, other)
+            return results, other.done(), waiting, bus.waiters.stats()
+
+        results, other_done, waiting, after = asyncio.run(scenario())
+        assert results == [("failed", "缺纸"), ("failed", "缺纸")]
+        assert not other_done
+        assert waiting == {"jobs": 1, "waiting": 1}
+        assert after == {"jobs": 0, "waiting": 0}
@@ -0,0 +1,72 @@
+"""
+测试任务状态缓存与多进程失效通知
+"""
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models import CacheInvalidation
+from app.services.cache_invalidation import CacheInvalidationFeed
+from app.services.job_state_cache import JobState, JobStateCache
+
+
+def make_session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    CacheInvalidation.__table__.create(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+class TestJobStateCache:
+    """测试写入、回填与淘汰"""
+
+    def test_lru_and_stale_fill(self):
+        cache = JobStateCache(max_entries=2)
+        cache.put(1, JobState("queued", None, 1, None))
+        cache.put(2, JobState("queued", None, 1, None))
+        assert cache.get(1).status == "queued"
+        cache.put(3, JobState("processing", None, 1, None))
+        # 最久未使用的任务 2 被淘汰
+        assert cache.get(2) is None
+        assert cache.stats()["evictions"] == 1
+
+        # 回填不覆盖任务服务写入的较新状态
+        generation = cache.generation
+        cache.put(1, JobState("completed", None, 1, None))
+        cache.fill(1, JobState("processing", None, 1, None), generation)
+        assert cache.get(1).status == "completed"
+
+        # 读取数据库期间发生失效时放弃回填
+        generation = cache.generation
+        cache.invalidate(["4"])
+        cache.fill(4, JobState("queued", None, 1, None), generation)
+        assert cache.get(4) is None
+
+
+class TestCacheInvalidationFeed:
+    """测试进程之间的失效通知"""
+
+    def test_other_process_invalidates(self):
+        session_factory = make_session_factory()
+        worker_a = CacheInvalidationFeed(enabled=True, session_factory=session_factory)
+        worker_b = CacheInvalidationFeed(enabled=True, session_factory=session_factory)
+        cache_a, cache_b = JobStateCache(), JobStateCache()
+        worker_a.register("job", cache_a.invalidate)
+        worker_b.register("job", cache_b.invalidate)
+        worker_a.poll_once()
+        worker_b.poll_once()
+
+        cache_a.put(7, JobState("queued", None, 1, None))
+        cache_b.put(7, JobState("queued", None, 1, None))
+        # 进程 A 执行完任务后通知其他进程
+        cache_a.put(7, JobState("completed", None, 1, None))
+        worker_a.publish("job", [7])
+
+        assert worker_b.poll_once() == 1
+        assert cache_b.get(7) is None
+        # 自己发出的通知不处理
+        assert worker_a.poll_once() == 0
+        assert cache_a.get(7).status == "completed"
+
+        disabled = CacheInvalidationFeed(enabled=False, session_factory=session_factory)
+        disabled.publish("job", [8])
+        assert worker_b.poll_once() == 0
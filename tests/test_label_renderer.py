@@ -0,0 +1,69 @@
+"""
+测试标签模板渲染
+"""
+import base64
+import io
+
+import pytest
+from PIL import Image
+
+from app.utils.label_renderer import LabelRenderer, fill_placeholders, iter_records
+
+
+def _png_base64(size=(8, 8)) -> str:
+    buffer = io.BytesIO()
+    Image.new("L", size, 0).save(buffer, format="PNG")
+    return base64.b64encode(buffer.getvalue()).decode()
+
+
+ELEMENTS = [
+    {"type": "box", "x": 0, "y": 0, "width": 199, "height": 99, "thickness": 2},
+    {"type": "text", "x": 10, "y": 10, "text": "SKU", "size": 16},
+    {"type": "text", "x": 10, "y": 40, "text": "{sku}-{batch}", "size": 16},
+    {"type": "image", "x": 150, "y": 10, "image_base64": _png_base64()},
+]
+
+
+class TestRecords:
+    """测试记录数据解析"""
+
+    def test_csv_with_bom(self):
+        content = "﻿sku,batch\nA1,7\nB2,8\n".encode("utf-8")
+        assert list(iter_records(content, "csv")) == [{"sku": "A1", "batch": "7"}, {"sku": "B2", "batch": "8"}]
+
+    def test_json_and_jsonl(self):
+        assert list(iter_records(b'{"records": [{"sku": "A1"}]}', "json")) == [{"sku": "A1"}]
+        assert list(iter_records(b'{"sku": "A1"}\n\n{"sku": "B2"}\n', "jsonl")) == [{"sku": "A1"}, {"sku": "B2"}]
+        with pytest.raises(ValueError):
+            list(iter_records(b'"oops"', "json"))
+
+    def test_fill_placeholders(self):
+        assert fill_placeholders("{sku}/{missing}", {"sku": "A1"}) == "A1/"
+
+
+class TestLabelRenderer:
+    """测试静态底图缓存、位图与 ZPL 输出"""
+
+    def test_static_layer_rendered_once(self):
+        renderer = LabelRenderer(200, 100, ELEMENTS)
+        assert [element["text"] for element in renderer.variable_elements] == ["{sku}-{batch}"]
+        layer = renderer.static_layer
+        first = renderer.render({"sku": "A1", "batch": "7"})
+        second = renderer.render({"sku": "B2", "batch": "8"})
+        assert renderer.static_layer is layer
+        assert first.size == (200, 100)
+        assert first.tobytes() != second.tobytes()
+        # 静态底图不会被逐条渲染修改
+        assert layer.getpixel((12, 45)) == 255
+        assert first.getpixel((152, 12)) == 0
+
+    def test_zpl_defines_format_once(self):
+        renderer = LabelRenderer(200, 100, ELEMENTS, format_name="TPL1")
+        chunks = list(renderer.iter_zpl([{"sku": "A^1", "batch": "7"}, {"sku": "B2", "batch": "8"}], copies=2))
+        definition = chunks[0].decode()
+        assert definition.count("^DFR:TPL1.ZPL") == 1
+        assert "^GFA," in definition
+        assert "^FDSKU^FS" in definition
+        assert "^FN1^FS" in definition
+        assert chunks[1].decode() == "^XA^XFR:TPL1.ZPL^CI28^FN1^FH^FDA_5E1-7^FS^PQ2^XZ\n"
+        assert len(chunks) == 3
@@ -0,0 +1,90 @@
+"""
+测试任务日志批量写入
+"""
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models import JobLog
+from app.services.log_service import JobLogSink
+
+
+def make_session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    JobLog.__table__.create(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+def messages(session_factory, job_id: int) -> list:
+    with session_factory() as db:
+        return [log.message for log in db.query(JobLog).filter(JobLog.job_id == job_id).order_by(JobLog.id)]
+
+
+class TestJobLogSink:
+    """测试按数量、按时间批量写入与顺序"""
+
+    def test_flush_on_batch_size(self):
+        session_factory = make_session_factory()
+        sink = JobLogSink(batch_size=50, flush_interval=60, session_factory=session_factory)
+        try:
+            # 写满之前后台线程不能开始写入，否则剩余不足一批的日志要等 flush_interval
+            with sink._flush_lock:
+                for index in range(100):
+                    sink.write(index % 4, "info", f"日志 {index}")
+            deadline = time.monotonic() + 5
+            while sink.stats()["written"] < 100 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert sink.stats()["written"] == 100
+            assert sink.stats()["flushes"] <= 2
+            # 同一任务的日志保持写入顺序
+            assert messages(session_factory, 1) == [f"日志 {index}" for index in range(1, 100, 4)]
+        finally:
+            sink.stop()
+
+    def test_flush_on_interval(self):
+        session_factory = make_session_factory()
+        sink = JobLogSink(batch_size=1000, flush_interval=0.05, session_factory=session_factory)
+        try:
+            sink.write(1, "info", "任务打印完成")
+            time.sleep(0.3)
+            assert messages(session_factory, 1) == ["任务打印完成"]
+        finally:
+            sink.stop()
+
+    def test_synchronous_and_stop_flushes_pending(self):
+        session_factory = make_session_factory()
+        sink = JobLogSink(synchronous=True, session_factory=session_factory)
+        sink.write(1, "info", "立即写入")
+        assert messages(session_factory, 1) == ["立即写入"]
+
+        sink = JobLogSink(batch_size=1000, flush_interval=60, session_factory=session_factory)
+        sink.write(2, "info", "停止时写入")
+        sink.stop()
+        assert messages(session_factory, 2) == ["停止时写入"]
+        assert sink.stats()["pending"] == 0
+
+    def test_failed_flush_retried_then_dropped(self):
+        session_factory = make_session_factory()
+        failures = {"left": 2}
+
+        def flaky_factory():
+            if failures["left"] > 0:
+                failures["left"] -= 1
+                raise RuntimeError("database is locked")
+            return session_factory()
+
+        sink = JobLogSink(synchronous=True, session_factory=flaky_factory, max_retries=3)
+        sink.write(1, "info", "第一条")
+        sink.write(1, "info", "第二条")
+        assert messages(session_factory, 1) == []
+        # 第三次写入成功，之前失败的日志按原顺序写在前面
+        sink.write(1, "info", "第三条")
+        assert messages(session_factory, 1) == ["第一条", "第二条", "第三条"]
+        assert sink.stats()["dropped"] == 0
+
+        failures["left"] = 3
+        for index in range(3):
+            sink.write(2, "info", f"丢弃 {index}")
+        assert sink.stats() == {"pending": 0, "written": 3, "flushes": 1, "dropped": 3}
@@ -0,0 +1,125 @@
+"""
+测试 Alembic 迁移与热点查询的执行计划
+"""
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import func, inspect, text, true
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.orm import Session
+
+from app.core.database import Base, create_database_engine, run_migrations
+from app.models import IdempotencyKey, JobLog, PrintJob, Printer
+from app.services.job_service import PENDING_JOB_STATUSES
+from app.services.payload_archive import PayloadArchiver
+
+
+def _migrations_config() -> Config:
+    config = Config()
+    config.set_main_option("script_location", str(Path(__file__).resolve().parents[1] / "migrations"))
+    config.attributes["configure_logger"] = False
+    return config
+
+
+def _head_revision() -> str:
+    return ScriptDirectory.from_config(_migrations_config()).get_current_head()
+
+
+def _index_names(engine, table_name: str) -> set:
+    return {index["name"] for index in inspect(engine).get_indexes(table_name)}
+
+
+def _query_plan(engine, query) -> str:
+    """以绑定参数的形式（与应用一致）编译 ORM 查询并返回 EXPLAIN QUERY PLAN"""
+    compiled = query.statement.compile(dialect=sqlite.dialect(), compile_kwargs={"render_postcompile": True})
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).all()
+    return "\n".join(row[-1] for row in rows)
+
+
+@pytest.fixture
+def migrated_engine(tmp_path):
+    engine = create_database_engine(f"sqlite:///{tmp_path / 'migrated.db'}")
+    run_migrations(engine)
+    yield engine
+    engine.dispose()
+
+
+class TestMigrations:
+    """测试迁移链的升级、降级与对旧数据库的兼容"""
+
+    def test_fresh_database_matches_models(self, migrated_engine):
+        for table in Base.metadata.sorted_tables:
+            expected = {index.name for index in table.indexes}
+            assert _index_names(migrated_engine, table.name) == expected, table.name
+            columns = {column["name"] for column in inspect(migrated_engine).get_columns(table.name)}
+            assert columns == set(table.columns.keys()), table.name
+
+    def test_upgrade_existing_create_all_database(self, tmp_path):
+        engine = create_database_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+        with engine.begin() as connection:
+            # 模拟旧版本由 create_all 创建、尚未记录迁移版本的数据库
+            connection.execute(text("CREATE TABLE printers (id INTEGER PRIMARY KEY, name VARCHAR(200) NOT NULL, is_default BOOLEAN, status VARCHAR(50), location VARCHAR(200), created_at DATETIME NOT NULL)"))
+            connection.execute(text("CREATE INDEX ix_printers_id ON printers (id)"))
+            connection.execute(text("INSERT INTO printers (name, is_default, created_at) VALUES ('HP', 1, '2025-01-01')"))
+        run_migrations(engine)
+
+        columns = {column["name"] for column in inspect(engine).get_columns("printers")}
+        assert {"group_id", "coalesce_window_ms", "coalesce_max_jobs"} <= columns
+        assert "ix_printers_default" in _index_names(engine, "printers")
+        with engine.connect() as connection:
+            assert connection.execute(text("SELECT name, coalesce_max_jobs FROM printers")).one() == ("HP", 0)
+            assert connection.execute(text("SELECT version_num FROM alembic_version")).scalar() == _head_revision()
+        # 重复执行不报错
+        run_migrations(engine)
+        engine.dispose()
+
+    def test_downgrade_restores_single_column_indexes(self, migrated_engine):
+        config = _migrations_config()
+        with migrated_engine.begin() as connection:
+            config.attributes["connection"] = connection
+            command.downgrade(config, "0001_baseline")
+        names = _index_names(migrated_engine, "print_jobs")
+        assert {"ix_print_jobs_status", "ix_print_jobs_priority"} <= names
+        assert "ix_print_jobs_queued_by_printer" not in names
+
+
+class TestHotPathQueryPlans:
+    """测试热点查询都能命中索引，而不是全表扫描"""
+
+    def test_queries_use_indexes(self, migrated_engine):
+        db = Session(bind=migrated_engine)
+        now = datetime(2025, 1, 1)
+        queries = {
+            "dispatcher.queued_pages": db.query(PrintJob.printer_id, func.coalesce(func.sum(PrintJob.copies), 0))
+            .filter(PrintJob.printer_id.in_([1, 2]), PrintJob.status.in_(PENDING_JOB_STATUSES))
+            .group_by(PrintJob.printer_id),
+            "coalesce candidates": db.query(PrintJob.id)
+            .filter(PrintJob.status == "queued", PrintJob.printer_id == 1, PrintJob.file_type.in_(["pdf", "image"]))
+            .order_by(PrintJob.priority, PrintJob.id)
+            .limit(10),
+            "restore_pending": db.query(PrintJob).filter(PrintJob.status.in_(["queued", "retrying"])).order_by(PrintJob.id),
+            "list jobs": db.query(PrintJob).order_by(PrintJob.created_at.desc()).limit(100),
+            "bulk by owner": db.query(PrintJob.id).filter(PrintJob.owner_id == 1, PrintJob.status.in_(["queued"])),
+            "logs by job": db.query(JobLog).filter(JobLog.job_id == 1).order_by(JobLog.id.desc()).limit(100),
+            "log retention": db.query(JobLog).filter(JobLog.created_at < now).order_by(JobLog.created_at, JobLog.id).limit(1000),
+            "default printer": db.query(Printer).filter(Printer.is_default == true()),
+            "idempotency purge": db.query(IdempotencyKey).filter(IdempotencyKey.expires_at <= now),
+            "payload archive": PayloadArchiver._candidates(db, now, 50),
+        }
+        for name, query in queries.items():
+            plan = _query_plan(migrated_engine, query)
+            # 全表扫描在计划中显示为不带 USING 的 "SCAN <表名>"
+            assert "USING" in plan, f"{name}: {plan}"
+
+        coalesce_plan = _query_plan(migrated_engine, queries["coalesce candidates"])
+        assert "ix_print_jobs_queued_by_printer" in coalesce_plan
+        assert "ix_printers_default" in _query_plan(migrated_engine, queries["default printer"])
+        assert "ix_print_jobs_payload_pending" in _query_plan(migrated_engine, queries["payload archive"])
+        assert "COVERING INDEX ix_print_jobs_printer_status" in _query_plan(migrated_engine, queries["dispatcher.queued_pages"])
+        db.close()
@@ -0,0 +1,122 @@
+"""
+测试 Office 常驻实例池
+"""
+import threading
+import time
+
+import pytest
+
+from app.core.exceptions import PrintTimeoutError
+from app.tasks.office_pool import FakeOfficeConverter, OfficeConverter, OfficePool
+
+
+class _Factory:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.created = []
+
+    def __call__(self) -> FakeOfficeConverter:
+        converter = FakeOfficeConverter(delay=self.delay)
+        self.created.append(converter)
+        return converter
+
+
+class TestOfficePool:
+    """测试实例复用、回收、健康检查与挂起超时"""
+
+    def test_reuses_warm_instance(self):
+        """多个任务复用同一个实例"""
+        factory = _Factory()
+        pool = OfficePool("word", factory, size=1, max_jobs_per_instance=10)
+        try:
+            for index in range(3):
+                pool.print_document(f"doc{index}.docx", "P1", 1)
+        finally:
+            pool.shutdown()
+        assert len(factory.created) == 1
+        assert [item[0] for item in factory.created[0].printed] == ["doc0.docx", "doc1.docx", "doc2.docx"]
+
+    def test_recycles_after_max_jobs(self):
+        """处理满指定数量后回收实例"""
+        factory = _Factory()
+        pool = OfficePool("word", factory, size=1, max_jobs_per_instance=2)
+        try:
+            for index in range(3):
+                pool.print_document(f"doc{index}.docx", "P1", 1)
+            assert pool.stats()["recycled"] == 1
+        finally:
+            pool.shutdown()
+        assert len(factory.created[0].printed) == 2
+        assert len(factory.created[1].printed) == 1
+
+    def test_unhealthy_instance_is_replaced(self):
+        """健康检查失败时重新启动实例"""
+        factory = _Factory()
+        pool = OfficePool("excel", factory, size=1)
+        try:
+            pool.print_document("a.xlsx", "P1", 1)
+            factory.created[0].healthy = False
+            pool.print_document("b.xlsx", "P1", 1)
+            assert pool.stats()["unhealthy"] == 1
+        finally:
+            pool.shutdown()
+        assert len(factory.created) == 2
+        assert factory.created[1].printed == [("b.xlsx", "P1", 1)]
+
+    def test_hung_instance_times_out_and_is_replaced(self):
+        """挂起的实例超时后被放弃，后续任务由新实例处理"""
+        factory = _Factory(delay=5)
+        pool = OfficePool("word", factory, size=1, timeout=0.2)
+        try:
+            with pytest.raises(PrintTimeoutError):
+                pool.print_document("hang.docx", "P1", 1)
+            factory.delay = 0
+            pool.print_document("next.docx", "P1", 1)
+            stats = pool.stats()
+        finally:
+            pool.shutdown()
+        assert stats["timeouts"] == 1
+        assert len(stats["workers"]) == 1
+        assert factory.created[-1].printed == [("next.docx", "P1", 1)]
+
+    def test_waiting_for_busy_instance_times_out(self):
+        """排队等待空闲实例同样受超时限制，超时的任务不再执行"""
+        pool = OfficePool("word", _Factory(), size=1, timeout=1.0)
+        executed = []
+
+        def slow(converter):
+            time.sleep(0.7)
+            executed.append("slow")
+
+        threads = [threading.Thread(target=pool.run, args=(slow,)) for _ in range(2)]
+        try:
+            for thread in threads:
+                thread.start()
+                time.sleep(0.05)
+            with pytest.raises(PrintTimeoutError):
+                pool.run(lambda converter: executed.append("late"))
+            for thread in threads:
+                thread.join()
+            stats = pool.stats()
+        finally:
+            pool.shutdown()
+        assert executed == ["slow", "slow"]
+        assert stats["timeouts"] == 0
+
+    def test_converter_interface_is_abstract(self):
+        """未实现打印与导出的转换器不能实例化"""
+        with pytest.raises(TypeError):
+            OfficeConverter()
+
+    def test_errors_are_propagated(self):
+        """文档错误原样抛给调用方"""
+        pool = OfficePool("word", _Factory(), size=1)
+
+        def broken(converter):
+            raise ValueError("文档损坏")
+
+        try:
+            with pytest.raises(ValueError):
+                pool.run(broken)
+        finally:
+            pool.shutdown()
@@ -0,0 +1,53 @@
+"""
+测试打印内容压缩编解码
+"""
+import os
+
+import pytest
+
+from app.models import PrintJob
+from app.utils.payload_codec import CODEC_ZLIB, decode_payload, encode_payload, iter_decoded
+
+
+class TestEncodePayload:
+    """测试按内容决定是否压缩"""
+
+    def test_compressible_text(self):
+        content = "打印测试 ABC 123\n".encode("utf-8") * 5000
+        stored, codec = encode_payload(content, "txt")
+        assert codec == CODEC_ZLIB
+        assert len(stored) < len(content) / 10
+        assert decode_payload(stored, codec) == content
+
+    def test_skip_small_images_and_random(self):
+        text = b"x" * 4096
+        assert encode_payload(text[:100], "txt") == (text[:100], None)
+        assert encode_payload(text, "png") == (text, None)
+        assert encode_payload(text, "JPG") == (text, None)
+        noise = os.urandom(200 * 1024)
+        assert encode_payload(noise, "pdf") == (noise, None)
+
+    def test_unknown_codec(self):
+        with pytest.raises(ValueError):
+            decode_payload(b"data", "lz4")
+
+
+class TestStreamingDecode:
+    """测试分块解码"""
+
+    def test_chunks_match_full_decode(self):
+        content = b"".join(b"line %d\n" % index for index in range(200000))
+        stored, codec = encode_payload(content, "txt")
+        chunks = list(iter_decoded(stored, codec, chunk_size=64 * 1024))
+        assert all(len(chunk) <= 64 * 1024 for chunk in chunks)
+        assert b"".join(chunks) == content
+        assert b"".join(iter_decoded(content, None, chunk_size=1000)) == content
+
+    def test_print_content_of_reprint(self):
+        content = b"%PDF-1.4 " + b"0" * 10000
+        stored, codec = encode_payload(content, "pdf")
+        source = PrintJob(id=1, content=stored, content_codec=codec, file_type="pdf")
+        reprint = PrintJob(id=2, content=b"", source_job_id=1, file_type="pdf")
+        reprint.source_job = source
+        assert reprint.print_content == content
+        assert b"".join(reprint.iter_print_content()) == content
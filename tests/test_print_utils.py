@@ -2,7 +2,17 @@
 测试打印工具函数
 """
 import pytest
-from app.utils.print_utils import parse_media_size, calculate_scale_ratio, should_rotate_image
+from PIL import Image
+
+from app.utils.print_utils import (
+    Placement,
+    calculate_scale_ratio,
+    impose_images,
+    parse_media_size,
+    plan_grid_layout,
+    plan_shelf_layout,
+    should_rotate_image,
+)
 
 
 class TestParseMediaSize:
@@ -142,3 +152,49 @@ class TestCalculateScaleRatio:
         width, height = calculate_scale_ratio(0, 0, 400, 400, "contain")
         assert width == 400
         assert height == 400
+
+
+class TestImposition:
+    """测试多图拼版"""
+
+    def test_grid_layout_fills_rows_then_pages(self):
+        pages = plan_grid_layout([(100, 50)] * 7, 330, 120, margin=10, spacing=5)
+        # 可用区域 310x100：每页 3 列 1 行
+        assert [len(page) for page in pages] == [3, 3, 1]
+        assert pages[0][1] == Placement(1, 115, 10, 100, 50)
+
+    def test_grid_layout_scales_oversized_images(self):
+        pages = plan_grid_layout([(400, 200)], 220, 220, margin=10)
+        assert pages[0][0].width == 200
+        assert pages[0][0].height == 100
+
+    def test_shelf_layout_packs_mixed_sizes(self):
+        sizes = [(200, 100), (100, 50), (100, 50), (300, 80)]
+        pages = plan_shelf_layout(sizes, 400, 300)
+        assert len(pages) == 1
+        placements = sorted(pages[0])
+        # 最高的图片先放在第一个货架，同高度以下的小图补在右侧
+        assert placements[0] == Placement(0, 0, 0, 200, 100)
+        assert (placements[1].x, placements[1].y) == (200, 0)
+        assert placements[3].y == 100
+
+    def test_shelf_layout_never_overlaps(self):
+        sizes = [(37 + i * 7 % 50, 20 + i * 13 % 60) for i in range(60)]
+        pages = plan_shelf_layout(sizes, 300, 200, margin=5, spacing=3)
+        assert sorted(p.index for page in pages for p in page) == list(range(60))
+        for page in pages:
+            for a in page:
+                assert a.x >= 5 and a.y >= 5 and a.x + a.width <= 295 and a.y + a.height <= 195
+                for b in page:
+                    if a.index < b.index:
+                        assert a.x + a.width <= b.x or b.x + b.width <= a.x or a.y + a.height <= b.y or b.y + b.height <= a.y
+
+    def test_impose_images_renders_sheets(self):
+        sticker = Image.new("RGB", (40, 40), "black")
+        sheets = impose_images([sticker] * 5, 100, 100, margin=5, spacing=10, layout="grid")
+        assert len(sheets) == 2
+        assert sheets[0].size == (100, 100)
+        assert sheets[0].getpixel((10, 10)) == (0, 0, 0)
+        assert sheets[1].getpixel((60, 10)) == (255, 255, 255)
+        with pytest.raises(ValueError):
+            impose_images([sticker], 100, 100, layout="spiral")
@@ -0,0 +1,79 @@
+"""
+测试打印机熔断器与健康探测
+"""
+from app.services.printer_health import CircuitBreaker, PrinterHealthMonitor
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestCircuitBreaker:
+    """测试熔断器状态转换"""
+
+    def test_opens_after_threshold(self):
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=_Clock())
+        for _ in range(2):
+            breaker.record_failure("离线")
+            assert breaker.allow_request() is True
+        breaker.record_failure("离线")
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.allow_request() is False
+
+    def test_half_open_allows_single_trial(self):
+        clock = _Clock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        clock.now = 11
+        assert breaker.allow_request() is True
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow_request() is False
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.allow_request() is True
+
+    def test_failed_trial_reopens(self):
+        clock = _Clock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        clock.now = 11
+        assert breaker.allow_request() is True
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        clock.now = 15
+        assert breaker.allow_request() is False
+
+    def test_released_trial_allows_next(self):
+        clock = _Clock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        clock.now = 11
+        assert breaker.allow_request() is True
+        breaker.release_trial()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow_request() is True
+
+
+class TestPrinterHealthMonitor:
+    """测试健康探测驱动熔断器"""
+
+    def test_probe_updates_breakers(self, monkeypatch):
+        from app.core.config import settings
+
+        monkeypatch.setattr(settings, "printer_breaker_failure_threshold", 2)
+        results = {"P1": True, "P2": False, "P3": None}
+        monitor = PrinterHealthMonitor(probe=lambda name: results[name])
+        printers = [(1, "P1"), (2, "P2"), (3, "P3")]
+
+        assert monitor.probe_printers(printers) == {1: "online", 2: "offline"}
+        assert monitor.allow_request(2) is True
+        monitor.probe_printers(printers)
+        assert monitor.allow_request(2) is False
+        assert monitor.allow_request(1) is True
+        states = {item["printer_id"]: item["state"] for item in monitor.snapshot()}
+        assert states[2] == "open"
+        assert 3 not in states
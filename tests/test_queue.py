@@ -0,0 +1,162 @@
+"""
+测试任务队列的公平调度
+"""
+import time
+
+from app.tasks.manager import JobQueueManager
+from app.tasks.scheduler import FairScheduler, IndexedHeap
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def drain(scheduler: FairScheduler) -> list:
+    order = []
+    while True:
+        item = scheduler.pop()
+        if item is None:
+            return order
+        order.append(item)
+        scheduler.done(item[1])
+
+
+class TestFairScheduler:
+    """测试优先级老化、所有者加权公平与并发上限"""
+
+    def test_priority_within_owner(self):
+        scheduler = FairScheduler(aging_seconds=60, clock=FakeClock())
+        scheduler.push(1, 5, "a")
+        scheduler.push(2, 1, "a")
+        scheduler.push(3, 9, "a")
+        assert [job_id for job_id, _ in drain(scheduler)] == [2, 1, 3]
+
+    def test_peek_matches_pop(self):
+        scheduler = FairScheduler(aging_seconds=60, clock=FakeClock())
+        assert scheduler.peek() is None
+        scheduler.push(1, 5, "a")
+        scheduler.push(2, 1, "b")
+        while scheduler.peek() is not None:
+            head = scheduler.peek()
+            assert scheduler.pop()[0] == head
+
+    def test_waiting_job_ages_past_newer_high_priority(self):
+        clock = FakeClock()
+        scheduler = FairScheduler(aging_seconds=60, clock=clock)
+        scheduler.push(1, 9, "a")
+        clock.now = 600
+        scheduler.push(2, 1, "a")
+        # 任务 1 已等待 600 秒，相当于提升了 10 个优先级
+        assert scheduler.pop()[0] == 1
+
+    def test_flooding_owner_does_not_starve_others(self):
+        scheduler = FairScheduler(aging_seconds=60, clock=FakeClock())
+        for job_id in range(1000):
+            scheduler.push(job_id, 1, "flood")
+        scheduler.push(5000, 9, "other")
+        first = [owner for _, owner in drain(scheduler)[:2]]
+        assert "other" in first
+
+    def test_weighted_share(self):
+        scheduler = FairScheduler(aging_seconds=60, weights={"1": 2}, clock=FakeClock())
+        for job_id in range(300):
+            scheduler.push(job_id, 5, 1)
+            scheduler.push(1000 + job_id, 5, 2)
+        owners = [owner for _, owner in drain(scheduler)[:300]]
+        assert owners.count(1) == 200
+        assert owners.count(2) == 100
+
+    def test_max_inflight_per_owner(self):
+        scheduler = FairScheduler(aging_seconds=60, max_inflight=1, clock=FakeClock())
+        scheduler.push(1, 5, "a")
+        scheduler.push(2, 5, "a")
+        scheduler.push(3, 5, "b")
+        assert scheduler.pop() == (1, "a")
+        assert scheduler.pop() == (3, "b")
+        assert scheduler.pop() is None
+        scheduler.done("a")
+        assert scheduler.pop() == (2, "a")
+
+    def test_large_queue(self):
+        scheduler = FairScheduler(aging_seconds=60)
+        started = time.perf_counter()
+        for job_id in range(100_000):
+            scheduler.push(job_id, job_id % 10, job_id % 50)
+        assert len(scheduler) == 100_000
+        assert len(drain(scheduler)) == 100_000
+        assert time.perf_counter() - started < 10
+
+
+class TestIndexedHeap:
+    """测试按键调整优先级与删除"""
+
+    def test_update_and_remove(self):
+        heap = IndexedHeap()
+        for key, value in [("a", 5), ("b", 3), ("c", 8), ("d", 1)]:
+            heap.push(key, value)
+        heap.update("c", 0)
+        heap.update("d", 9)
+        assert heap.remove("b")
+        assert not heap.remove("b")
+        assert [heap.pop()[0] for _ in range(len(heap))] == ["c", "a", "d"]
+
+
+class TestQueueChurn:
+    """测试取消与调整优先级不会留下重复或过期条目"""
+
+    def test_push_again_does_not_duplicate(self):
+        scheduler = FairScheduler(aging_seconds=60, clock=FakeClock())
+        scheduler.push(1, 5, "a")
+        scheduler.push(2, 5, "a")
+        scheduler.push(2, 1, "a")
+        assert [job_id for job_id, _ in drain(scheduler)] == [2, 1]
+
+    def test_reprioritize_and_remove(self):
+        scheduler = FairScheduler(aging_seconds=60, clock=FakeClock())
+        for job_id in range(1, 4):
+            scheduler.push(job_id, 5, "a")
+        scheduler.push(4, 5, "b")
+        assert scheduler.reprioritize(3, 1)
+        assert scheduler.remove(1)
+        assert scheduler.remove(4)
+        assert not scheduler.remove(4)
+        assert not scheduler.reprioritize(99, 1)
+        assert [job_id for job_id, _ in drain(scheduler)] == [3, 2]
+        assert scheduler.stats()["owners"] == {}
+
+    def test_memory_bounded_under_churn(self):
+        scheduler = FairScheduler(aging_seconds=60)
+        for job_id in range(100):
+            scheduler.push(job_id, 5, job_id % 3)
+        for round_id in range(1, 500):
+            for job_id in range(100):
+                scheduler.reprioritize(job_id, (job_id + round_id) % 10)
+            victim = round_id % 100
+            scheduler.remove(victim)
+            scheduler.push(victim, 5, victim % 3)
+        assert len(scheduler) == 100
+        assert sum(len(queue.jobs) for queue in scheduler._owners.values()) == 100
+        assert len(drain(scheduler)) == 100
+
+    def test_manager_cancel_removes_delayed_job(self):
+        queue = JobQueueManager()
+        queue.enqueue(1, 5)
+        queue.enqueue_delayed(2, 5, 10)
+        assert queue.cancel(1)
+        assert queue.cancel(2)
+        assert not queue.cancel(1)
+        assert queue.stats()["queued"] == 0
+        assert queue.stats()["delayed"] == 0
+
+    def test_manager_bulk_operations(self):
+        queue = JobQueueManager()
+        queue.enqueue_many((job_id, 5, job_id % 2) for job_id in range(1, 5001))
+        queue.enqueue_delayed(9001, 5, 10)
+        assert queue.reprioritize_many([1, 2, 9001, 9002], 1) == [9002]
+        assert queue.cancel_many(list(range(1, 5001)) + [9001, 9002]) == 5001
+        assert queue.stats()["queued"] == 0
+        assert queue.stats()["delayed"] == 0
@@ -0,0 +1,50 @@
+"""
+测试重试策略与延迟队列
+"""
+import time
+
+from app.core.config import settings
+from app.core.exceptions import PrintContentError, PrinterUnavailableError, PrintTimeoutError
+from app.tasks.manager import JobQueueManager
+from app.tasks.retry import RetryPolicy, classify_error, get_retry_policy
+
+
+class TestRetryPolicy:
+    """测试退避计算与错误分类"""
+
+    def test_exponential_backoff_with_cap(self):
+        policy = RetryPolicy(max_attempts=5, base_delay=2, max_delay=10, jitter=0)
+        assert [policy.delay_for(attempt) for attempt in range(1, 5)] == [2, 4, 8, 10]
+
+    def test_jitter_stays_in_range(self):
+        policy = RetryPolicy(max_attempts=5, base_delay=10, max_delay=100, jitter=0.2)
+        for _ in range(50):
+            assert 8 <= policy.delay_for(1) <= 12
+
+    def test_classify_error(self):
+        assert classify_error(PrintTimeoutError("超时")) == "timeout"
+        assert classify_error(PrinterUnavailableError("离线")) == "printer_unavailable"
+        assert classify_error(PrintContentError("损坏")) == "content"
+        assert classify_error(RuntimeError("其他")) == "default"
+
+    def test_settings_override(self, monkeypatch):
+        monkeypatch.setattr(settings, "retry_policies", {"default": {"max_attempts": 7.0, "base_delay": 1}})
+        policy = get_retry_policy("default")
+        assert policy.max_attempts == 7
+        assert policy.base_delay == 1
+
+
+class TestDelayedQueue:
+    """测试延迟队列"""
+
+    def test_delayed_job_is_promoted_when_due(self):
+        queue = JobQueueManager()
+        queue.enqueue_delayed(1, 5, 0.05)
+        queue.enqueue_delayed(2, 5, 10)
+        assert queue._promote_delayed() > 0
+        assert len(queue._scheduler) == 0
+        time.sleep(0.06)
+        remaining = queue._promote_delayed()
+        assert 9 < remaining <= 10
+        assert queue._scheduler.pop()[0] == 1
+        assert len(queue._scheduler) == 0
@@ -0,0 +1,58 @@
+"""
+测试打印执行看门狗
+"""
+import threading
+
+import pytest
+
+from app.core.config import settings
+from app.core.exceptions import PrintTimeoutError
+from app.services.job_service import _resolve_print_timeout
+from app.tasks.watchdog import ExecutionWatchdog
+
+
+class TestExecutionWatchdog:
+    """测试截止时间、异常传递与心跳"""
+
+    def test_runs_action(self):
+        watchdog = ExecutionWatchdog()
+        calls = []
+        watchdog.run(1, lambda: calls.append(1), timeout=1, backend="raw")
+        assert calls == [1]
+        assert watchdog.executing() == []
+
+    def test_propagates_errors(self):
+        watchdog = ExecutionWatchdog()
+
+        def broken():
+            raise RuntimeError("打印机拒绝连接")
+
+        with pytest.raises(RuntimeError, match="打印机拒绝连接"):
+            watchdog.run(2, broken, timeout=1)
+
+    def test_abandons_hung_execution(self):
+        watchdog = ExecutionWatchdog(heartbeat_interval=0.05)
+        release = threading.Event()
+        with pytest.raises(PrintTimeoutError):
+            watchdog.run(3, lambda: release.wait(5), timeout=0.2, backend="raw")
+
+        heartbeat = watchdog.heartbeat()
+        assert heartbeat["timeouts"] == 1
+        assert [(item["job_id"], item["state"]) for item in heartbeat["executing"]] == [(3, "abandoned")]
+
+        release.set()
+        for _ in range(50):
+            if not watchdog.executing():
+                break
+            threading.Event().wait(0.02)
+        assert watchdog.executing() == []
+
+
+def test_print_timeout_resolution(monkeypatch):
+    """文件类型截止时间优先于后端截止时间"""
+    monkeypatch.setattr(settings, "print_backend_timeouts", {"raw": 30})
+    monkeypatch.setattr(settings, "print_file_type_timeouts", {"pdf": 90})
+    monkeypatch.setattr(settings, "print_timeout_seconds", 300)
+    assert _resolve_print_timeout("txt", "raw") == 30
+    assert _resolve_print_timeout("pdf", "file") == 90
+    assert _resolve_print_timeout("png", "image_gdi") == 300